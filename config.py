@@ -1,3 +1,95 @@
 import ConfigParser
+import os
 
-config = ConfigParser.ConfigParser(allow_no_value=True)
\ No newline at end of file
+def readProfile(configFilename, profileFilename=None):
+    '''Reads the engine configuration, the default profile it names and then the given profile into a new Profile.'''
+    parser = ConfigParser.ConfigParser(allow_no_value=True)
+    parser.read(configFilename)
+    
+    defaultProfile = parser.get('general', 'default.profile')
+    if defaultProfile != None:
+        parser.read(defaultProfile)
+    profileName = parser.get('profile', 'name')
+    
+    if profileFilename != None:
+        parser.read(profileFilename)
+        if profileName == 'default':
+            profileName = os.path.splitext(os.path.basename(profileFilename))[0]
+    
+    sections = {}
+    for section in parser.sections():
+        sections[section] = dict((option, parser.get(section, option)) for option in parser.options(section))
+    return Profile(profileName, sections)
+
+class Profile(object):
+    '''The resolved settings of one job, read once and not changed afterwards.
+        The getters follow ConfigParser, but each value is converted only once and the same converted value is returned after that.
+        A profile is not copied by deepcopy, all the copies of a sliced model share it.'''
+    
+    __slots__ = ('name', '_sections', '_values')
+    
+    def __init__(self, name, sections):
+        object.__setattr__(self, 'name', name)
+        object.__setattr__(self, '_sections', sections)
+        object.__setattr__(self, '_values', {})
+        
+    def __setattr__(self, name, value):
+        raise AttributeError('A Profile cannot be changed once read: %s' % name)
+    
+    def __delattr__(self, name):
+        raise AttributeError('A Profile cannot be changed once read: %s' % name)
+    
+    def __getstate__(self):
+        return (self.name, self._sections)
+    
+    def __setstate__(self, state):
+        Profile.__init__(self, state[0], state[1])
+        
+    def __copy__(self):
+        return self
+    
+    def __deepcopy__(self, memo):
+        return self
+    
+    def __repr__(self):
+        return 'Profile(%s)' % self.name
+    
+    def sections(self):
+        return sorted(self._sections.keys())
+    
+    def items(self, section):
+        return sorted(self._getOptions(section).items())
+    
+    def has_option(self, section, option):
+        return section in self._sections and option in self._sections[section]
+    
+    def get(self, section, option):
+        options = self._getOptions(section)
+        if option not in options:
+            raise ConfigParser.NoOptionError(option, section)
+        return options[option]
+    
+    def getint(self, section, option):
+        return self._getConverted(int, section, option)
+    
+    def getfloat(self, section, option):
+        return self._getConverted(float, section, option)
+    
+    def getboolean(self, section, option):
+        return self._getConverted(_getBoolean, section, option)
+    
+    def _getOptions(self, section):
+        if section not in self._sections:
+            raise ConfigParser.NoSectionError(section)
+        return self._sections[section]
+    
+    def _getConverted(self, conversion, section, option):
+        key = (conversion, section, option)
+        if key not in self._values:
+            self._values[key] = conversion(self.get(section, option))
+        return self._values[key]
+
+def _getBoolean(value):
+    if value.lower() not in ConfigParser.RawConfigParser._boolean_states:
+        raise ValueError('Not a boolean: %s' % value)
+    return ConfigParser.RawConfigParser._boolean_states[value.lower()]
\ No newline at end of file
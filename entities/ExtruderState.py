@@ -0,0 +1,19 @@
+class ExtruderState:
+    '''The extruder position and extrusion distance carried from path to path whilst gcode is generated.
+        Each gcode generation owns its state, so several models or layers can be generated in one process.'''
+    def __init__(self, totalExtrusionDistance=0.0, previousPoint=None):
+        self.totalExtrusionDistance = totalExtrusionDistance
+        self.previousPoint = previousPoint
+        self.isExtrusionDistanceReset = False
+        
+    def __repr__(self):
+        return 'ExtruderState(totalExtrusionDistance=%s, previousPoint=%s)' % (self.totalExtrusionDistance, self.previousPoint)
+    
+    def resetPreviousPoint(self):
+        '''Forgets the last position, used at the start of each layer.'''
+        self.previousPoint = None
+
+    def resetExtrusionDistance(self):
+        '''Zeroes the extrusion distance, as the reset extruder distance command does.'''
+        self.totalExtrusionDistance = 0.0
+        self.isExtrusionDistanceReset = True
\ No newline at end of file
@@ -1,5 +1,4 @@
 from collections import OrderedDict
-from config import config
 from fabmetheus_utilities import archive, svg_writer, euclidean
 from fabmetheus_utilities.vector3 import Vector3
 from math import log10, floor, pi
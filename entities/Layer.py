@@ -1,15 +1,21 @@
 from StringIO import StringIO
-from config import config
 from entities import NestedRing, GcodeCommand
+from fabmetheus_utilities import euclidean
 from utilities import memory_tracker
 import gcodes
 import sys
 import time
 
 class Layer:
-    def __init__(self, z, index, runtimeParameters):
+    # The thickness of a layer sliced with its own thickness, None when the layer has the thickness of the profile.
+    thickness = None
+    # The hash of the loops the layer was made from, None when identical layers are not reused.
+    boundaryHash = None
+    
+    def __init__(self, z, index, runtimeParameters, thickness=None):
         self.z = z
         self.index = index
+        self.thickness = thickness
         self.runtimeParameters = runtimeParameters
         self.bridgeRotation = None
         self.nestedRings = []
@@ -38,6 +44,9 @@ class Layer:
         
         output.write('%2slayer (%s) z:%s\n' % ('', self.index, self.z))
         
+        if self.thickness != None:
+            output.write('%2slayer thickness:%s\n' % ('', self.thickness))
+        
         output.write('%2slayer feedAndFlowRateMultiplier:%s\n' % ('', self.feedAndFlowRateMultiplier))
         
         if self.bridgeRotation != None:
@@ -69,6 +78,22 @@ class Layer:
            
         return output.getvalue()
     
+    def getBoundaryPolylines(self):
+        '''Returns the boundary polylines of the nested rings, each boundary before the boundaries inside it. The polylines are
+            shared with the perimeters so they must only be read.'''
+        polylines = []
+        for nestedRing in self.nestedRings:
+            nestedRing.getBoundaryPolylines(polylines)
+        return polylines
+    
+    def isIdentical(self, otherLayer):
+        '''Determine if the layer has exactly the same boundaries, bridge rotation and thickness as the other layer.'''
+        if self.boundaryHash == None or self.boundaryHash != otherLayer.boundaryHash:
+            return False
+        if self.bridgeRotation != otherLayer.bridgeRotation or self.thickness != otherLayer.thickness:
+            return False
+        return euclidean.areLoopsIdentical(self.getBoundaryPolylines(), otherLayer.getBoundaryPolylines())
+    
     def getDistanceAndDuration(self):
         '''Returns the amount of time needed to print the layer, and the distance to travel. Note, this currently ignores commands in the pre and post layer list.'''
         duration = 0.0
@@ -1,9 +1,8 @@
 from StringIO import StringIO
-from config import config
 from fabmetheus_utilities import euclidean
 from fabmetheus_utilities.vector3 import Vector3
-from math import pi
-from paths import BoundaryPerimeter, Loop, InfillPath
+from Polyline import Polyline
+from paths import BoundaryPerimeter, Loop, InfillPath, CombinedInfillPath
 from utilities import memory_tracker
 import math
 import sys
@@ -17,7 +16,6 @@ class NestedRing:
             memory_tracker.track_object(self)
         
         self.runtimeParameters = runtimeParameters
-        self.decimalPlaces = self.runtimeParameters.decimalPlaces
         self.z = z
         
         self.perimeter = None
@@ -28,35 +26,12 @@ class NestedRing:
         
         # can the following be removed? only used whilst generating the infill?
         self.infillPathsHolder = []
+        self.combinedInfillPathsHolder = []
+        self.combinedLayerCount = 1
         self.extraLoops = []
         self.penultimateFillLoops = []
         self.lastFillLoops = None        
         ###
-                
-        self.bridgeFeedRateMinute = self.runtimeParameters.bridgeFeedRateMinute
-        self.perimeterFeedRateMinute = self.runtimeParameters.perimeterFeedRateMinute
-        self.extrusionFeedRateMinute = self.runtimeParameters.extrusionFeedRateMinute
-        self.travelFeedRateMinute = self.runtimeParameters.travelFeedRateMinute
-        self.extrusionUnitsRelative = self.runtimeParameters.extrusionUnitsRelative
-        
-        self.oozeRate = self.runtimeParameters.oozeRate
-        self.zDistanceRatio = 5.0
-        self.extruderRetractionSpeedMinute = round(60.0 * self.runtimeParameters.extruderRetractionSpeed, self.decimalPlaces)
-
-        self.layerThickness = self.runtimeParameters.layerThickness
-        self.perimeterWidth = self.runtimeParameters.perimeterWidth
-        self.filamentDiameter = self.runtimeParameters.filamentDiameter
-        self.filamentPackingDensity = self.runtimeParameters.filamentPackingDensity
-        self.absolutePositioning = config.getboolean('preface', 'positioning.absolute')
-        self.flowRate = self.runtimeParameters.flowRate
-        self.perimeterFlowRate = self.runtimeParameters.perimeterFlowRate
-        self.bridgeFlowRate = self.runtimeParameters.bridgeFlowRate
-        self.previousPoint = None
-        filamentRadius = 0.5 * self.filamentDiameter
-        filamentPackingArea = pi * filamentRadius * filamentRadius * self.filamentPackingDensity
-        extrusionArea = pi * self.layerThickness ** 2 / 4 + self.layerThickness * (self.perimeterWidth - self.layerThickness)
-            #http://hydraraptor.blogspot.sk/2011/03/spot-on-flow-rate.html
-        self.flowScaleSixty = 60.0 * extrusionArea / filamentPackingArea
         
     def __str__(self):
         output = StringIO()
@@ -123,6 +98,13 @@ class NestedRing:
         return (distance, duration)
     
     
+    def getBoundaryPolylines(self, polylineList):
+        '''Adds the boundary polylines of this ring and the rings inside it, they are shared with the perimeters so they must only be read.'''
+        polylineList.append(self.getBoundaryPolyline())
+        
+        for innerNestedRing in self.innerNestedRings:
+            innerNestedRing.getBoundaryPolylines(polylineList)
+            
     def getPerimeterPaths(self, pathList):        
         pathList.append(self.perimeter)
         
@@ -150,6 +132,26 @@ class NestedRing:
             return self.perimeter.getStartPoint()
         
 
+    def copyInsetFrom(self, nestedRing):
+        '''Copies the perimeter of a nested ring with the same boundaries, from an earlier layer.'''
+        for (innerNestedRing, otherInnerNestedRing) in zip(self.innerNestedRings, nestedRing.innerNestedRings):
+            innerNestedRing.copyInsetFrom(otherInnerNestedRing)
+        
+        self.perimeter.startPoint = nestedRing.perimeter.startPoint
+        self.perimeter.points = Polyline(nestedRing.perimeter.points)
+        
+    def copyFillFrom(self, nestedRing):
+        '''Copies the loops and the infill of a nested ring with the same boundaries, from an earlier layer. The paths are copied
+            at the z of this ring, so they can be offset apart from the paths of the other layer.'''
+        for (innerNestedRing, otherInnerNestedRing) in zip(self.innerNestedRings, nestedRing.innerNestedRings):
+            innerNestedRing.copyFillFrom(otherInnerNestedRing)
+        
+        self.extraLoops = nestedRing.extraLoops[:]
+        self.penultimateFillLoops = nestedRing.penultimateFillLoops
+        self.lastFillLoops = nestedRing.lastFillLoops
+        self.loops = [loop.getCopyAtZ(self.z) for loop in nestedRing.loops]
+        self.infillPaths = [infillPath.getCopyAtZ(self.z) for infillPath in nestedRing.infillPaths]
+        
     def offset(self, offset):
         'Moves the nested ring by the offset amount'
         for innerNestedRing in self.innerNestedRings:
@@ -167,8 +169,7 @@ class NestedRing:
     def setBoundaryPerimeter(self, boundaryPointsLoop, perimeterLoop=None):        
         self.perimeter = BoundaryPerimeter(self.z, self.runtimeParameters)
         
-        for point in boundaryPointsLoop:
-            self.perimeter.boundaryPoints.append(Vector3(point.real, point.imag, self.z))
+        self.perimeter.boundaryPoints.extend(boundaryPointsLoop)
             
         if len(boundaryPointsLoop) < 2:
             return
@@ -187,11 +188,13 @@ class NestedRing:
     def addInfillGcodeFromThread(self, thread):
         'Add a thread to the output.'
         
-        infillPath = InfillPath(self.z, self.runtimeParameters)
-        decimalPlaces = self.decimalPlaces
+        if self.combinedLayerCount > 1:
+            infillPath = CombinedInfillPath(self.z, self.runtimeParameters, self.combinedLayerCount)
+        else:
+            infillPath = InfillPath(self.z, self.runtimeParameters)
         if len(thread) > 0:
             infillPath.startPoint = thread[0]
-            infillPath.points = thread[1 :]
+            infillPath.points = Polyline(thread[1 :])
         else:
             logger.warning('Zero length vertex positions array which was skipped over, this should never happen.')
         if len(thread) < 2:
@@ -208,12 +211,13 @@ class NestedRing:
         return self.lastFillLoops
 
 
+    def getBoundaryPolyline(self):
+        '''Returns the XY boundary points polyline of the perimeter itself, without copying it, so it must only be read.'''
+        return self.perimeter.boundaryPoints
+    
     def getXYBoundaries(self):
-        '''Converts XYZ boundary points to XY'''
-        xyBoundaries = []
-        for boundaryPoint in self.perimeter.boundaryPoints:
-            xyBoundaries.append(boundaryPoint.dropAxis())
-        return xyBoundaries
+        '''Returns a list of the XY boundary points.'''
+        return list(self.perimeter.boundaryPoints)
     
             
     def getSurroundingBoundaries(self):
@@ -247,15 +251,19 @@ class NestedRing:
             fillLoops += euclidean.getFillOfSurroundings(nestedRing.innerNestedRings, penultimateFillLoops)
         return fillLoops
     
-    def transferPaths(self, paths):
-        'Transfer paths.'
+    def transferPaths(self, paths, combinedLayerCount=1):
+        'Transfer paths. Sparse infill combining several layers is held apart, to be extruded for all of them.'
         for innerNestedRing in self.innerNestedRings:
-            innerNestedRing.transferPaths(paths)
-        loop = self.getXYBoundaries()
+            innerNestedRing.transferPaths(paths, combinedLayerCount)
+        infillPathsHolder = self.infillPathsHolder
+        if combinedLayerCount > 1:
+            infillPathsHolder = self.combinedInfillPathsHolder
+            self.combinedLayerCount = combinedLayerCount
+        loop = self.getBoundaryPolyline()
         for insideIndex in xrange(len(paths) - 1, -1, -1):
             inside = paths[ insideIndex ]
             if euclidean.isPathInsideLoop(loop, inside):
-                self.infillPathsHolder.append(inside)
+                infillPathsHolder.append(inside)
                 del paths[ insideIndex ]
 
     def addToThreads(self, extrusionHalfWidth, oldOrderedLocation, threadSequence):
@@ -264,8 +272,12 @@ class NestedRing:
         self.transferInfillPaths(extrusionHalfWidth, oldOrderedLocation, threadSequence)
         
     def transferInfillPaths(self, extrusionHalfWidth, oldOrderedLocation, threadSequence):
-        'Transfer the infill paths.'
+        'Transfer the infill paths, then the combined sparse infill paths.'
+        combinedLayerCount = self.combinedLayerCount
+        self.combinedLayerCount = 1
         euclidean.transferClosestPaths(oldOrderedLocation, self.infillPathsHolder[:], self)
+        self.combinedLayerCount = combinedLayerCount
+        euclidean.transferClosestPaths(oldOrderedLocation, self.combinedInfillPathsHolder[:], self)
     
     def addPerimeterInner(self, extrusionHalfWidth, oldOrderedLocation, threadSequence):
         'Add to the perimeter and the inner island.'
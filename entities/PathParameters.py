@@ -0,0 +1,81 @@
+from math import pi
+
+class PathParameters(object):
+    '''The parameters used by every path to generate its gcode, derived once from the runtime parameters.
+        One instance is shared by all the paths of a sliced model, so it is frozen once built. Layers sliced with their
+        own thickness share one instance per thickness, which differs only in the flow scale and the bridge flow rate.'''
+    
+    __slots__ = ('decimalPlaces', 'dimensionDecimalPlaces', 'speedActive', 'dimensionActive', 'combActive',
+                 'absolutePositioning', 'extrusionUnitsRelative',
+                 'bridgeFeedRateMinute', 'perimeterFeedRateMinute', 'extrusionFeedRateMinute', 'travelFeedRateMinute', 'supportFeedRateMinute',
+                 'flowRate', 'perimeterFlowRate', 'bridgeFlowRate', 'flowScaleSixty',
+                 'oozeRate', 'zDistanceRatio', 'extruderRetractionSpeedMinute',
+                 'layerThickness', 'perimeterWidth', 'filamentDiameter', 'filamentPackingDensity',
+                 'minimumBridgeFeedRateMultiplier', 'minimumPerimeterFeedRateMultiplier', 'minimumExtrusionFeedRateMultiplier',
+                 'minimumTravelFeedRateMultiplier', 'minimumLayerFeedRateMinute')
+    
+    def __init__(self, runtimeParameters, layerThickness=None):
+        setParameter = object.__setattr__
+        setParameter(self, 'decimalPlaces', runtimeParameters.decimalPlaces)
+        setParameter(self, 'dimensionDecimalPlaces', runtimeParameters.dimensionDecimalPlaces)
+        setParameter(self, 'speedActive', runtimeParameters.speedActive)
+        setParameter(self, 'dimensionActive', runtimeParameters.dimensionActive)
+        setParameter(self, 'combActive', runtimeParameters.combActive)
+        setParameter(self, 'absolutePositioning', runtimeParameters.profile.getboolean('preface', 'positioning.absolute'))
+        setParameter(self, 'extrusionUnitsRelative', runtimeParameters.extrusionUnitsRelative)
+        
+        setParameter(self, 'bridgeFeedRateMinute', runtimeParameters.bridgeFeedRateMinute)
+        setParameter(self, 'perimeterFeedRateMinute', runtimeParameters.perimeterFeedRateMinute)
+        setParameter(self, 'extrusionFeedRateMinute', runtimeParameters.extrusionFeedRateMinute)
+        setParameter(self, 'travelFeedRateMinute', runtimeParameters.travelFeedRateMinute)
+        setParameter(self, 'supportFeedRateMinute', runtimeParameters.supportFeedRateMinute)
+        
+        setParameter(self, 'flowRate', runtimeParameters.flowRate)
+        setParameter(self, 'perimeterFlowRate', runtimeParameters.perimeterFlowRate)
+        setParameter(self, 'bridgeFlowRate', runtimeParameters.bridgeFlowRate)
+        if layerThickness != None:
+            setParameter(self, 'bridgeFlowRate', runtimeParameters.getBridgeFlowRate(layerThickness))
+        
+        setParameter(self, 'oozeRate', runtimeParameters.oozeRate)
+        setParameter(self, 'zDistanceRatio', 5.0)
+        setParameter(self, 'extruderRetractionSpeedMinute', round(60.0 * runtimeParameters.extruderRetractionSpeed, self.dimensionDecimalPlaces))
+        
+        if layerThickness == None:
+            layerThickness = runtimeParameters.layerThickness
+        setParameter(self, 'layerThickness', layerThickness)
+        setParameter(self, 'perimeterWidth', runtimeParameters.perimeterWidth)
+        setParameter(self, 'filamentDiameter', runtimeParameters.filamentDiameter)
+        setParameter(self, 'filamentPackingDensity', runtimeParameters.filamentPackingDensity)
+        filamentRadius = 0.5 * self.filamentDiameter
+        filamentPackingArea = pi * filamentRadius * filamentRadius * self.filamentPackingDensity
+        extrusionArea = pi * self.layerThickness ** 2 / 4 + self.layerThickness * (self.perimeterWidth - self.layerThickness)
+            #http://hydraraptor.blogspot.sk/2011/03/spot-on-flow-rate.html
+        setParameter(self, 'flowScaleSixty', 60.0 * extrusionArea / filamentPackingArea)
+        
+        setParameter(self, 'minimumBridgeFeedRateMultiplier', runtimeParameters.minimumBridgeFeedRateMultiplier)
+        setParameter(self, 'minimumPerimeterFeedRateMultiplier', runtimeParameters.minimumPerimeterFeedRateMultiplier)
+        setParameter(self, 'minimumExtrusionFeedRateMultiplier', runtimeParameters.minimumExtrusionFeedRateMultiplier)
+        setParameter(self, 'minimumTravelFeedRateMultiplier', runtimeParameters.minimumTravelFeedRateMultiplier)
+        setParameter(self, 'minimumLayerFeedRateMinute', runtimeParameters.minimumLayerFeedRateMinute)
+        
+    def __setattr__(self, name, value):
+        raise AttributeError('PathParameters are shared between paths and cannot be changed: %s' % name)
+    
+    def __delattr__(self, name):
+        raise AttributeError('PathParameters are shared between paths and cannot be changed: %s' % name)
+    
+    def __getstate__(self):
+        return dict((name, getattr(self, name)) for name in self.__slots__)
+    
+    def __setstate__(self, state):
+        for (name, value) in state.items():
+            object.__setattr__(self, name, value)
+    
+    def __copy__(self):
+        return self
+    
+    def __deepcopy__(self, memo):
+        return self
+    
+    def __repr__(self):
+        return 'PathParameters(%s)' % ', '.join('%s=%s' % (name, getattr(self, name)) for name in self.__slots__)
\ No newline at end of file
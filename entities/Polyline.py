@@ -0,0 +1,25 @@
+from array import array
+
+class Polyline(list):
+    '''A list of XY points as complex numbers, so the euclidean and intercircle functions read it at the speed of a list.
+        When pickled, as in the exported sliced model, the points are packed as interleaved x and y values in a flat array
+        of doubles instead of a complex object per point.'''
+
+    __slots__ = ()
+
+    def __reduce__(self):
+        coordinates = array('d')
+        for point in self:
+            coordinates.append(point.real)
+            coordinates.append(point.imag)
+        return (getPolylineFromString, (coordinates.tostring(),))
+
+    def offset(self, offset):
+        '''Moves every point by the offset, in place.'''
+        self[:] = [point + offset for point in self]
+
+def getPolylineFromString(coordinatesString):
+    'Get the polyline of the points packed in the string of interleaved x and y doubles.'
+    coordinates = array('d')
+    coordinates.fromstring(coordinatesString)
+    return Polyline(complex(x, y) for (x, y) in zip(coordinates[0 : : 2], coordinates[1 : : 2]))
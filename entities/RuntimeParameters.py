@@ -1,20 +1,21 @@
-from config import config
+from PathParameters import PathParameters
 import time
 from math import pi
 
 class RuntimeParameters:
-    def __init__(self):
+    def __init__(self, profile):
+        self.profile = profile
         self.startTime = time.time()
         self.endTime = None
         self.inputFilename = None
         self.outputFilename = None
         
-        self.profileMemory = config.getboolean('general', 'profile.memory')
+        self.profileMemory = profile.getboolean('general', 'profile.memory')
         
-        self.decimalPlaces = config.getint('general', 'decimal.places')
-        self.layerThickness = config.getfloat('carve', 'layer.height')
-        self.perimeterWidth = config.getfloat('carve', 'extrusion.width')
-        self.profileName = None
+        self.decimalPlaces = profile.getint('general', 'decimal.places')
+        self.layerThickness = profile.getfloat('carve', 'layer.height')
+        self.perimeterWidth = profile.getfloat('carve', 'extrusion.width')
+        self.profileName = profile.name
         self.bridgeWidthMultiplier = None
         self.nozzleDiameter = None
         self.threadSequence = None
@@ -22,45 +23,46 @@ class RuntimeParameters:
         self.operatingFeedRatePerSecond = None
         self.perimeterFeedRatePerSecond = None
         self.operatingFlowRate = None
-        self.verboseGcode = config.getboolean('general', 'verbose.gcode')
-        
-        self.overlapRemovalWidthOverPerimeterWidth = config.getfloat('inset', 'overlap.removal.scaler')
-        self.nozzleDiameter = config.getfloat('inset', 'nozzle.diameter')
-        self.bridgeWidthMultiplier = config.getfloat('inset', 'bridge.width.multiplier.ratio')
-        self.loopOrderAscendingArea = config.getboolean('inset', 'loop.order.preferloops')
-        
-        self.layerHeight = config.getfloat('carve', 'layer.height')
-        self.extrusionWidth = config.getfloat('carve', 'extrusion.width')
-        self.infillBridgeDirection = config.getboolean('carve', 'infill.bridge.direction')
-        self.importCoarsenessRatio = config.getfloat('carve', 'import.coarseness.ratio')
-        self.correctMesh = config.getboolean('carve', 'mesh.correct')
-        self.decimalPlaces = config.getint('general', 'decimal.places')
-        self.layerPrintFrom = config.getint('carve', 'layer.print.from')
-        self.layerPrintTo = config.getint('carve', 'layer.print.to')
-        
-        self.speedActive = config.getboolean('speed', 'active')
-        self.addFlowRate = config.getboolean('speed', 'add.flow.rate')
-        self.addAccelerationRate = config.getboolean('speed', 'add.acceleration.rate')
-        self.feedRate = config.getfloat('speed', 'feed.rate')
-        self.flowRateRatio = config.getfloat('speed', 'flow.rate.ratio')
-        self.accelerationRate = config.getfloat('speed', 'acceleration.rate')
-        self.orbitalFeedRateRatio = config.getfloat('speed', 'feed.rate.orbiting.ratio')
-        self.perimeterFeedRate = config.getfloat('speed', 'feed.rate.perimeter')
-        self.perimeterFlowRateRatio = config.getfloat('speed', 'flow.rate.perimeter.ratio')
-        self.bridgeFeedRateRatio = config.getfloat('speed', 'feed.rate.bridge.ratio')
-        self.bridgeFlowRateRatio = config.getfloat('speed', 'flow.rate.bridge.ratio')
-        self.travelFeedRate = config.getfloat('speed', 'feed.rate.travel')
-        self.supportFeedRate = config.getfloat('speed', 'feed.rate.support')
-        
-        self.dimensionActive = config.getboolean('dimension', 'active')
-        self.filamentDiameter = config.getfloat('dimension', 'filament.diameter')
-        self.filamentPackingDensity = config.getfloat('dimension', 'filament.packing.density')
-        self.oozeRate = config.getfloat('dimension', 'oozerate')
-        self.extruderRetractionSpeed = config.getfloat('dimension', 'extruder.retraction.speed')
-        self.extrusionUnitsRelative = config.getboolean('dimension', 'extrusion.units.relative')
-        self.dimensionDecimalPlaces = config.getint('dimension', 'decimal.places')
-        
-        self.extrusionPrintOrder = config.get('fill', 'extrusion.sequence.print.order').split(',')
+        self.verboseGcode = profile.getboolean('general', 'verbose.gcode')
+        
+        self.overlapRemovalWidthOverPerimeterWidth = profile.getfloat('inset', 'overlap.removal.scaler')
+        self.nozzleDiameter = profile.getfloat('inset', 'nozzle.diameter')
+        self.bridgeWidthMultiplier = profile.getfloat('inset', 'bridge.width.multiplier.ratio')
+        self.loopOrderAscendingArea = profile.getboolean('inset', 'loop.order.preferloops')
+        
+        self.layerHeight = profile.getfloat('carve', 'layer.height')
+        self.extrusionWidth = profile.getfloat('carve', 'extrusion.width')
+        self.infillBridgeDirection = profile.getboolean('carve', 'infill.bridge.direction')
+        self.importCoarsenessRatio = profile.getfloat('carve', 'import.coarseness.ratio')
+        self.correctMesh = profile.getboolean('carve', 'mesh.correct')
+        self.decimalPlaces = profile.getint('general', 'decimal.places')
+        self.layerPrintFrom = profile.getint('carve', 'layer.print.from')
+        self.layerPrintTo = profile.getint('carve', 'layer.print.to')
+        self.identicalLayersReuse = profile.getboolean('carve', 'identical.layers.reuse')
+        
+        self.speedActive = profile.getboolean('speed', 'active')
+        self.addFlowRate = profile.getboolean('speed', 'add.flow.rate')
+        self.addAccelerationRate = profile.getboolean('speed', 'add.acceleration.rate')
+        self.feedRate = profile.getfloat('speed', 'feed.rate')
+        self.flowRateRatio = profile.getfloat('speed', 'flow.rate.ratio')
+        self.accelerationRate = profile.getfloat('speed', 'acceleration.rate')
+        self.orbitalFeedRateRatio = profile.getfloat('speed', 'feed.rate.orbiting.ratio')
+        self.perimeterFeedRate = profile.getfloat('speed', 'feed.rate.perimeter')
+        self.perimeterFlowRateRatio = profile.getfloat('speed', 'flow.rate.perimeter.ratio')
+        self.bridgeFeedRateRatio = profile.getfloat('speed', 'feed.rate.bridge.ratio')
+        self.bridgeFlowRateRatio = profile.getfloat('speed', 'flow.rate.bridge.ratio')
+        self.travelFeedRate = profile.getfloat('speed', 'feed.rate.travel')
+        self.supportFeedRate = profile.getfloat('speed', 'feed.rate.support')
+        
+        self.dimensionActive = profile.getboolean('dimension', 'active')
+        self.filamentDiameter = profile.getfloat('dimension', 'filament.diameter')
+        self.filamentPackingDensity = profile.getfloat('dimension', 'filament.packing.density')
+        self.oozeRate = profile.getfloat('dimension', 'oozerate')
+        self.extruderRetractionSpeed = profile.getfloat('dimension', 'extruder.retraction.speed')
+        self.extrusionUnitsRelative = profile.getboolean('dimension', 'extrusion.units.relative')
+        self.dimensionDecimalPlaces = profile.getint('dimension', 'decimal.places')
+        
+        self.extrusionPrintOrder = profile.get('fill', 'extrusion.sequence.print.order').split(',')
         
         self.bridgeFeedRateMinute = self.bridgeFeedRateRatio * self.perimeterFeedRate * 60 # todo former reference to main feed now perimeter feed
         self.perimeterFeedRateMinute = self.perimeterFeedRate * 60
@@ -69,7 +71,7 @@ class RuntimeParameters:
         
         self.supportFeedRateMinute = self.supportFeedRate * 60
         
-        self.minimumLayerFeedRate = config.getfloat('cool', 'minimum.layer.feed.rate')
+        self.minimumLayerFeedRate = profile.getfloat('cool', 'minimum.layer.feed.rate')
         self.minimumLayerFeedRateMinute = self.minimumLayerFeedRate * 60
         
         self.minimumBridgeFeedRateMultiplier = self.minimumLayerFeedRateMinute / self.bridgeFeedRateMinute
@@ -77,14 +79,33 @@ class RuntimeParameters:
         self.minimumExtrusionFeedRateMultiplier = self.minimumLayerFeedRateMinute / self.extrusionFeedRateMinute
         self.minimumTravelFeedRateMultiplier = self.minimumLayerFeedRateMinute / self.travelFeedRateMinute
         
-        nozzleXsection = (self.nozzleDiameter / 2) ** 2 * pi
-        extrusionXsection = ((abs(self.perimeterWidth) + self.layerThickness) / 4) ** 2 * pi
-        
         self.flowRate = self.flowRateRatio * self.feedRate
-        self.bridgeFlowRate = (self.bridgeFlowRateRatio * self.bridgeFeedRateRatio) * (self.perimeterFlowRateRatio * self.perimeterFeedRate) * (nozzleXsection / extrusionXsection)
+        self.bridgeFlowRate = self.getBridgeFlowRate(self.layerThickness)
         self.perimeterFlowRate = self.perimeterFlowRateRatio * self.perimeterFeedRate
         
         self.orbitalFeedRateSecond = (self.feedRate * self.orbitalFeedRateRatio)
         self.orbitalFeedRateMinute = self.orbitalFeedRateSecond * 60
         
-        self.combActive = config.getboolean('comb', 'active')
+        self.combActive = profile.getboolean('comb', 'active')
+        
+        self.pathParameters = None
+        self.layerPathParameters = {}
+        
+    def getBridgeFlowRate(self, layerThickness):
+        '''Returns the bridge flow rate of a layer of the thickness.'''
+        nozzleXsection = (self.nozzleDiameter / 2) ** 2 * pi
+        extrusionXsection = ((abs(self.perimeterWidth) + layerThickness) / 4) ** 2 * pi
+        return (self.bridgeFlowRateRatio * self.bridgeFeedRateRatio) * (self.perimeterFlowRateRatio * self.perimeterFeedRate) * (nozzleXsection / extrusionXsection)
+        
+    def getPathParameters(self, layerThickness=None):
+        '''Returns the parameters shared by all the paths, built on first use.
+            Paths of a layer with its own thickness get the parameters built for that thickness.'''
+        if getattr(self, 'pathParameters', None) == None:
+            self.pathParameters = PathParameters(self)
+        if layerThickness == None or layerThickness == self.layerThickness:
+            return self.pathParameters
+        if getattr(self, 'layerPathParameters', None) == None:
+            self.layerPathParameters = {}
+        if layerThickness not in self.layerPathParameters:
+            self.layerPathParameters[layerThickness] = PathParameters(self, layerThickness)
+        return self.layerPathParameters[layerThickness]
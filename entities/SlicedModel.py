@@ -1,4 +1,3 @@
-from config import config
 from StringIO import StringIO
 import gcodes
 import math
@@ -10,9 +9,9 @@ from GcodeCommand import GcodeCommand
 class SlicedModel:
     '''Runtime data for conversion of 3D model to gcode.'''
     
-    def __init__(self):
+    def __init__(self, profile):
 
-        self.runtimeParameters = RuntimeParameters()
+        self.runtimeParameters = RuntimeParameters(profile)
         self.layers = []
         
         self.startGcodeCommands = []
@@ -1,6 +1,9 @@
 from .NestedRing import NestedRing
 from .GcodeCommand import GcodeCommand
+from .ExtruderState import ExtruderState
+from .PathParameters import PathParameters
+from .Polyline import Polyline
 from .Layer import Layer
-from .paths import BoundaryPerimeter, Loop, InfillPath, TravelPath, SupportPath
+from .paths import BoundaryPerimeter, Loop, InfillPath, CombinedInfillPath, TravelPath, SupportPath
 from .SlicedModel import SlicedModel
 from .RuntimeParameters import RuntimeParameters
@@ -1,72 +1,53 @@
+from ExtruderState import ExtruderState
 from GcodeCommand import GcodeCommand
+from Polyline import Polyline
 from StringIO import StringIO
-from config import config
 from fabmetheus_utilities.vector3 import Vector3
-from math import pi
 from utilities import memory_tracker
 import gcodes
+import logging
 import math
 import sys
 import time
 
-# globals used as an easy way to maintain state between layer changes
-_totalExtrusionDistance = 0.0
-_previousPoint = None
+logger = logging.getLogger(__name__)
 
-def resetExtrusionStats():
-    global _previousPoint    
-    _previousPoint = None
+def getTrapezoidalDuration(distance, feedRateSecond, accelerationRate):
+    '''Returns the time to move the distance from rest to rest, accelerating up to the feed rate and decelerating at the acceleration rate.'''
+    accelerationDistance = feedRateSecond * feedRateSecond / accelerationRate
+    if distance < accelerationDistance:
+        # Triangular profile, the feed rate is never reached
+        return 2.0 * math.sqrt(distance / accelerationRate)
+    return distance / feedRateSecond + feedRateSecond / accelerationRate
+    
+class Path(object):
+    ''' A Path the tool will follow within a nested ring.
+        The parameters are shared with all other paths, so a path only holds its own z, type and points.'''
+    
+    __slots__ = ('z', 'type', 'startPoint', 'points', 'gcodeCommands', 'parameters')
     
-class Path:
-    ''' A Path the tool will follow within a nested ring.'''
     def __init__(self, z, runtimeParameters):
         
         self.z = z
         
         self.type = None
         self.startPoint = None
-        self.points = []
+        self.points = Polyline()
         self.gcodeCommands = []
         
-        self._setParameters(runtimeParameters)
-        
-    def _setParameters(self, runtimeParameters):
-        self.decimalPlaces = runtimeParameters.decimalPlaces
-        self.dimensionDecimalPlaces = runtimeParameters.dimensionDecimalPlaces
-        self.speedActive = runtimeParameters.speedActive
-        self.bridgeFeedRateMinute = runtimeParameters.bridgeFeedRateMinute
-        self.perimeterFeedRateMinute = runtimeParameters.perimeterFeedRateMinute
-        self.extrusionFeedRateMinute = runtimeParameters.extrusionFeedRateMinute
-        self.travelFeedRateMinute = runtimeParameters.travelFeedRateMinute
-        self.extrusionUnitsRelative = runtimeParameters.extrusionUnitsRelative
-        self.supportFeedRateMinute = runtimeParameters.supportFeedRateMinute
-        
-        self.dimensionActive = runtimeParameters.dimensionActive
+        self.parameters = runtimeParameters.getPathParameters()
         
-        self.oozeRate = runtimeParameters.oozeRate
-        self.zDistanceRatio = 5.0
-        self.extruderRetractionSpeedMinute = round(60.0 * runtimeParameters.extruderRetractionSpeed, self.dimensionDecimalPlaces)
-
-        self.layerThickness = runtimeParameters.layerThickness
-        self.perimeterWidth = runtimeParameters.perimeterWidth
-        self.filamentDiameter = runtimeParameters.filamentDiameter
-        self.filamentPackingDensity = runtimeParameters.filamentPackingDensity
-        self.absolutePositioning = config.getboolean('preface', 'positioning.absolute')
-        self.flowRate = runtimeParameters.flowRate
-        self.perimeterFlowRate = runtimeParameters.perimeterFlowRate
-        self.bridgeFlowRate = runtimeParameters.bridgeFlowRate
-        self.combActive = runtimeParameters.combActive
-        filamentRadius = 0.5 * self.filamentDiameter
-        filamentPackingArea = pi * filamentRadius * filamentRadius * self.filamentPackingDensity
-        extrusionArea = pi * self.layerThickness ** 2 / 4 + self.layerThickness * (self.perimeterWidth - self.layerThickness)
-            #http://hydraraptor.blogspot.sk/2011/03/spot-on-flow-rate.html
-        self.flowScaleSixty = 60.0 * extrusionArea / filamentPackingArea
-        
-        self.minimumBridgeFeedRateMultiplier = runtimeParameters.minimumBridgeFeedRateMultiplier
-        self.minimumPerimeterFeedRateMultiplier = runtimeParameters.minimumPerimeterFeedRateMultiplier
-        self.minimumExtrusionFeedRateMultiplier = runtimeParameters.minimumExtrusionFeedRateMultiplier
-        self.minimumTravelFeedRateMultiplier = runtimeParameters.minimumTravelFeedRateMultiplier
-        self.minimumLayerFeedRateMinute = runtimeParameters.minimumLayerFeedRateMinute
+    def __getstate__(self):
+        state = {}
+        for cls in type(self).__mro__:
+            for name in getattr(cls, '__slots__', ()):
+                if hasattr(self, name):
+                    state[name] = getattr(self, name)
+        return state
+    
+    def __setstate__(self, state):
+        for (name, value) in state.items():
+            setattr(self, name, value)
         
     def __str__(self):
         '''Get the string representation.'''
@@ -79,10 +60,14 @@ class Path:
             output.write('%16s%s' % ('', GcodeCommand.printCommand(command)))
         return output.getvalue()    
     
-    def getDistanceAndDuration(self):
-        '''Returns the time taken to follow the path and the distance'''
+    def getDistanceAndDuration(self, feedRateMultiplier=None, accelerationRate=0.0):
+        '''Returns the time taken to follow the path and the distance, at the feed rate of the path when no multiplier is given.
+            Optionally applies the layer feed rate multiplier, limited to the minimum layer feed rate as in the gcode,
+            and a trapezoidal acceleration profile per segment.'''
         oldLocation = self.startPoint
         feedRate = self.getFeedRateMinute()
+        if feedRateMultiplier != None:
+            (feedRate, feedRateMultiplier) = self.getFeedRateAndMultiplier(feedRate, feedRateMultiplier)
         feedRateSecond = feedRate / 60.0
         duration = 0.0
         distance = 0.0
@@ -92,11 +77,23 @@ class Path:
             separationY = point.imag - oldLocation.imag
             segmentDistance = math.sqrt(separationX ** 2 + separationY ** 2)
             
-            duration += segmentDistance / feedRateSecond
+            if accelerationRate > 0.0:
+                duration += getTrapezoidalDuration(segmentDistance, feedRateSecond, accelerationRate)
+            else:
+                duration += segmentDistance / feedRateSecond
             distance += segmentDistance
             oldLocation = point
                 
         return (distance, duration)
+    
+    def getFilamentLength(self, distance, feedAndFlowRateMultiplier=[1.0, 1.0], layerParameters=None):
+        '''Returns the length of filament fed into the extruder to extrude the given distance of this path.
+            The flow scale of the layer parameters is used when given, for a layer with its own thickness.'''
+        (feedRateMinute, feedRateMultiplier) = self.getFeedRateAndMultiplier(self.getFeedRateMinute(), feedAndFlowRateMultiplier[0])
+        flowScaleSixty = self.parameters.flowScaleSixty
+        if layerParameters != None:
+            flowScaleSixty = layerParameters.flowScaleSixty
+        return self.getFlowRate() * feedAndFlowRateMultiplier[1] * flowScaleSixty / feedRateMinute * distance
         
     def getStartPoint(self):
         return self.startPoint
@@ -109,39 +106,43 @@ class Path:
         
     def getFeedRateMinute(self):
         '''Allows subclasses to override the relevant feedrate method so we don't have to use large if statements.'''
-        return self.extrusionFeedRateMinute
+        return self.parameters.extrusionFeedRateMinute
     
     def getFlowRate(self):
         '''Allows subclasses to override the relevant flowrate method so we don't have to use large if statements.'''
-        return self.flowRate
+        return self.parameters.flowRate
 
-    def generateGcode(self, lookaheadStartVector=None, feedAndFlowRateMultiplier=[1.0, 1.0], runtimeParameters=None):
-        'Transforms paths and points to gcode'
-        global _previousPoint
+    def generateGcode(self, lookaheadStartVector=None, feedAndFlowRateMultiplier=[1.0, 1.0], runtimeParameters=None, extruderState=None, layerThickness=None):
+        '''Transforms paths and points to gcode.
+            The extruder state carries the extruder position and distance from path to path, a new one is used if none is given.
+            The layer thickness is given for a layer sliced with its own thickness, so the extrusion follows it.'''
         self.gcodeCommands = []
         
         if runtimeParameters != None:
-            self._setParameters(runtimeParameters)
+            self.parameters = runtimeParameters.getPathParameters(layerThickness)
         
-        if _previousPoint == None:
-            _previousPoint = self.startPoint
+        if extruderState == None:
+            extruderState = ExtruderState()
+        
+        if extruderState.previousPoint == None:
+            extruderState.previousPoint = self.startPoint
         
         for point in self.points:
             
-            gcodeArgs = [('X', round(point.real, self.decimalPlaces)),
-                         ('Y', round(point.imag, self.decimalPlaces)),
-                         ('Z', round(self.z, self.decimalPlaces))]
+            gcodeArgs = [('X', round(point.real, self.parameters.decimalPlaces)),
+                         ('Y', round(point.imag, self.parameters.decimalPlaces)),
+                         ('Z', round(self.z, self.parameters.decimalPlaces))]
             
             pathFeedRateMinute = self.getFeedRateMinute()
             flowRate = self.getFlowRate()
             
             (pathFeedRateMinute, pathFeedRateMultiplier) = self.getFeedRateAndMultiplier(pathFeedRateMinute, feedAndFlowRateMultiplier[0])
             
-            if self.speedActive:
+            if self.parameters.speedActive:
                 gcodeArgs.append(('F', pathFeedRateMinute))
                 
-            if self.dimensionActive:
-                extrusionDistance = self.getExtrusionDistance(point, flowRate * feedAndFlowRateMultiplier[1], pathFeedRateMinute)
+            if self.parameters.dimensionActive:
+                extrusionDistance = self.getExtrusionDistance(point, flowRate * feedAndFlowRateMultiplier[1], pathFeedRateMinute, extruderState)
                 gcodeArgs.append(('E', '%s' % extrusionDistance))
                 
             self.gcodeCommands.append(
@@ -149,78 +150,103 @@ class Path:
         
     def getFeedRateAndMultiplier(self, feedRateMinute, feedRateMultiplier):
         'Returns the multiplier that results in either the minimum feed rate or the slowed down feed rate'
-        if (feedRateMultiplier * feedRateMinute) < self.minimumLayerFeedRateMinute:
-            return (self.minimumLayerFeedRateMinute, self.minimumLayerFeedRateMinute / feedRateMinute)
+        if (feedRateMultiplier * feedRateMinute) < self.parameters.minimumLayerFeedRateMinute:
+            return (self.parameters.minimumLayerFeedRateMinute, self.parameters.minimumLayerFeedRateMinute / feedRateMinute)
         else:
             return (feedRateMinute * feedRateMultiplier, feedRateMultiplier)
     
-    def getResetExtruderDistanceCommand(self):
-        global _totalExtrusionDistance
-        _totalExtrusionDistance = 0.0
+    def getResetExtruderDistanceCommand(self, extruderState):
+        extruderState.resetExtrusionDistance()
         return GcodeCommand(gcodes.RESET_EXTRUDER_DISTANCE, [('E', '0')])
         
 
-    def getExtrusionDistance(self, point, flowRate, feedRateMinute):
-        global _totalExtrusionDistance
-        global _previousPoint
+    def getExtrusionDistance(self, point, flowRate, feedRateMinute, extruderState):
         distance = 0.0        
         
-        if self.absolutePositioning:
-            if _previousPoint != None:
-                distance = abs(point - _previousPoint)
-            _previousPoint = point
+        if self.parameters.absolutePositioning:
+            if extruderState.previousPoint != None:
+                distance = abs(point - extruderState.previousPoint)
+            extruderState.previousPoint = point
         else:
-            if _previousPoint == None:
+            if extruderState.previousPoint == None:
                 logger.warning('There was no absolute location when the G91 command was parsed, so the absolute location will be set to the origin.')
-                _previousPoint = Vector3()
+                extruderState.previousPoint = Vector3()
             distance = abs(point)
-            _previousPoint += point            
+            extruderState.previousPoint += point            
         
-        scaledFlowRate = flowRate * self.flowScaleSixty
+        scaledFlowRate = flowRate * self.parameters.flowScaleSixty
         extrusionDistance = scaledFlowRate / feedRateMinute * distance
         
-        if self.extrusionUnitsRelative:
-            extrusionDistance = round(extrusionDistance, self.dimensionDecimalPlaces)
+        if self.parameters.extrusionUnitsRelative:
+            extrusionDistance = round(extrusionDistance, self.parameters.dimensionDecimalPlaces)
         else:
-            _totalExtrusionDistance += extrusionDistance
-            extrusionDistance = round(_totalExtrusionDistance, self.dimensionDecimalPlaces)
+            extruderState.totalExtrusionDistance += extrusionDistance
+            extrusionDistance = round(extruderState.totalExtrusionDistance, self.parameters.dimensionDecimalPlaces)
             
         return extrusionDistance
 
     def offset(self, offset):
         if self.startPoint != None:
             self.startPoint = complex(self.startPoint.real + offset.real, self.startPoint.imag + offset.imag)
-        for (index, point) in enumerate(self.points):
-            self.points[index] = complex(point.real + offset.real, point.imag + offset.imag)
+        self.points.offset(offset)
 
+    def getCopyAtZ(self, z):
+        '''Returns a copy of the path at the z, with its own points so it can be offset apart from the path.'''
+        pathCopy = type(self).__new__(type(self))
+        pathCopy.__setstate__(self.__getstate__())
+        pathCopy.z = z
+        pathCopy.points = Polyline(self.points)
+        pathCopy.gcodeCommands = []
+        return pathCopy
+    
     def addPath(self, path):
         'Add a path to the output.'
         if len(path) > 0:        
             self.startPoint = path[0]
-            self.points = path[1 :]
+            self.points = Polyline(path[1 :])
         else:
             logger.warning('Zero length vertex positions array which was skipped over, this should never happen.')
         if len(path) < 2:
             logger.warning('Path of only one point: %s, this should never happen.', path)
 
 class Loop(Path):
+    __slots__ = ()
+    
     def __init__(self, z, runtimeParameters):
         Path.__init__(self, z, runtimeParameters)
 
 class InfillPath(Path):
+    __slots__ = ()
+    
     def __init__(self, z, runtimeParameters):        
         Path.__init__(self, z, runtimeParameters)
             
+class CombinedInfillPath(InfillPath):
+    '''Sparse infill printed once for several layers, extruding the volume of all the layers it stands in for.'''
+    
+    __slots__ = ('combinedLayerCount',)
+    
+    def __init__(self, z, runtimeParameters, combinedLayerCount):
+        InfillPath.__init__(self, z, runtimeParameters)
+        self.combinedLayerCount = combinedLayerCount
+        
+    def getFlowRate(self):
+        return self.parameters.flowRate * self.combinedLayerCount
+            
 class SupportPath(Path):
+    __slots__ = ()
+    
     def __init__(self, z, runtimeParameters):        
         Path.__init__(self, z, runtimeParameters)
 
     def getFeedRateMinute(self):
-        return self.supportFeedRateMinute
+        return self.parameters.supportFeedRateMinute
     
 class TravelPath(Path):
     '''Moves from one path to another without extruding. Optionally dodges gaps (comb) and retracts (dimension)'''
     
+    __slots__ = ('fromLocation', 'toLocation', 'combSkein')
+    
     def __init__(self, z, runtimeParameters, fromLocation, toLocation, combSkein):
         Path.__init__(self, z, runtimeParameters)
         self.fromLocation = fromLocation
@@ -248,14 +274,13 @@ class TravelPath(Path):
         output.write(Path.__str__(self))
         return output.getvalue()
 
-    def moveToStartPoint(self, feedAndFlowRateMultiplier):
+    def moveToStartPoint(self, feedAndFlowRateMultiplier, extruderState):
         '''Adds gcode to move the nozzle to the startpoint of the path. 
             If comb is active the path will dodge all open spaces.
         '''
         startPointPath = []
-        global _previousPoint
         
-        if self.combActive and self.fromLocation != None and self.combSkein != None: 
+        if self.parameters.combActive and self.fromLocation != None and self.combSkein != None: 
             
             additionalCommands = self.combSkein.getPathsBetween(self.z, self.fromLocation.dropAxis(), self.toLocation.dropAxis())
             startPointPath.extend(additionalCommands)
@@ -263,99 +288,101 @@ class TravelPath(Path):
         startPointPath.append(self.toLocation.dropAxis())
         
         for point in startPointPath:
-            gcodeArgs = [('X', round(point.real, self.decimalPlaces)),
-                ('Y', round(point.imag, self.decimalPlaces)),
-                ('Z', round(self.z, self.decimalPlaces))]
+            gcodeArgs = [('X', round(point.real, self.parameters.decimalPlaces)),
+                ('Y', round(point.imag, self.parameters.decimalPlaces)),
+                ('Z', round(self.z, self.parameters.decimalPlaces))]
             
-            if self.speedActive:
-                travelFeedRateMinute, travelFeedRateMultiplier = self.getFeedRateAndMultiplier(self.travelFeedRateMinute, feedAndFlowRateMultiplier)
-                gcodeArgs.append(('F', self.travelFeedRateMinute * travelFeedRateMultiplier))
+            if self.parameters.speedActive:
+                travelFeedRateMinute, travelFeedRateMultiplier = self.getFeedRateAndMultiplier(self.parameters.travelFeedRateMinute, feedAndFlowRateMultiplier)
+                gcodeArgs.append(('F', self.parameters.travelFeedRateMinute * travelFeedRateMultiplier))
             
-            if self.absolutePositioning:
-                _previousPoint = point
+            if self.parameters.absolutePositioning:
+                extruderState.previousPoint = point
             else:
-                _previousPoint += point            
+                extruderState.previousPoint += point            
                 
             self.gcodeCommands.append(GcodeCommand(gcodes.LINEAR_GCODE_MOVEMENT, gcodeArgs))
                         
-    def generateGcode(self, lookaheadStartVector=None, feedAndFlowRateMultiplier=[1.0, 1.0], runtimeParameters=None):
+    def generateGcode(self, lookaheadStartVector=None, feedAndFlowRateMultiplier=[1.0, 1.0], runtimeParameters=None, extruderState=None, layerThickness=None):
         'Transforms paths and points to gcode'
         lastRetractionExtrusionDistance = 0.0
-        global _previousPoint
         
         if runtimeParameters != None:
-            self._setParameters(runtimeParameters)
+            self.parameters = runtimeParameters.getPathParameters(layerThickness)
+        
+        if extruderState == None:
+            extruderState = ExtruderState()
             
-        if _previousPoint == None:
-            _previousPoint = self.startPoint
+        if extruderState.previousPoint == None:
+            extruderState.previousPoint = self.startPoint
         
-        if self.dimensionActive:
+        if self.parameters.dimensionActive:
             
-            if lookaheadStartVector != None and self.fromLocation != None:
-                
-                toLocation = lookaheadStartVector
-                locationMinusOld = toLocation - self.fromLocation
-                xyTravel = abs(locationMinusOld.dropAxis())
-                zTravelMultiplied = locationMinusOld.z * self.zDistanceRatio
-                timeToNextThread = math.sqrt(xyTravel * xyTravel + zTravelMultiplied * zTravelMultiplied) / self.extrusionFeedRateMinute * 60
-                retractionExtrusionDistance = timeToNextThread * abs(self.oozeRate) / 60
-            else:
-                retractionExtrusionDistance = 0.0
+            retractionExtrusionDistance = self.getRetractionExtrusionDistance(lookaheadStartVector)
             
-            self.gcodeCommands.extend(self.getRetractCommands(retractionExtrusionDistance, self.getFeedRateMinute()))
+            self.gcodeCommands.extend(self.getRetractCommands(retractionExtrusionDistance, self.getFeedRateMinute(), extruderState))
             
             #Store for reverse retraction
             lastRetractionExtrusionDistance = retractionExtrusionDistance
             
         self.gcodeCommands.append(GcodeCommand(gcodes.TURN_EXTRUDER_OFF))
         
-        self.moveToStartPoint(feedAndFlowRateMultiplier[0])
+        self.moveToStartPoint(feedAndFlowRateMultiplier[0], extruderState)
     
-        if self.dimensionActive:
-            #_previousPoint = self.startPoint            
-            self.gcodeCommands.extend(self.getRetractReverseCommands(lastRetractionExtrusionDistance))
+        if self.parameters.dimensionActive:
+            self.gcodeCommands.extend(self.getRetractReverseCommands(lastRetractionExtrusionDistance, extruderState))
             
         self.gcodeCommands.append(GcodeCommand(gcodes.TURN_EXTRUDER_ON))        
         
-    def getRetractCommands(self, extrusionDistance, resumingSpeed):
-        global _totalExtrusionDistance
+    def getRetractionExtrusionDistance(self, lookaheadStartVector=None):
+        '''Returns the distance the filament is retracted before travelling, based on the ooze rate and the time to the next thread.'''
+        if lookaheadStartVector == None or self.fromLocation == None:
+            return 0.0
+        locationMinusOld = lookaheadStartVector - self.fromLocation
+        xyTravel = abs(locationMinusOld.dropAxis())
+        zTravelMultiplied = locationMinusOld.z * self.parameters.zDistanceRatio
+        timeToNextThread = math.sqrt(xyTravel * xyTravel + zTravelMultiplied * zTravelMultiplied) / self.parameters.extrusionFeedRateMinute * 60
+        return timeToNextThread * abs(self.parameters.oozeRate) / 60
+    
+    def getRetractCommands(self, extrusionDistance, resumingSpeed, extruderState):
         commands = []
-        if self.extrusionUnitsRelative:
-            retractDistance = round(-extrusionDistance, self.dimensionDecimalPlaces)
+        if self.parameters.extrusionUnitsRelative:
+            retractDistance = round(-extrusionDistance, self.parameters.dimensionDecimalPlaces)
         else:
-            _totalExtrusionDistance -= extrusionDistance
-            retractDistance = round(_totalExtrusionDistance, self.dimensionDecimalPlaces)
+            extruderState.totalExtrusionDistance -= extrusionDistance
+            retractDistance = round(extruderState.totalExtrusionDistance, self.parameters.dimensionDecimalPlaces)
     
-        commands.append(GcodeCommand(gcodes.LINEAR_GCODE_MOVEMENT, [('F', '%s' % self.extruderRetractionSpeedMinute)]))
+        commands.append(GcodeCommand(gcodes.LINEAR_GCODE_MOVEMENT, [('F', '%s' % self.parameters.extruderRetractionSpeedMinute)]))
         commands.append(GcodeCommand(gcodes.LINEAR_GCODE_MOVEMENT, [('E', '%s' % retractDistance)]))
         commands.append(GcodeCommand(gcodes.LINEAR_GCODE_MOVEMENT, [('F', '%s' % resumingSpeed)]))
         return commands
     
-    def getRetractReverseCommands(self, extrusionDistance):
-        global _totalExtrusionDistance
+    def getRetractReverseCommands(self, extrusionDistance, extruderState):
         commands = []
-        if self.extrusionUnitsRelative:
-            retractDistance = round(extrusionDistance, self.dimensionDecimalPlaces)
+        if self.parameters.extrusionUnitsRelative:
+            retractDistance = round(extrusionDistance, self.parameters.dimensionDecimalPlaces)
         else:
-            _totalExtrusionDistance += extrusionDistance
-            retractDistance = round(_totalExtrusionDistance, self.dimensionDecimalPlaces)
+            extruderState.totalExtrusionDistance += extrusionDistance
+            retractDistance = round(extruderState.totalExtrusionDistance, self.parameters.dimensionDecimalPlaces)
     
-        commands.append(GcodeCommand(gcodes.LINEAR_GCODE_MOVEMENT, [('F', '%s' % self.extruderRetractionSpeedMinute)]))
+        commands.append(GcodeCommand(gcodes.LINEAR_GCODE_MOVEMENT, [('F', '%s' % self.parameters.extruderRetractionSpeedMinute)]))
         commands.append(GcodeCommand(gcodes.LINEAR_GCODE_MOVEMENT, [('E', '%s' % retractDistance)]))
-        commands.append(GcodeCommand(gcodes.LINEAR_GCODE_MOVEMENT, [('F', '%s' % self.travelFeedRateMinute)]))
+        commands.append(GcodeCommand(gcodes.LINEAR_GCODE_MOVEMENT, [('F', '%s' % self.parameters.travelFeedRateMinute)]))
                         
-        if not self.extrusionUnitsRelative:
-            commands.append(self.getResetExtruderDistanceCommand())
+        if not self.parameters.extrusionUnitsRelative:
+            commands.append(self.getResetExtruderDistanceCommand(extruderState))
         return commands        
     
     def getFeedRateMinute(self):
-        return self.travelFeedRateMinute
+        return self.parameters.travelFeedRateMinute
     
 class BoundaryPerimeter(Path):
     
+    __slots__ = ('boundaryPoints',)
+    
     def __init__(self, z, runtimeParameters):
         Path.__init__(self, z, runtimeParameters)
-        self.boundaryPoints = []
+        self.boundaryPoints = Polyline()
 
     def __str__(self):
         output = StringIO()
@@ -365,13 +392,11 @@ class BoundaryPerimeter(Path):
         return output.getvalue()
     
     def offset(self, offset):
-        for boundaryPoint in self.boundaryPoints:
-            boundaryPoint.x += offset.real
-            boundaryPoint.y += offset.imag            
+        self.boundaryPoints.offset(offset)
         Path.offset(self, offset)
         
     def getFeedRateMinute(self):
-        return self.perimeterFeedRateMinute
+        return self.parameters.perimeterFeedRateMinute
     
     def getFlowRate(self):
-        return self.perimeterFlowRate
\ No newline at end of file
+        return self.parameters.perimeterFlowRate
\ No newline at end of file
@@ -133,6 +133,20 @@ def getFileTextInFileDirectory(fileInDirectory, fileName, readMode='r'):
 	absoluteFilePathInFileDirectory = os.path.join(os.path.dirname(fileInDirectory), fileName)
 	return getFileText(absoluteFilePathInFileDirectory, True, readMode)
 
+def getFileTextLines(fileName, printWarning=True):
+	'Get the lines of text of a file one at a time, so that a large file does not have to be read all at once.'
+	try:
+		file = open(fileName, 'rU')
+	except IOError:
+		if printWarning:
+			print('The file ' + fileName + ' does not exist.')
+		return
+	try:
+		for line in file:
+			yield line.rstrip('\n')
+	finally:
+		file.close()
+
 def getFilesWithFileTypesWithoutWords(fileTypes, words = [], fileInDirectory=''):
 	'Get files which have a given file type, but with do not contain a word in a list.'
 	filesWithFileTypes = []
@@ -219,6 +233,16 @@ def getModuleWithPath(path):
 	'Get the module from the path.'
 	return getModuleWithDirectoryPath(os.path.dirname(path), os.path.basename(path))
 
+def getNumbersFromLines(lines, numbersPerLine, converter=float):
+	'Get the numbers of lines which each hold numbersPerLine numbers, tokenized as one block, or None if the lines hold other words.'
+	words = ' '.join(lines).split()
+	if len(words) != numbersPerLine * len(lines):
+		return None
+	try:
+		return map(converter, words)
+	except ValueError:
+		return None
+
 def getPluginFileNamesFromDirectoryPath(directoryPath):
 	'Get the file names of the python plugins in the directory path.'
 	fileInDirectory = os.path.join(directoryPath, '__init__.py')
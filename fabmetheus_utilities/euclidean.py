@@ -380,6 +380,20 @@ def addXIntersectionsFromLoopsForTable(loops, xIntersectionsTable, width):
 	for loop in loops:
 		addXIntersectionsFromLoopForTable(loop, xIntersectionsTable, width)
 
+def areLoopsIdentical(loops, otherLoops):
+	'Determine if the loops have exactly the same points.'
+	if len(loops) != len(otherLoops):
+		return False
+	for loopIndex in xrange(len(loops)):
+		loop = loops[loopIndex]
+		otherLoop = otherLoops[loopIndex]
+		if len(loop) != len(otherLoop):
+			return False
+		for (point, otherPoint) in zip(loop, otherLoop):
+			if point != otherPoint:
+				return False
+	return True
+
 def compareSegmentLength(endpoint, otherEndpoint):
 	'Get comparison in order to sort endpoints in ascending order of segment length.'
 	if endpoint.segmentLength > otherEndpoint.segmentLength:
@@ -1182,6 +1196,16 @@ def getLoopLength(polygon):
 		polygonLength += abs(point - secondPoint)
 	return polygonLength
 
+def getLoopsHash(loops):
+	'Get a hash of the exact points of the loops. Loops with the same hash still have to be compared with areLoopsIdentical.'
+	coordinates = []
+	for loop in loops:
+		coordinates.append(len(loop))
+		for point in loop:
+			coordinates.append(point.real)
+			coordinates.append(point.imag)
+	return hash(tuple(coordinates))
+
 def getLoopStartingNearest(extrusionHalfWidth, location, loop):
 	'Add to threads from the last location from loop.'
 	nearestIndex = getNearestDistanceIndex(location, loop).index
@@ -1235,16 +1259,15 @@ def getMaximumByComplexPaths(paths):
 def getMaximumByVector3Path(path):
 	'Get a vector3 with each component the maximum of the respective components of a vector3 path.'
 	maximum = Vector3(-987654321.0, -987654321.0, -987654321.0)
-	for point in path:
-		maximum.maximize(point)
+	if len(path) > 0:
+		maximum.maximize(Vector3(max([point.x for point in path]), max([point.y for point in path]), max([point.z for point in path])))
 	return maximum
 
 def getMaximumByVector3Paths(paths):
 	'Get a complex with each component the maximum of the respective components of a complex path.'
 	maximum = Vector3(-987654321.0, -987654321.0, -987654321.0)
 	for path in paths:
-		for point in path:
-			maximum.maximize(point)
+		maximum.maximize(getMaximumByVector3Path(path))
 	return maximum
 
 def getMaximumSpan(loop):
@@ -1274,16 +1297,15 @@ def getMinimumByComplexPaths(paths):
 def getMinimumByVector3Path(path):
 	'Get a vector3 with each component the minimum of the respective components of a vector3 path.'
 	minimum = Vector3(987654321.0, 987654321.0, 987654321.0)
-	for point in path:
-		minimum.minimize(point)
+	if len(path) > 0:
+		minimum.minimize(Vector3(min([point.x for point in path]), min([point.y for point in path]), min([point.z for point in path])))
 	return minimum
 
 def getMinimumByVector3Paths(paths):
 	'Get a complex with each component the minimum of the respective components of a complex path.'
 	minimum = Vector3(987654321.0, 987654321.0, 987654321.0)
 	for path in paths:
-		for point in path:
-			minimum.minimize(point)
+		minimum.minimize(getMinimumByVector3Path(path))
 	return minimum
 
 def getMirrorPath(path):
@@ -1705,7 +1727,7 @@ def getTransferClosestSurroundingLoop(extrusionHalfWidth, nestedRings, oldOrdere
 	closestDistance = 987654321987654321.0
 	closestNestedRing = None
 	for nestedRing in nestedRings:
-		distance = getNearestDistanceIndex(oldOrderedLocation.dropAxis(), nestedRing.getXYBoundaries()).distance
+		distance = getNearestDistanceIndex(oldOrderedLocation.dropAxis(), nestedRing.getBoundaryPolyline()).distance
 		if distance < closestDistance:
 			closestDistance = distance
 			closestNestedRing = nestedRing
@@ -2155,9 +2177,9 @@ def transferPathsToSurroundingLoops(nestedRings, paths):
 		nestedRing.transferPaths(paths)
 
 def translateVector3Path(path, translateVector3):
-	'Translate the vector3 path.'
+	'Translate the vector3 path in place, without making a vector3 for each point.'
 	for point in path:
-		point.setToVector3(point + translateVector3)
+		point += translateVector3
 
 def translateVector3Paths(paths, translateVector3):
 	'Translate the vector3 paths.'
@@ -2572,6 +2594,7 @@ class RotatedLoopLayer:
 	def __init__(self, z):
 		self.loops = []
 		self.rotation = None
+		self.thickness = None
 		self.z = z
 
 	def __repr__(self):
@@ -2596,6 +2619,7 @@ class RotatedLoopLayer:
 		for loop in self.loops:
 			raisedRotatedLoopLayer.loops.append(loop[:])
 		raisedRotatedLoopLayer.rotation = self.rotation
+		raisedRotatedLoopLayer.thickness = self.thickness
 		return raisedRotatedLoopLayer
 
 def getFlattenedNestedRings(nestedRings):
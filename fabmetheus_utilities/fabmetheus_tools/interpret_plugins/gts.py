@@ -44,31 +44,32 @@ def getFromGNUTriangulatedSurfaceText( gnuTriangulatedSurfaceText, triangleMesh
 	numberOfVertexes = int( splitLine[0] )
 	numberOfEdges = int(splitLine[1])
 	numberOfFaces = int( splitLine[2] )
-	faceTriples = []
-	for vertexIndex in xrange( numberOfVertexes ):
-		line = linesWithoutComments[ vertexIndex + 1 ]
-		splitLine = line.split()
-		vertex = Vector3( float( splitLine[0] ), float(splitLine[1]), float( splitLine[2] ) )
-		triangleMesh.vertexes.append(vertex)
 	edgeStart = numberOfVertexes + 1
-	for edgeIndex in xrange( numberOfEdges ):
-		line = linesWithoutComments[ edgeIndex + edgeStart ]
-		splitLine = line.split()
-		vertexIndexes = []
-		for word in splitLine[ : 2 ]:
-			vertexIndexes.append( int(word) - 1 )
-		edge = face.Edge().getFromVertexIndexes( edgeIndex, vertexIndexes )
-		triangleMesh.edges.append( edge )
 	faceStart = edgeStart + numberOfEdges
+	coordinates = getNumbersGivenLines( linesWithoutComments[1 : edgeStart], 3, float )
+	for coordinateIndex in xrange( 0, len(coordinates), 3 ):
+		triangleMesh.vertexes.append( Vector3( coordinates[coordinateIndex], coordinates[coordinateIndex + 1], coordinates[coordinateIndex + 2] ) )
+	vertexIndexes = getNumbersGivenLines( linesWithoutComments[edgeStart : faceStart], 2, int )
+	for edgeIndex in xrange( numberOfEdges ):
+		edgeVertexIndexes = [ vertexIndexes[ edgeIndex + edgeIndex ] - 1, vertexIndexes[ edgeIndex + edgeIndex + 1 ] - 1 ]
+		triangleMesh.edges.append( face.Edge().getFromVertexIndexes( edgeIndex, edgeVertexIndexes ) )
+	edgeIndexes = getNumbersGivenLines( linesWithoutComments[faceStart : faceStart + numberOfFaces], 3, int )
 	for faceIndex in xrange( numberOfFaces ):
-		line = linesWithoutComments[ faceIndex + faceStart ]
-		splitLine = line.split()
-		edgeIndexes = []
-		for word in splitLine[ : 3 ]:
-			edgeIndexes.append( int(word) - 1 )
-		triangleMesh.faces.append( face.Face().getFromEdgeIndexes( edgeIndexes, triangleMesh.edges, faceIndex ) )
+		edgeIndexIndex = faceIndex * 3
+		faceEdgeIndexes = [ edgeIndexes[edgeIndexIndex] - 1, edgeIndexes[edgeIndexIndex + 1] - 1, edgeIndexes[edgeIndexIndex + 2] - 1 ]
+		triangleMesh.faces.append( face.Face().getFromEdgeIndexes( faceEdgeIndexes, triangleMesh.edges, faceIndex ) )
 	return triangleMesh
 
+def getNumbersGivenLines( lines, numbersPerLine, converter ):
+	"Get the first numbers of each line, parsed as one block when the lines hold no extra attributes."
+	numbers = archive.getNumbersFromLines( lines, numbersPerLine, converter )
+	if numbers != None:
+		return numbers
+	numbers = []
+	for line in lines:
+		numbers += map( converter, line.split()[ : numbersPerLine ] )
+	return numbers
+
 def getCarving(fileName):
 	"Get the carving for the gts file."
 	return getFromGNUTriangulatedSurfaceText( archive.getFileText(fileName), triangle_mesh.TriangleMesh() )
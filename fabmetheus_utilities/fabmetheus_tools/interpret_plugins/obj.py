@@ -33,17 +33,43 @@ __license__ = 'GNU Affero General Public License http://www.gnu.org/licenses/agp
 
 def addFacesGivenText( objText, triangleMesh ):
 	"Add faces given obj text."
-	lines = archive.getTextLines( objText )
-	for line in lines:
-		splitLine = line.split()
-		if len(splitLine) > 0:
+	vertexLines = []
+	faceLines = []
+	for line in archive.getTextLines( objText ):
+		splitLine = line.split(None, 1)
+		if len(splitLine) > 1:
 			firstWord = splitLine[0]
-		else:
-			firstWord =  ''
-		if firstWord == 'v':
-			triangleMesh.vertexes.append( getVertexGivenLine(line) )
-		elif firstWord == 'f':
-			triangleMesh.faces.append( getFaceGivenLine( line, triangleMesh ) )
+			if firstWord == 'v':
+				vertexLines.append(splitLine[1])
+			elif firstWord == 'f':
+				faceLines.append(splitLine[1])
+	addVertexesGivenLines(vertexLines, triangleMesh)
+	addFacesGivenLines(faceLines, triangleMesh)
+
+def addFacesGivenLines(faceLines, triangleMesh):
+	"Add the faces of the face lines, without the f, parsed as one block when every face is a triangle of plain vertex indexes."
+	vertexIndexes = None
+	if '/' not in ''.join(faceLines):
+		vertexIndexes = archive.getNumbersFromLines(faceLines, 3, int)
+	if vertexIndexes == None:
+		for line in faceLines:
+			triangleMesh.faces.append(getFaceGivenLine('f ' + line, triangleMesh))
+		return
+	for vertexIndexIndex in xrange(0, len(vertexIndexes), 3):
+		faceGivenLine = face.Face()
+		faceGivenLine.index = len(triangleMesh.faces)
+		faceGivenLine.vertexIndexes = [vertexIndexes[vertexIndexIndex] - 1, vertexIndexes[vertexIndexIndex + 1] - 1, vertexIndexes[vertexIndexIndex + 2] - 1]
+		triangleMesh.faces.append(faceGivenLine)
+
+def addVertexesGivenLines(vertexLines, triangleMesh):
+	"Add the vertexes of the vertex lines, without the v, parsed as one block when every line holds only x, y and z."
+	coordinates = archive.getNumbersFromLines(vertexLines, 3)
+	if coordinates == None:
+		for line in vertexLines:
+			triangleMesh.vertexes.append(getVertexGivenLine('v ' + line))
+		return
+	for coordinateIndex in xrange(0, len(coordinates), 3):
+		triangleMesh.vertexes.append(Vector3(coordinates[coordinateIndex], coordinates[coordinateIndex + 1], coordinates[coordinateIndex + 2]))
 
 def getFaceGivenLine( line, triangleMesh ):
 	"Add face given line index and lines."
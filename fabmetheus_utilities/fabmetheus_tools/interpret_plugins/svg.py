@@ -6,7 +6,7 @@ An example inkscape svg file is inkscape_star.svg in the models folder.
 
 An import plugin is a script in the interpret_plugins folder which has the function getCarving.  It is meant to be run from the interpret tool.  To ensure that the plugin works on platforms which do not handle file capitalization properly, give the plugin a lower case name.
 
-The getCarving function takes the file name of an svg file and returns the carving.
+The getCarving function takes the file name of an svg file and returns the carving.  The file is read a line at a time and each element is converted to loops as soon as it is read, then dropped once it is closed, so a stack of thousands of slice layers is imported without holding the xml tree of the whole file.
 
 """
 
@@ -28,7 +28,7 @@ __license__ = 'GNU Affero General Public License http://www.gnu.org/licenses/agp
 def getCarving(fileName=''):
 	'Get the triangle mesh for the gts file.'
 	carving = SVGCarving()
-	carving.parseSVG(fileName, archive.getFileText(fileName))
+	carving.parseSVGByTextLines(fileName, archive.getFileTextLines(fileName))
 	return carving
 
 
@@ -37,6 +37,8 @@ class SVGCarving:
 	def __init__(self):
 		'Add empty lists.'
 		self.layerThickness = 1.0
+		self.layerPrintFrom = None
+		self.layerPrintTo = None
 		self.maximumZ = - 987654321.0
 		self.minimumZ = 987654321.0
 		self.svgReader = SVGReader()
@@ -61,13 +63,17 @@ class SVGCarving:
 		'Get the carved svg text.'
 		return svg_writer.getSVGByLoopLayers(True, self, self.svgReader.rotatedLoopLayers)
 
+	def getCarveDiagnostics(self):
+		'Get the mesh diagnostics, the layers of a carving are already sliced so there are none.'
+		return None
+
 	def getCarveLayerThickness(self):
 		'Get the layer thickness.'
 		return self.layerThickness
 
 	def getCarveRotatedBoundaryLayers(self):
-		'Get the rotated boundary layers.'
-		return self.svgReader.rotatedLoopLayers
+		'Get the rotated boundary layers in the layer range.'
+		return self.svgReader.rotatedLoopLayers[self.layerPrintFrom : self.layerPrintTo]
 
 	def getFabmetheusXML(self):
 		'Return the fabmetheus XML.'
@@ -81,8 +87,12 @@ class SVGCarving:
 		'Parse SVG text and store the layers.'
 		if svgText == '':
 			return
+		self.parseSVGByTextLines(fileName, archive.getTextLines(svgText))
+
+	def parseSVGByTextLines(self, fileName, textLines):
+		'Parse the SVG text lines and store the layers.'
 		self.fileName = fileName
-		self.svgReader.parseSVG(fileName, svgText)
+		self.svgReader.parseSVGByTextLines(fileName, textLines)
 		self.layerThickness = euclidean.getFloatDefaultByDictionary(
 			self.layerThickness, self.svgReader.sliceDictionary, 'layerThickness')
 		self.cornerMaximum = Vector3(-987654321.0, -987654321.0, self.maximumZ)
@@ -90,6 +100,14 @@ class SVGCarving:
 		svg_writer.setSVGCarvingCorners(
 			self.cornerMaximum, self.cornerMinimum, self.layerThickness, self.svgReader.rotatedLoopLayers)
 
+	def repairCarveMesh(self, tolerance, maximumHolePerimeter):
+		'Repair the mesh, the layers of a carving are already sliced so there is no mesh.'
+		return None
+
+	def setCarveAdaptiveLayerThickness(self, minimumLayerThickness, maximumLayerThickness, cuspHeight):
+		'Set the adaptive layer thickness, the layers of a carving are already sliced.'
+		pass
+
 	def setCarveInfillInDirectionOfBridge(self, infillInDirectionOfBridge):
 		'Set the infill in direction of bridge.'
 		pass
@@ -98,6 +116,11 @@ class SVGCarving:
 		'Set the layer thickness.'
 		self.layerThickness = layerThickness
 
+	def setCarveLayerRange(self, layerPrintFrom, layerPrintTo):
+		'Set the range of layer indexes to carve, as a slice of all the layers.'
+		self.layerPrintFrom = layerPrintFrom
+		self.layerPrintTo = layerPrintTo
+
 	def setCarveImportRadius(self, importRadius):
 		'Set the import radius.'
 		pass
@@ -105,3 +128,7 @@ class SVGCarving:
 	def setCarveIsCorrectMesh(self, isCorrectMesh):
 		'Set the is correct mesh flag.'
 		pass
+
+	def setCarveIsIntersectionChecked(self, isIntersectionCheckAsked):
+		'Set whether the loops of each layer are checked for intersections, the layers of a carving are already sliced.'
+		pass
@@ -3,7 +3,6 @@ Boolean geometry dictionary object.
 
 """
 
-from fabmetheus_utilities.geometry.geometry_utilities import evaluate
 from fabmetheus_utilities.geometry.geometry_utilities import matrix
 from fabmetheus_utilities import euclidean
 from fabmetheus_utilities import xml_simple_writer
@@ -42,6 +41,7 @@ def getAllVertexes(vertexes, xmlObject):
 
 def processXMLElement(xmlElement):
 	'Process the xml element.'
+	from fabmetheus_utilities.geometry.geometry_utilities import evaluate
 	evaluate.processArchivable( Dictionary, xmlElement)
 
 
@@ -60,6 +60,7 @@ class Dictionary:
 
 	def addXML(self, depth, output):
 		'Add xml for this object.'
+		from fabmetheus_utilities.geometry.geometry_utilities import evaluate
 		attributeCopy = {}
 		if self.xmlElement != None:
 			attributeCopy = evaluate.getEvaluatedDictionaryByCopyKeys(['paths', 'target', 'vertexes'], self.xmlElement)
@@ -105,6 +106,7 @@ class Dictionary:
 
 	def getGeometryOutput(self):
 		'Get geometry output dictionary.'
+		from fabmetheus_utilities.geometry.geometry_utilities import evaluate
 		visibleObjects = evaluate.getVisibleObjects(self.archivableObjects)
 		shapeOutput = []
 		for visibleObject in visibleObjects:
@@ -3,11 +3,9 @@ Face of a triangle mesh.
 
 """
 
-from fabmetheus_utilities.geometry.geometry_utilities import evaluate
 from fabmetheus_utilities.vector3 import Vector3
 from fabmetheus_utilities import euclidean
 #from fabmetheus_utilities import intercircle
-from fabmetheus_utilities import xml_simple_reader
 from fabmetheus_utilities import xml_simple_writer
 import cmath
 import StringIO
@@ -38,6 +36,7 @@ def addFaces(geometryOutput, faces):
 
 def addGeometryList( faces, xmlElement ):
 	"Add vertex elements to an xml element."
+	from fabmetheus_utilities import xml_simple_reader
 	for face in faces:
 		faceElement = xml_simple_reader.XMLElement()
 		face.addToAttributeDictionary( faceElement.attributeDictionary )
@@ -63,6 +62,7 @@ def getFaces(geometryOutput):
 
 def processXMLElement(xmlElement):
 	"Process the xml element."
+	from fabmetheus_utilities.geometry.geometry_utilities import evaluate
 	face = Face()
 	face.index = len(xmlElement.parentNode.xmlObject.faces)
 	for vertexIndexIndex in xrange(3):
@@ -126,6 +126,8 @@ class SVGFabricationCarving:
 	def __init__(self, addLayerTemplate, xmlElement):
 		'Add empty lists.'
 		self.addLayerTemplate = addLayerTemplate
+		self.layerPrintFrom = None
+		self.layerPrintTo = None
 		self.layerThickness = 1.0
 		self.rotatedLoopLayers = []
 		self.xmlElement = xmlElement
@@ -150,13 +152,17 @@ class SVGFabricationCarving:
 		'Get the carved svg text.'
 		return svg_writer.getSVGByLoopLayers(self.addLayerTemplate, self, self.rotatedLoopLayers)
 
+	def getCarveDiagnostics(self):
+		'Get the mesh diagnostics, the layers of a carving are already sliced so there are none.'
+		return None
+
 	def getCarveLayerThickness(self):
 		'Get the layer thickness.'
 		return self.layerThickness
 
 	def getCarveRotatedBoundaryLayers(self):
-		'Get the rotated boundary layers.'
-		return self.rotatedLoopLayers
+		'Get the rotated boundary layers in the layer range.'
+		return self.rotatedLoopLayers[self.layerPrintFrom : self.layerPrintTo]
 
 	def getFabmetheusXML(self):
 		'Return the fabmetheus XML.'
@@ -187,6 +193,14 @@ class SVGFabricationCarving:
 		self.cornerMinimum = Vector3(987654321.0, 987654321.0, 987654321.0)
 		svg_writer.setSVGCarvingCorners(self.cornerMaximum, self.cornerMinimum, self.layerThickness, self.rotatedLoopLayers)
 
+	def repairCarveMesh(self, tolerance, maximumHolePerimeter):
+		'Repair the mesh, the layers of a carving are already sliced so there is no mesh.'
+		return None
+
+	def setCarveAdaptiveLayerThickness(self, minimumLayerThickness, maximumLayerThickness, cuspHeight):
+		'Set the adaptive layer thickness, the layers of a carving are already sliced.'
+		pass
+
 	def setCarveInfillInDirectionOfBridge( self, infillInDirectionOfBridge ):
 		'Set the infill in direction of bridge.'
 		pass
@@ -195,6 +209,11 @@ class SVGFabricationCarving:
 		'Set the layer thickness.'
 		self.layerThickness = layerThickness
 
+	def setCarveLayerRange(self, layerPrintFrom, layerPrintTo):
+		'Set the range of layer indexes to carve, as a slice of all the layers.'
+		self.layerPrintFrom = layerPrintFrom
+		self.layerPrintTo = layerPrintTo
+
 	def setCarveImportRadius( self, importRadius ):
 		'Set the import radius.'
 		pass
@@ -202,3 +221,7 @@ class SVGFabricationCarving:
 	def setCarveIsCorrectMesh( self, isCorrectMesh ):
 		'Set the is correct mesh flag.'
 		pass
+
+	def setCarveIsIntersectionChecked(self, isIntersectionCheckAsked):
+		'Set whether the loops of each layer are checked for intersections, the layers of a carving are already sliced.'
+		pass
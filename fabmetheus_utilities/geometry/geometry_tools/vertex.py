@@ -3,8 +3,6 @@ Vertex of a triangle mesh.
 
 """
 
-from fabmetheus_utilities.geometry.geometry_utilities import evaluate
-from fabmetheus_utilities import xml_simple_reader
 
 
 __author__ = 'Enrique Perez (perez_enrique@yahoo.com)'
@@ -31,6 +29,7 @@ def addVertexToAttributeDictionary(attributeDictionary, vertex):
 
 def getUnboundVertexElement(vertex):
 	"Add vertex element to an xml element."
+	from fabmetheus_utilities import xml_simple_reader
 	vertexElement = xml_simple_reader.XMLElement()
 	addVertexToAttributeDictionary(vertexElement.attributeDictionary, vertex)
 	vertexElement.localName = 'vertex'
@@ -38,4 +37,5 @@ def getUnboundVertexElement(vertex):
 
 def processXMLElement(xmlElement):
 	"Process the xml element."
+	from fabmetheus_utilities.geometry.geometry_utilities import evaluate
 	xmlElement.parentNode.xmlObject.vertexes.append(evaluate.getVector3FromXMLElement(xmlElement))
@@ -3,7 +3,6 @@ Boolean geometry four by four matrix.
 
 """
 
-from fabmetheus_utilities.geometry.geometry_utilities import evaluate
 from fabmetheus_utilities.vector3 import Vector3
 from fabmetheus_utilities import archive
 from fabmetheus_utilities import euclidean
@@ -59,6 +58,7 @@ def getBranchMatrixSetXMLElement(xmlElement):
 
 def getCumulativeVector3Remove(defaultVector3, prefix, xmlElement):
 	'Get cumulative vector3 and delete the prefixed attributes.'
+	from fabmetheus_utilities.geometry.geometry_utilities import evaluate
 	if prefix == '':
 		defaultVector3.x = evaluate.getEvaluatedFloat(defaultVector3.x, 'x', xmlElement)
 		defaultVector3.y = evaluate.getEvaluatedFloat(defaultVector3.y, 'y', xmlElement)
@@ -120,6 +120,7 @@ def getKeysM(prefix=''):
 
 def getRemovedFloat(defaultFloat, key, prefix, xmlElement):
 	'Get the float by the key and the prefix.'
+	from fabmetheus_utilities.geometry.geometry_utilities import evaluate
 	prefixKey = prefix + key
 	if prefixKey in xmlElement.attributeDictionary:
 		floatValue = evaluate.getEvaluatedFloat(None, prefixKey, xmlElement)
@@ -199,6 +200,7 @@ def getScaleTetragrid(prefix, xmlElement):
 
 def getTetragridA(prefix, tetragrid, xmlElement):
 	'Get the tetragrid from the xmlElement letter a values.'
+	from fabmetheus_utilities.geometry.geometry_utilities import evaluate
 	keysA = getKeysA(prefix)
 	evaluatedDictionary = evaluate.getEvaluatedDictionaryByEvaluationKeys(keysA, xmlElement)
 	if len(evaluatedDictionary.keys()) < 1:
@@ -220,6 +222,7 @@ def getTetragridA(prefix, tetragrid, xmlElement):
 
 def getTetragridC(prefix, tetragrid, xmlElement):
 	'Get the matrix Tetragrid from the xmlElement letter c values.'
+	from fabmetheus_utilities.geometry.geometry_utilities import evaluate
 	columnKeys = 'Pc1 Pc2 Pc3 Pc4'.replace('P', prefix).split()
 	evaluatedDictionary = evaluate.getEvaluatedDictionaryByEvaluationKeys(columnKeys, xmlElement)
 	if len(evaluatedDictionary.keys()) < 1:
@@ -247,6 +250,7 @@ def getTetragridCopy(tetragrid):
 
 def getTetragridM(prefix, tetragrid, xmlElement):
 	'Get the tetragrid from the xmlElement letter m values.'
+	from fabmetheus_utilities.geometry.geometry_utilities import evaluate
 	keysM = getKeysM(prefix)
 	evaluatedDictionary = evaluate.getEvaluatedDictionaryByEvaluationKeys(keysM, xmlElement)
 	if len(evaluatedDictionary.keys()) < 1:
@@ -268,6 +272,7 @@ def getTetragridM(prefix, tetragrid, xmlElement):
 
 def getTetragridMatrix(prefix, tetragrid, xmlElement):
 	'Get the tetragrid from the xmlElement matrix value.'
+	from fabmetheus_utilities.geometry.geometry_utilities import evaluate
 	matrixKey = prefix + 'matrix'
 	evaluatedDictionary = evaluate.getEvaluatedDictionaryByEvaluationKeys([matrixKey], xmlElement)
 	if len(evaluatedDictionary.keys()) < 1:
@@ -287,6 +292,7 @@ def getTetragridMatrix(prefix, tetragrid, xmlElement):
 
 def getTetragridR(prefix, tetragrid, xmlElement):
 	'Get the tetragrid from the xmlElement letter r values.'
+	from fabmetheus_utilities.geometry.geometry_utilities import evaluate
 	rowKeys = 'Pr1 Pr2 Pr3 Pr4'.replace('P', prefix).split()
 	evaluatedDictionary = evaluate.getEvaluatedDictionaryByEvaluationKeys(rowKeys, xmlElement)
 	if len(evaluatedDictionary.keys()) < 1:
@@ -338,11 +344,14 @@ def getTransformedVector3(tetragrid, vector3):
 		getTransformedByList(tetragrid[2], vector3))
 
 def getTransformedVector3s(tetragrid, vector3s):
-	'Get the vector3s multiplied by a matrix.'
-	transformedVector3s = []
-	for vector3 in vector3s:
-		transformedVector3s.append(getTransformedVector3(tetragrid, vector3))
-	return transformedVector3s
+	'Get the vector3s multiplied by a matrix, with the rows of the matrix unpacked once for the whole batch.'
+	if tetragrid == None:
+		return [vector3.copy() for vector3 in vector3s]
+	((xx, xy, xz, xw), (yx, yy, yz, yw), (zx, zy, zz, zw)) = (tetragrid[0], tetragrid[1], tetragrid[2])
+	return [Vector3(
+		xx * vector3.x + xy * vector3.y + xz * vector3.z + xw,
+		yx * vector3.x + yy * vector3.y + yz * vector3.z + yw,
+		zx * vector3.x + zy * vector3.y + zz * vector3.z + zw) for vector3 in vector3s]
 
 def getTransformTetragrid(prefix, xmlElement):
 	'Get the tetragrid from the xmlElement.'
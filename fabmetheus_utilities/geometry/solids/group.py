@@ -4,7 +4,6 @@ Boolean geometry group of solids.
 """
 
 from fabmetheus_utilities.geometry.geometry_tools import dictionary
-from fabmetheus_utilities.geometry.geometry_utilities import evaluate
 from fabmetheus_utilities.geometry.geometry_utilities import matrix
 from fabmetheus_utilities import euclidean
 
@@ -27,6 +26,7 @@ def convertContainerXMLElement(geometryOutput, xmlElement, xmlObject):
 
 def processXMLElement(xmlElement):
 	"Process the xml element."
+	from fabmetheus_utilities.geometry.geometry_utilities import evaluate
 	evaluate.processArchivable(Group, xmlElement)
 
 
@@ -49,6 +49,7 @@ class Group(dictionary.Dictionary):
 
 	def getLoops(self, importRadius, z):
 		"Get loops sliced through shape."
+		from fabmetheus_utilities.geometry.geometry_utilities import evaluate
 		visibleObjects = evaluate.getVisibleObjects(self.archivableObjects)
 		loops = []
 		for visibleObject in visibleObjects:
@@ -0,0 +1,259 @@
+"""
+Mesh repair fixes the common faults of imported triangle meshes once, before they are sliced.
+
+A broken mesh makes getLoopsFromCorrectMesh give up on every layer which cuts a hole, so that the layer is taken by the
+much slower getLoopsFromUnprovenMesh. The repair merges the vertexes which are nearer than the tolerance, which closes the
+cracks of meshes whose facets do not share their corners exactly, removes the faces which become degenerate or are
+duplicates, turns the faces which are flipped against their neighbours and closes the small holes which remain with a
+fan of faces. A mesh without faults is left as it is.
+
+"""
+
+import math
+
+
+__license__ = 'GNU Affero General Public License http://www.gnu.org/licenses/agpl.html'
+
+
+def addHoleFaces(faces, holeLoop):
+	'Add a fan of faces closing the hole loop, the faces have the next face index.'
+	from fabmetheus_utilities.geometry.geometry_tools import face
+	for pointIndex in xrange(1, len(holeLoop) - 1):
+		holeFace = face.Face()
+		holeFace.index = len(faces)
+		holeFace.vertexIndexes = [holeLoop[0], holeLoop[pointIndex], holeLoop[pointIndex + 1]]
+		faces.append(holeFace)
+
+def getEdgeFacesTable(faces):
+	'Get the table of the faces of each edge, keyed by the ordered vertex index pair, with whether the face goes along the pair.'
+	edgeFacesTable = {}
+	for faceIndex, meshFace in enumerate(faces):
+		(first, second, third) = meshFace.vertexIndexes
+		for (begin, end) in ((first, second), (second, third), (third, first)):
+			if begin < end:
+				edgeKey = (begin, end)
+			else:
+				edgeKey = (end, begin)
+			if edgeKey in edgeFacesTable:
+				edgeFacesTable[edgeKey].append((faceIndex, begin < end))
+			else:
+				edgeFacesTable[edgeKey] = [(faceIndex, begin < end)]
+	return edgeFacesTable
+
+def getFlippedFaceIndexes(edgeFacesTable, faces):
+	'''Get the indexes of the faces which are flipped against their neighbours. The faces joined by edges with two faces are
+		given the same orientation and the smaller part of each joined group is taken as the flipped faces.'''
+	orientations = [None] * len(faces)
+	flippedFaceIndexes = []
+	for seedIndex in xrange(len(faces)):
+		if orientations[seedIndex] != None:
+			continue
+		orientations[seedIndex] = False
+		group = [seedIndex]
+		groupIndex = 0
+		while groupIndex < len(group):
+			faceIndex = group[groupIndex]
+			groupIndex += 1
+			vertexIndexes = faces[faceIndex].vertexIndexes
+			for pointIndex in xrange(3):
+				begin = vertexIndexes[pointIndex]
+				end = vertexIndexes[(pointIndex + 1) % 3]
+				edgeFaces = edgeFacesTable[(min(begin, end), max(begin, end))]
+				if len(edgeFaces) != 2:
+					continue
+				(otherFaceIndex, otherIsAlong) = edgeFaces[0]
+				if otherFaceIndex == faceIndex:
+					(otherFaceIndex, otherIsAlong) = edgeFaces[1]
+				if orientations[otherFaceIndex] == None:
+					isAlong = begin < end
+					orientations[otherFaceIndex] = orientations[faceIndex] != (isAlong == otherIsAlong)
+					group.append(otherFaceIndex)
+		flippedGroup = [groupFaceIndex for groupFaceIndex in group if orientations[groupFaceIndex]]
+		if len(flippedGroup) + len(flippedGroup) > len(group):
+			flippedGroup = [groupFaceIndex for groupFaceIndex in group if not orientations[groupFaceIndex]]
+		flippedFaceIndexes += flippedGroup
+	return flippedFaceIndexes
+
+def getHoleLoops(edgeFacesTable):
+	'Get the loops of vertex indexes around the holes, each going against the faces around it, as the faces closing it should.'
+	nextVertexTable = {}
+	forkedVertexIndexes = set()
+	for edgeKey, edgeFaces in edgeFacesTable.iteritems():
+		if len(edgeFaces) != 1:
+			continue
+		(faceIndex, isAlong) = edgeFaces[0]
+		(begin, end) = edgeKey
+		if isAlong:
+			(begin, end) = (end, begin)
+		if begin in nextVertexTable:
+			forkedVertexIndexes.add(begin)
+		nextVertexTable[begin] = end
+	holeLoops = []
+	visitedVertexIndexes = set()
+	for startIndex in nextVertexTable:
+		if startIndex in visitedVertexIndexes:
+			continue
+		holeLoop = []
+		vertexIndex = startIndex
+		while vertexIndex in nextVertexTable and vertexIndex not in visitedVertexIndexes:
+			visitedVertexIndexes.add(vertexIndex)
+			holeLoop.append(vertexIndex)
+			vertexIndex = nextVertexTable[vertexIndex]
+		if vertexIndex == startIndex and len(holeLoop) > 2 and forkedVertexIndexes.isdisjoint(holeLoop):
+			holeLoops.append(holeLoop)
+	return holeLoops
+
+def getLoopPerimeter(loop, vertexes):
+	'Get the perimeter of the loop of vertex indexes.'
+	perimeter = 0.0
+	for pointIndex in xrange(len(loop)):
+		perimeter += abs(vertexes[loop[pointIndex]] - vertexes[loop[(pointIndex + 1) % len(loop)]])
+	return perimeter
+
+def getMergedVertexIndexes(tolerance, vertexes):
+	'''Get the index of the vertex each vertex is merged into, its own index when there is no earlier vertex within the tolerance.
+		The vertexes are put in cells twice the tolerance wide, so only the cells on the near side in each axis are searched.'''
+	cellWidth = tolerance + tolerance
+	cellTable = {}
+	mergedVertexIndexes = range(len(vertexes))
+	for vertexIndex, point in enumerate(vertexes):
+		cellX = point.x / cellWidth
+		cellY = point.y / cellWidth
+		cellZ = point.z / cellWidth
+		flooredX = math.floor(cellX)
+		flooredY = math.floor(cellY)
+		flooredZ = math.floor(cellZ)
+		stepX = (cellX - flooredX > 0.5) * 2 - 1
+		stepY = (cellY - flooredY > 0.5) * 2 - 1
+		stepZ = (cellZ - flooredZ > 0.5) * 2 - 1
+		nearIndex = None
+		for key in [(flooredX, flooredY, flooredZ), (flooredX + stepX, flooredY, flooredZ), (flooredX, flooredY + stepY, flooredZ),
+			(flooredX + stepX, flooredY + stepY, flooredZ), (flooredX, flooredY, flooredZ + stepZ), (flooredX + stepX, flooredY, flooredZ + stepZ),
+			(flooredX, flooredY + stepY, flooredZ + stepZ), (flooredX + stepX, flooredY + stepY, flooredZ + stepZ)]:
+			for cellIndex in cellTable.get(key, ()):
+				if abs(vertexes[cellIndex] - point) <= tolerance:
+					nearIndex = cellIndex
+					break
+			if nearIndex != None:
+				break
+		if nearIndex == None:
+			key = (flooredX, flooredY, flooredZ)
+			if key not in cellTable:
+				cellTable[key] = []
+			cellTable[key].append(vertexIndex)
+		else:
+			mergedVertexIndexes[vertexIndex] = nearIndex
+	return mergedVertexIndexes
+
+def getPositionIndexes(vertexes):
+	'Get the index of the first vertex at exactly the same position as each vertex, 0.0 and -0.0 being the same position.'
+	positionIndexTable = {}
+	return [positionIndexTable.setdefault((vertex.x, vertex.y, vertex.z), vertexIndex) for vertexIndex, vertex in enumerate(vertexes)]
+
+def isClosedAndOriented(faces, numberOfVertexes, positionIndexes=None):
+	'''Determine if each edge of the faces is gone along once each way, so the faces are closed, manifold and turned alike.
+		When the position indexes are given, the vertexes at exactly the same position are taken as one vertex.'''
+	directedEdges = set()
+	for meshFace in faces:
+		(first, second, third) = meshFace.vertexIndexes
+		if positionIndexes != None:
+			(first, second, third) = (positionIndexes[first], positionIndexes[second], positionIndexes[third])
+		directedEdges.add(first * numberOfVertexes + second)
+		directedEdges.add(second * numberOfVertexes + third)
+		directedEdges.add(third * numberOfVertexes + first)
+	if len(directedEdges) != 3 * len(faces):
+		return False
+	for directedEdge in directedEdges:
+		if (directedEdge % numberOfVertexes) * numberOfVertexes + directedEdge / numberOfVertexes not in directedEdges:
+			return False
+	return True
+
+def removeUnusedVertexes(faces, vertexes):
+	'Remove the vertexes which are not in a face and renumber the vertex indexes of the faces.'
+	usedVertexIndexes = sorted(set([vertexIndex for meshFace in faces for vertexIndex in meshFace.vertexIndexes]))
+	newVertexIndexTable = {}
+	for newVertexIndex, vertexIndex in enumerate(usedVertexIndexes):
+		newVertexIndexTable[vertexIndex] = newVertexIndex
+	for meshFace in faces:
+		meshFace.vertexIndexes = [newVertexIndexTable[vertexIndex] for vertexIndex in meshFace.vertexIndexes]
+	vertexes[:] = [vertexes[vertexIndex] for vertexIndex in usedVertexIndexes]
+
+def repairMesh(faces, vertexes, tolerance, maximumHolePerimeter):
+	'''Repair the faces and vertexes lists of a mesh in place and get the report of the repairs.
+		A mesh which is closed and oriented once the vertexes at the same position are taken as one already slices, so it is left as it is.'''
+	report = MeshRepairReport()
+	if isClosedAndOriented(faces, len(vertexes), getPositionIndexes(vertexes)):
+		return report
+	mergedVertexIndexes = getMergedVertexIndexes(tolerance, vertexes)
+	report.mergedVertexes = len(vertexes) - sum([vertexIndex == mergedIndex for vertexIndex, mergedIndex in enumerate(mergedVertexIndexes)])
+	faceKeys = set()
+	repairedFaces = []
+	for meshFace in faces:
+		if report.mergedVertexes > 0:
+			meshFace.vertexIndexes = [mergedVertexIndexes[vertexIndex] for vertexIndex in meshFace.vertexIndexes]
+		faceKey = tuple(sorted(meshFace.vertexIndexes))
+		if faceKey[0] == faceKey[1] or faceKey[1] == faceKey[2]:
+			report.degenerateFaces += 1
+		elif faceKey in faceKeys:
+			report.duplicateFaces += 1
+		else:
+			faceKeys.add(faceKey)
+			repairedFaces.append(meshFace)
+	if isClosedAndOriented(repairedFaces, len(vertexes)):
+		if report.isChanged():
+			removeUnusedVertexes(repairedFaces, vertexes)
+			setFaceIndexes(faces, repairedFaces)
+		return report
+	edgeFacesTable = getEdgeFacesTable(repairedFaces)
+	for faceIndex in getFlippedFaceIndexes(edgeFacesTable, repairedFaces):
+		vertexIndexes = repairedFaces[faceIndex].vertexIndexes
+		(vertexIndexes[1], vertexIndexes[2]) = (vertexIndexes[2], vertexIndexes[1])
+		report.flippedFaces += 1
+	if report.flippedFaces > 0:
+		edgeFacesTable = getEdgeFacesTable(repairedFaces)
+	for holeLoop in getHoleLoops(edgeFacesTable):
+		if getLoopPerimeter(holeLoop, vertexes) <= maximumHolePerimeter:
+			addHoleFaces(repairedFaces, holeLoop)
+			report.closedHoles += 1
+	if report.isChanged():
+		edgeFacesTable = getEdgeFacesTable(repairedFaces)
+	for edgeFaces in edgeFacesTable.itervalues():
+		if len(edgeFaces) == 1:
+			report.openEdges += 1
+		elif len(edgeFaces) > 2:
+			report.nonManifoldEdges += 1
+	if report.mergedVertexes > 0 or report.degenerateFaces > 0 or report.duplicateFaces > 0:
+		removeUnusedVertexes(repairedFaces, vertexes)
+	setFaceIndexes(faces, repairedFaces)
+	return report
+
+def setFaceIndexes(faces, repairedFaces):
+	'Set the faces to the repaired faces and number them.'
+	for faceIndex, meshFace in enumerate(repairedFaces):
+		meshFace.index = faceIndex
+	faces[:] = repairedFaces
+
+class MeshRepairReport:
+	'The counts of the repairs of a mesh, and of the faults left.'
+	def __init__(self):
+		'Set the counts to zero.'
+		self.closedHoles = 0
+		self.degenerateFaces = 0
+		self.duplicateFaces = 0
+		self.flippedFaces = 0
+		self.mergedVertexes = 0
+		self.nonManifoldEdges = 0
+		self.openEdges = 0
+
+	def __repr__(self):
+		'Get the string representation of this report.'
+		return '%s merged vertexes, %s degenerate faces, %s duplicate faces, %s flipped faces, %s closed holes, %s open edges, %s non manifold edges' % (
+			self.mergedVertexes, self.degenerateFaces, self.duplicateFaces, self.flippedFaces, self.closedHoles, self.openEdges, self.nonManifoldEdges)
+
+	def isChanged(self):
+		'Determine if the mesh was changed by the repair.'
+		return self.closedHoles + self.degenerateFaces + self.duplicateFaces + self.flippedFaces + self.mergedVertexes > 0
+
+	def isCorrect(self):
+		'Determine if the mesh is closed and manifold after the repair.'
+		return self.openEdges == 0 and self.nonManifoldEdges == 0
@@ -5,7 +5,6 @@ Triangle Mesh holds the faces and edges of a triangular mesh.
 
 from fabmetheus_utilities.geometry.geometry_tools import face
 from fabmetheus_utilities.geometry.geometry_tools import vertex
-from fabmetheus_utilities.geometry.geometry_utilities import evaluate
 from fabmetheus_utilities.geometry.geometry_utilities import matrix
 from fabmetheus_utilities.geometry.solids import group
 from fabmetheus_utilities import xml_simple_writer
@@ -13,6 +12,8 @@ from fabmetheus_utilities.vector3 import Vector3
 from fabmetheus_utilities.vector3index import Vector3Index
 from fabmetheus_utilities import euclidean
 from fabmetheus_utilities import intercircle
+from array import array
+import bisect
 import cmath
 import math
 
@@ -237,6 +238,44 @@ def getAddIndexedLoops( loop, vertexes, zList ):
 		indexedLoops.append(indexedLoop)
 	return indexedLoops
 
+def getAdaptiveLayerZsThicknesses(faces, vertexes, bottomZ, topZ, layerThickness, minimumThickness, maximumThickness, cuspHeight):
+	'Get the slice z and the thickness of each layer, thicker where the walls are steep and thinner where the slopes are shallow.'
+	binCount = int(math.ceil((topZ - bottomZ) / minimumThickness)) + 1
+	binMaximumThicknesses = [maximumThickness] * binCount
+	for face in faces:
+		faceVertexes = [vertexes[vertexIndex] for vertexIndex in face.vertexIndexes[: 3]]
+		normal = (faceVertexes[1] - faceVertexes[0]).cross(faceVertexes[2] - faceVertexes[0])
+		normalLength = abs(normal)
+		if normalLength <= 0.0:
+			continue
+		normalZ = abs(normal.z) / normalLength
+		if normalZ > 0.999:
+			continue
+		faceMaximumThickness = cuspHeight / max(normalZ, 0.000001)
+		if faceMaximumThickness >= maximumThickness:
+			continue
+		faceBottomZ = min([faceVertex.z for faceVertex in faceVertexes])
+		faceTopZ = max([faceVertex.z for faceVertex in faceVertexes])
+		firstBinIndex = max(0, int((faceBottomZ - bottomZ) / minimumThickness))
+		lastBinIndex = min(binCount - 1, int((faceTopZ - bottomZ) / minimumThickness))
+		for binIndex in xrange(firstBinIndex, lastBinIndex + 1):
+			binMaximumThicknesses[binIndex] = min(binMaximumThicknesses[binIndex], faceMaximumThickness)
+	layerZs = []
+	layerThicknesses = []
+	layerBottom = bottomZ
+	thickness = layerThickness
+	while topZ - layerBottom > 0.75 * thickness:
+		layerZs.append(layerBottom + 0.5 * thickness)
+		layerThicknesses.append(thickness)
+		layerBottom += thickness
+		thickness = maximumThickness
+		binIndex = int((layerBottom - bottomZ) / minimumThickness)
+		while binIndex < binCount and bottomZ + binIndex * minimumThickness < layerBottom + thickness:
+			thickness = min(thickness, binMaximumThicknesses[binIndex])
+			binIndex += 1
+		thickness = max(min(thickness, topZ - layerBottom), minimumThickness)
+	return layerZs, layerThicknesses
+
 def getAdditionalLoopLength(loop, point, pointIndex):
 	'Get the additional length added by inserting a point into a loop.'
 	afterPoint = loop[pointIndex]
@@ -405,27 +444,25 @@ def getIsPathEntirelyOutsideTriangle(begin, center, end, vector3Path):
 			return False
 	return True
 
-def getLoopsFromCorrectMesh( edges, faces, vertexes, z ):
-	'Get loops from a carve of a correct mesh.'
+def getLoopsFromCorrectMesh( edges, faces, vertexes, z, diagnostics=None ):
+	'''Get loops from a carve of a correct mesh, or no loops when the layer cuts a hole, dangling edges or, if they are checked,
+		intersecting loops. The problems are recorded in the diagnostics, if any, and the loops are only checked for
+		intersections when the diagnostics ask for it.'''
 	remainingEdgeTable = getRemainingEdgeTable(edges, vertexes, z)
 	remainingValues = remainingEdgeTable.values()
 	for edge in remainingValues:
 		if len( edge.faceIndexes ) < 2:
-			print('This should never happen, there is a hole in the triangle mesh, each edge should have two faces.')
-			print(edge)
-			print('Something will still be printed, but there is no guarantee that it will be the correct shape.' )
-			print('Once the gcode is saved, you should check over the layer with a z of:')
-			print(z)
+			if diagnostics != None:
+				diagnostics.addLayerIssue(z, 'hole', edge.index)
 			return []
 	loops = []
-	while isPathAdded( edges, faces, loops, remainingEdgeTable, vertexes, z ):
+	while isPathAdded( edges, faces, loops, remainingEdgeTable, vertexes, z, diagnostics ):
 		pass
-	if euclidean.isLoopListIntersecting(loops):
-		print('Warning, the triangle mesh slice intersects itself in getLoopsFromCorrectMesh in triangle_mesh.')
-		print('Something will still be printed, but there is no guarantee that it will be the correct shape.')
-		print('Once the gcode is saved, you should check over the layer with a z of:')
-		print(z)
-		return []
+	if diagnostics == None or diagnostics.isIntersectionChecked:
+		if euclidean.isLoopListIntersecting(loops):
+			if diagnostics != None:
+				diagnostics.addLayerIssue(z, 'intersection')
+			return []
 	return loops
 #	untouchables = []
 #	for boundingLoop in boundingLoops:
@@ -667,8 +704,8 @@ def isInline( beginComplex, centerComplex, endComplex ):
 	centerEndComplex /= centerEndLength
 	return euclidean.getDotProduct( centerBeginComplex, centerEndComplex ) < -0.999
 
-def isPathAdded( edges, faces, loops, remainingEdgeTable, vertexes, z ):
-	'Get the path indexes around a triangle mesh carve and add the path to the flat loops.'
+def isPathAdded( edges, faces, loops, remainingEdgeTable, vertexes, z, diagnostics=None ):
+	'Get the path indexes around a triangle mesh carve and add the path to the flat loops, or clear the loops if the path dangles.'
 	if len( remainingEdgeTable ) < 1:
 		return False
 	pathIndexes = []
@@ -681,7 +718,8 @@ def isPathAdded( edges, faces, loops, remainingEdgeTable, vertexes, z ):
 		del remainingEdgeTable[ nextEdgeIndexAroundZ ]
 		nextEdgeIndexAroundZ = getNextEdgeIndexAroundZ( edges[ nextEdgeIndexAroundZ ], faces, remainingEdgeTable )
 	if len( pathIndexes ) < 3:
-		print('Dangling edges, will use intersecting circles to get import layer at height %s' % z)
+		if diagnostics != None:
+			diagnostics.addLayerIssue(z, 'dangling', pathIndexes[0])
 		del loops[:]
 		return False
 	loops.append( getPath( edges, pathIndexes, vertexes, z ) )
@@ -689,15 +727,14 @@ def isPathAdded( edges, faces, loops, remainingEdgeTable, vertexes, z ):
 
 def processXMLElement(xmlElement):
 	'Process the xml element.'
+	from fabmetheus_utilities.geometry.geometry_utilities import evaluate
 	evaluate.processArchivable(TriangleMesh, xmlElement)
 
 def setEdgeMaximumMinimum(edge, vertexes):
-	'Set the edge maximum and minimum.'
+	'Set the edge maximum and minimum, an edge with a missing vertex is put below the mesh and counted by the MeshDiagnostics.'
 	beginIndex = edge.vertexIndexes[0]
 	endIndex = edge.vertexIndexes[1]
 	if beginIndex >= len(vertexes) or endIndex >= len(vertexes):
-		print('Warning, there are duplicate vertexes in setEdgeMaximumMinimum in triangle_mesh.')
-		print('Something might still be printed, but there is no guarantee that it will be the correct shape.' )
 		edge.zMaximum = -987654321.0
 		edge.zMinimum = -987654321.0
 		return
@@ -730,17 +767,70 @@ class EdgePair:
 		return self
 
 
+class MeshDiagnostics:
+	'''The topology of a mesh, validated once before it is sliced, and the problems met slicing each layer. The loops of
+		each layer are only checked for intersections when the topology is not valid or when the check is asked for.'''
+	def __init__(self, edges, vertexes, isIntersectionCheckAsked):
+		'Count the open, non manifold and missing vertex edges of the mesh.'
+		self.layerIssues = []
+		self.missingVertexEdges = 0
+		self.nonManifoldEdges = 0
+		self.openEdges = 0
+		for edge in edges:
+			if len(edge.faceIndexes) < 2:
+				self.openEdges += 1
+			elif len(edge.faceIndexes) > 2:
+				self.nonManifoldEdges += 1
+			if max(edge.vertexIndexes) >= len(vertexes):
+				self.missingVertexEdges += 1
+		self.isTopologyValid = self.openEdges + self.nonManifoldEdges + self.missingVertexEdges == 0
+		self.isIntersectionChecked = isIntersectionCheckAsked or not self.isTopologyValid
+
+	def __repr__(self):
+		'Get the string representation of the diagnostics.'
+		return '%s open edges, %s non manifold edges, %s missing vertex edges, layer issues: %s' % (
+			self.openEdges, self.nonManifoldEdges, self.missingVertexEdges, self.getIssueZs())
+
+	def addLayerIssue(self, z, issue, edgeIndex=None):
+		'Record a problem of the layer at the height.'
+		self.layerIssues.append({'z': z, 'issue': issue, 'edge': edgeIndex})
+
+	def getIssueZs(self):
+		'Get the heights of the layers with each issue.'
+		issueZs = {}
+		for layerIssue in self.layerIssues:
+			issueZs.setdefault(layerIssue['issue'], []).append(layerIssue['z'])
+		return issueZs
+
+	def getReport(self):
+		'Get the diagnostics as a dictionary, to be written as JSON.'
+		return {
+			'isTopologyValid': self.isTopologyValid,
+			'isIntersectionChecked': self.isIntersectionChecked,
+			'openEdges': self.openEdges,
+			'nonManifoldEdges': self.nonManifoldEdges,
+			'missingVertexEdges': self.missingVertexEdges,
+			'layerIssues': self.layerIssues}
+
+
 class TriangleMesh( group.Group ):
 	'A triangle mesh.'
 	def __init__(self):
 		'Add empty lists.'
 		group.Group.__init__(self)
 		self.belowLoops = []
+		self.cuspHeight = None
+		self.diagnostics = None
 		self.infillInDirectionOfBridge = False
 		self.edges = []
 		self.faces = []
 		self.importCoarseness = 1.0
 		self.isCorrectMesh = True
+		self.isIntersectionCheckAsked = False
+		self.layerPrintFrom = None
+		self.layerPrintTo = None
+		self.maximumLayerThickness = None
+		self.minimumLayerThickness = None
 		self.oldChainTetragrid = None
 		self.rotatedLoopLayers = []
 		self.transformedVertexes = None
@@ -759,20 +849,41 @@ class TriangleMesh( group.Group ):
 		'Get the corner minimum of the vertexes.'
 		return self.cornerMinimum
 
+	def getCarveDiagnostics(self):
+		'Get the mesh diagnostics, None until the mesh is sliced as a correct mesh.'
+		return self.diagnostics
+
 	def getCarveLayerThickness(self):
 		'Get the layer thickness.'
 		return self.layerThickness
 
 	def getCarveRotatedBoundaryLayers(self):
-		'Get the rotated boundary layers.'
+		'Get the rotated boundary layers in the layer range, only the layers in the range are sliced.'
 		if self.getMinimumZ() == None:
 			return []
 		halfHeight = 0.5 * self.layerThickness
 		self.zoneArrangement = ZoneArrangement(self.layerThickness, self.getTransformedVertexes())
-		layerTop = self.cornerMaximum.z - halfHeight * 0.5
-		z = self.cornerMinimum.z + halfHeight
-		while z < layerTop:
-			z = self.getZAddExtruderPaths(z)
+		if self.cuspHeight == None:
+			layerTop = self.cornerMaximum.z - halfHeight * 0.5
+			z = self.cornerMinimum.z + halfHeight
+			layerZs = []
+			while z < layerTop:
+				layerZs.append(z)
+				z += self.layerThickness
+			layerThicknesses = [None] * len(layerZs)
+		else:
+			layerZs, layerThicknesses = getAdaptiveLayerZsThicknesses(
+				self.faces, self.getTransformedVertexes(), self.cornerMinimum.z, self.cornerMaximum.z, self.layerThickness,
+				self.minimumLayerThickness, self.maximumLayerThickness, self.cuspHeight)
+		layerIndexes = range(len(layerZs))[self.layerPrintFrom : self.layerPrintTo]
+		if len(layerIndexes) < 1:
+			return self.rotatedLoopLayers
+		firstIndex = layerIndexes[0]
+		if self.infillInDirectionOfBridge and firstIndex > 0:
+			self.getZAddExtruderPaths(layerZs[firstIndex - 1], layerThicknesses[firstIndex - 1])
+			del self.rotatedLoopLayers[:]
+		for layerIndex in layerIndexes:
+			self.getZAddExtruderPaths(layerZs[layerIndex], layerThicknesses[layerIndex])
 		return self.rotatedLoopLayers
 
 	def getFabmetheusXML(self):
@@ -797,7 +908,9 @@ class TriangleMesh( group.Group ):
 		originalLoops = []
 		self.setEdgesForAllFaces()
 		if self.isCorrectMesh:
-			originalLoops = getLoopsFromCorrectMesh( self.edges, self.faces, self.getTransformedVertexes(), z )
+			if self.diagnostics == None:
+				self.diagnostics = MeshDiagnostics(self.edges, self.vertexes, self.isIntersectionCheckAsked)
+			originalLoops = getLoopsFromCorrectMesh( self.edges, self.faces, self.getTransformedVertexes(), z, self.diagnostics )
 		if len( originalLoops ) < 1:
 			originalLoops = getLoopsFromUnprovenMesh( self.edges, self.faces, self.importRadius, self.getTransformedVertexes(), z )
 		loops = euclidean.getSimplifiedLoops(originalLoops, self.importRadius)
@@ -805,15 +918,12 @@ class TriangleMesh( group.Group ):
 		return getOrientedLoops(loops)
 
 	def getMinimumZ(self):
-		'Get the minimum z.'
-		self.cornerMaximum = Vector3(-987654321.0, -987654321.0, -987654321.0)
-		self.cornerMinimum = Vector3(987654321.0, 987654321.0, 987654321.0)
+		'Get the minimum z, setting the corners with one reduction for each coordinate.'
 		transformedVertexes = self.getTransformedVertexes()
+		self.cornerMaximum = euclidean.getMaximumByVector3Path(transformedVertexes)
+		self.cornerMinimum = euclidean.getMinimumByVector3Path(transformedVertexes)
 		if len(transformedVertexes) < 1:
 			return None
-		for point in transformedVertexes:
-			self.cornerMaximum.maximize(point)
-			self.cornerMinimum.minimize(point)
 		return self.cornerMinimum.z
 
 	def getTransformedVertexes(self):
@@ -839,16 +949,20 @@ class TriangleMesh( group.Group ):
 		self.transformedVertexes = None
 		return self.vertexes
 
-	def getZAddExtruderPaths(self, z):
-		'Get next z and add extruder loops.'
+	def getZAddExtruderPaths(self, z, thickness=None):
+		'Get next z and add extruder loops. A layer with its own thickness is sliced at z and printed at its top less half the layer thickness.'
 		#settings.printProgress(len(self.rotatedLoopLayers), 'slice')
 		
 		rotatedLoopLayer = euclidean.RotatedLoopLayer(z)
+		if thickness != None:
+			rotatedLoopLayer.z = z + 0.5 * (thickness - self.layerThickness)
+			rotatedLoopLayer.thickness = thickness
 		rotatedLoopLayer.loops = self.getLoopsFromMesh(self.zoneArrangement.getEmptyZ(z))
 		return getZAddExtruderPathsBySolidCarving(rotatedLoopLayer, self, z)
 
 	def liftByMinimumZ(self, minimumZ):
 		'Lift the triangle mesh to the altitude.'
+		from fabmetheus_utilities.geometry.geometry_utilities import evaluate
 		altitude = evaluate.getEvaluatedFloat(None, 'altitude', self.xmlElement)
 		if altitude == None:
 			return
@@ -856,6 +970,23 @@ class TriangleMesh( group.Group ):
 		for vertex in self.vertexes:
 			vertex.z += lift
 
+	def repairCarveMesh(self, tolerance, maximumHolePerimeter):
+		'Repair the mesh before it is sliced and get the report of the repairs, the edges are made again from the repaired faces.'
+		from fabmetheus_utilities.geometry.solids import mesh_repair
+		report = mesh_repair.repairMesh(self.faces, self.vertexes, tolerance, maximumHolePerimeter)
+		if report.isChanged():
+			self.edges = []
+			for face in self.faces:
+				face.edgeIndexes = []
+			self.transformedVertexes = None
+		return report
+
+	def setCarveAdaptiveLayerThickness(self, minimumLayerThickness, maximumLayerThickness, cuspHeight):
+		'Set the adaptive layer thickness range and the highest stair step allowed on a sloped surface.'
+		self.minimumLayerThickness = minimumLayerThickness
+		self.maximumLayerThickness = maximumLayerThickness
+		self.cuspHeight = cuspHeight
+
 	def setCarveInfillInDirectionOfBridge( self, infillInDirectionOfBridge ):
 		'Set the infill in direction of bridge.'
 		self.infillInDirectionOfBridge = infillInDirectionOfBridge
@@ -864,6 +995,11 @@ class TriangleMesh( group.Group ):
 		'Set the layer thickness.'
 		self.layerThickness = layerThickness
 
+	def setCarveLayerRange(self, layerPrintFrom, layerPrintTo):
+		'Set the range of layer indexes to carve, as a slice of all the layers.'
+		self.layerPrintFrom = layerPrintFrom
+		self.layerPrintTo = layerPrintTo
+
 	def setCarveImportRadius( self, importRadius ):
 		'Set the import radius.'
 		self.importRadius = importRadius
@@ -872,6 +1008,10 @@ class TriangleMesh( group.Group ):
 		'Set the is correct mesh flag.'
 		self.isCorrectMesh = isCorrectMesh
 
+	def setCarveIsIntersectionChecked( self, isIntersectionCheckAsked ):
+		'Set whether the loops of each layer are checked for intersections even when the mesh topology is valid.'
+		self.isIntersectionCheckAsked = isIntersectionCheckAsked
+
 	def setEdgesForAllFaces(self):
 		'Set the face edges of all the faces.'
 		edgeTable = {}
@@ -880,27 +1020,29 @@ class TriangleMesh( group.Group ):
 
 
 class ZoneArrangement:
-	'A zone arrangement.'
+	'A zone arrangement, the zones next to the vertex heights are taken, kept as sorted arrays of the bottoms and tops of the runs of taken zones.'
 	def __init__(self, layerThickness, vertexes):
-		'Initialize the zone interval and the zZone table.'
+		'Initialize the zone interval and the runs of taken zones, each vertex takes the floor and ceiling zones of its height.'
 		self.zoneInterval = layerThickness / math.sqrt(len(vertexes)) / 1000.0
-		self.zZoneSet = set()
-		for point in vertexes:
-			zoneIndexFloat = point.z / self.zoneInterval
-			self.zZoneSet.add(math.floor(zoneIndexFloat))
-			self.zZoneSet.add(math.ceil(zoneIndexFloat ))
+		self.zoneRunBottoms = array('d')
+		self.zoneRunTops = array('d')
+		for zoneIndexFloat in sorted([point.z / self.zoneInterval for point in vertexes]):
+			zoneBottom = math.floor(zoneIndexFloat)
+			zoneTop = math.ceil(zoneIndexFloat)
+			if len(self.zoneRunTops) > 0 and zoneBottom <= self.zoneRunTops[-1] + 1.0:
+				self.zoneRunTops[-1] = max(self.zoneRunTops[-1], zoneTop)
+			else:
+				self.zoneRunBottoms.append(zoneBottom)
+				self.zoneRunTops.append(zoneTop)
 
 	def getEmptyZ(self, z):
-		'Get the first z which is not in the zone table.'
+		'Get the nearest z which is not in a taken zone, the lower one when both are as near.'
 		zoneIndex = round(z / self.zoneInterval)
-		if zoneIndex not in self.zZoneSet:
+		runIndex = bisect.bisect_right(self.zoneRunBottoms, zoneIndex) - 1
+		if runIndex < 0 or self.zoneRunTops[runIndex] < zoneIndex:
 			return z
-		zoneAround = 1
-		while 1:
-			zoneDown = zoneIndex - zoneAround
-			if zoneDown not in self.zZoneSet:
-				return zoneDown * self.zoneInterval
-			zoneUp = zoneIndex + zoneAround
-			if zoneUp not in self.zZoneSet:
-				return zoneUp * self.zoneInterval
-			zoneAround += 1
+		zoneDown = self.zoneRunBottoms[runIndex] - 1.0
+		zoneUp = self.zoneRunTops[runIndex] + 1.0
+		if zoneIndex - zoneDown <= zoneUp - zoneIndex:
+			return zoneDown * self.zoneInterval
+		return zoneUp * self.zoneInterval
@@ -9,6 +9,7 @@ from fabmetheus_utilities import archive
 from fabmetheus_utilities import euclidean
 from fabmetheus_utilities import intercircle
 from fabmetheus_utilities import svg_writer
+from fabmetheus_utilities import xml_simple_reader
 import math
 import os
 import sys
@@ -884,6 +885,54 @@ class SVGReader:
 			for rotatedLoopLayer in self.rotatedLoopLayers:
 				self.flipDirectLayer(rotatedLoopLayer)
 
+	def parseSVGByTextLines(self, fileName, textLines):
+		"Parse the SVG text lines an element at a time and store the layers, keeping only the elements which are still open."
+		self.fileName = fileName
+		self.root = None
+		self.sliceDictionary = None
+		self.yAxisPointingUpward = False
+		isXML = False
+		parentNode = None
+		for line in xml_simple_reader.getXMLLinesByTextLines(textLines):
+			lineStripped = line.strip()
+			if len(lineStripped) < 1:
+				continue
+			if lineStripped.startswith('<?xml'):
+				isXML = True
+				continue
+			if not isXML:
+				continue
+			if lineStripped.startswith('</'):
+				if parentNode != None:
+					closedXMLElement = parentNode
+					parentNode = parentNode.parentNode
+					closedXMLElement.removeFromIDNameParent()
+				continue
+			xmlElement = xml_simple_reader.XMLElement()
+			isOpen = xmlElement.getParentParseReplacedLine(line, lineStripped, parentNode) == xmlElement
+			if self.root == None and xmlElement.localName.lower() not in ['comment', '!doctype']:
+				self.root = xmlElement
+			if self.sliceDictionary == None and xmlElement.localName.lower() == 'slice:layers':
+				if parentNode != None and parentNode.localName == 'metadata' and parentNode.parentNode == self.root:
+					self.sliceDictionary = xmlElement.attributeDictionary
+					self.yAxisPointingUpward = euclidean.getBooleanFromDictionary(False, self.sliceDictionary, 'yAxisPointingUpward')
+			self.processXMLElement(xmlElement)
+			if self.stopProcessing:
+				break
+			if isOpen:
+				parentNode = xmlElement
+			else:
+				xmlElement.removeFromIDNameParent()
+		if self.sliceDictionary == None:
+			self.sliceDictionary = {}
+		if self.root == None:
+			print('Warning, root was None in parseSVGByTextLines in SVGReader, so nothing will be done for:')
+			print(fileName)
+			return
+		if not self.yAxisPointingUpward:
+			for rotatedLoopLayer in self.rotatedLoopLayers:
+				self.flipDirectLayer(rotatedLoopLayer)
+
 	def processXMLElement(self, xmlElement):
 		"Process the xml element."
 		if self.stopProcessing:
@@ -6,10 +6,8 @@ Svg_writer uses the layer_template.svg file in the templates folder in the same
 """
 
 from fabmetheus_utilities.vector3 import Vector3
-from fabmetheus_utilities.xml_simple_reader import XMLSimpleReader
 from fabmetheus_utilities import archive
 from fabmetheus_utilities import euclidean
-from fabmetheus_utilities import xml_simple_reader
 from fabmetheus_utilities import xml_simple_writer
 import os, sys, math, StringIO
 from importlib import import_module
@@ -27,7 +25,8 @@ def getCarving(fileName):
 	'Get a carving for the file using an import plugin.'
 	
 	fileExtension = os.path.splitext(fileName)[1][1:].lower()
-	sys.path.insert(0, __interpret_plugins_path__)
+	if __interpret_plugins_path__ not in sys.path:
+		sys.path.insert(0, __interpret_plugins_path__)
 	pluginModule = import_module(fileExtension)
 	if pluginModule == None:
 		return None
@@ -124,6 +123,7 @@ class SVGWriter:
 
 	def addOriginalAsComment(self, xmlElement):
 		'Add original xmlElement as a comment.'
+		from fabmetheus_utilities import xml_simple_reader
 		if xmlElement == None:
 			return
 		if xmlElement.localName == 'comment':
@@ -166,6 +166,7 @@ class SVGWriter:
 
 	def getReplacedSVGTemplate(self, fileName, procedureName, rotatedLoopLayers, xmlElement=None):
 		'Get the lines of text from the layer_template.svg file.'
+		from fabmetheus_utilities.xml_simple_reader import XMLSimpleReader
 		self.extent = self.cornerMaximum - self.cornerMinimum
 		svgTemplateText = archive.getFileText(archive.getTemplatesPath('layer_template.svg'))
 		self.xmlParser = XMLSimpleReader( fileName, None, svgTemplateText )
@@ -33,7 +33,7 @@ __date__ = '$Date: 2008/21/04 $'
 __license__ = 'GNU Affero General Public License http://www.gnu.org/licenses/agpl.html'
 
 
-class Vector3:
+class Vector3(object):
 	'A three dimensional vector class.'
 	__slots__ = ['x', 'y', 'z']
 
@@ -82,6 +82,10 @@ class Vector3:
 			return getattr(self, attributeName, None)
 		return None
 
+	def __getstate__(self):
+		'Get the state for pickling, a slotted object has no dictionary.'
+		return (self.x, self.y, self.z)
+
 	def __hash__(self):
 		'Determine whether this vector is identical to other one.'
 		return self.__repr__().__hash__()
@@ -167,6 +171,12 @@ class Vector3:
 		if attributeName in globalSetAccessibleAttributeSet:
 			setattr(self, attributeName, value)
 
+	def __setstate__(self, state):
+		'Set the state when unpickling, from the tuple of __getstate__ or the dictionary of an old pickle.'
+		if state.__class__ == dict:
+			state = (state['x'], state['y'], state['z'])
+		(self.x, self.y, self.z) = state
+
 	def __sub__(self, other):
 		'Get the difference between the Vector3 and other one.'
 		return Vector3( self.x - other.x, self.y - other.y, self.z - other.z )
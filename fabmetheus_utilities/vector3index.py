@@ -32,7 +32,7 @@ __date__ = '$Date: 2008/21/04 $'
 __license__ = 'GNU Affero General Public License http://www.gnu.org/licenses/agpl.html'
 
 
-class Vector3Index:
+class Vector3Index(object):
 	'A three dimensional vector index class.'
 	__slots__ = ['index', 'x', 'y', 'z']
 
@@ -83,6 +83,10 @@ class Vector3Index:
 			return getattr(self, attributeName, None)
 		return None
 
+	def __getstate__(self):
+		'Get the state for pickling, a slotted object has no dictionary.'
+		return (self.index, self.x, self.y, self.z)
+
 	def __hash__(self):
 		'Determine whether this vector is identical to other one.'
 		return self.__repr__().__hash__()
@@ -168,6 +172,10 @@ class Vector3Index:
 		if attributeName in globalSetAccessibleAttributeSet:
 			setattr(self, attributeName, value)
 
+	def __setstate__(self, state):
+		'Set the state when unpickling.'
+		(self.index, self.x, self.y, self.z) = state
+
 	def __sub__(self, other):
 		'Get the difference between the Vector3 and other one.'
 		return Vector3Index( self.index, self.x - other.x, self.y - other.y, self.z - other.z )
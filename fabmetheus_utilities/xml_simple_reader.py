@@ -58,8 +58,11 @@ def addXMLLine(line, xmlLines):
 
 def getXMLLines(text):
 	'Get the all the xml lines of a text.'
+	return list(getXMLLinesByTextLines(archive.getTextLines(text)))
+
+def getXMLLinesByTextLines(textLines):
+	'Get the xml lines of the text lines one at a time, so that the text lines can be read from a file as they are needed.'
 	accumulatedOutput = None
-	textLines = archive.getTextLines(text)
 	combinedLines = []
 	lastWord = '>'
 	for textLine in textLines:
@@ -83,10 +86,10 @@ def getXMLLines(text):
 					addXMLLine( accumulatedOutput.getvalue(), combinedLines )
 					accumulatedOutput = None
 					lastWord = '>'
-	xmlLines = []
-	for combinedLine in combinedLines:
-		xmlLines += getXMLTagSplitLines(combinedLine)
-	return xmlLines
+		for combinedLine in combinedLines:
+			for xmlLine in getXMLTagSplitLines(combinedLine):
+				yield xmlLine
+		combinedLines = []
 
 def getXMLTagSplitLines(combinedLine):
 	'Get the xml lines split at a tag.'
@@ -10,6 +10,10 @@ replace.filename=replace.csv
 export.slicedmodel=true
 export.slicedmodel.extension=slicedmodel.pickle
 overwrite.exported.slicedmodel=true
+; Generates the gcode of the layers in parallel processes, the layers are still written in order.
+multiprocess=false
+; Number of processes for the parallel export, 0 for one per cpu.
+multiprocess.workers=0
 
 
 [preface]
@@ -24,12 +28,26 @@ startup.extruder.reset=true
 [carve]
 debug=false
 layer.height=0.4
+; Adaptive layer height slices thicker layers where the walls are steep and thinner layers where the surface slopes are shallow, so the stair step on a sloped surface stays below the cusp height. The first layer keeps the layer height. The flow and the bridge width follow the thickness of each layer, while the perimeter and infill widths come from the extrusion width, which is the same on every layer.
+layer.height.adaptive=false
+layer.height.adaptive.minimum=0.2
+layer.height.adaptive.maximum=0.5
+layer.height.adaptive.cusp=0.15
 extrusion.width=0.6
+; Only the layers in the print range are sliced, as a python slice of the layer indexes, so negative values count from the top.
 layer.print.from=0
 layer.print.to=912345678
 infill.bridge.direction=true
 mesh.correct=true
+; Mesh repair merges the vertexes nearer than the tolerance, removes degenerate and duplicate faces, turns flipped faces and closes the holes whose perimeter is at most the hole perimeter, once before slicing, so a broken mesh can still be sliced as a correct mesh. A mesh which is already closed and oriented is left as it is.
+mesh.repair=true
+mesh.repair.tolerance=0.0001
+mesh.repair.hole.perimeter=10.0
+; The mesh topology is validated once before slicing, and the loops of each layer are only checked for intersections when it is not valid, unless the check is asked for here. The problems of each layer are logged after carving and written to a .diagnostics.json file when debug is on.
+mesh.intersection.check=false
 import.coarseness.ratio=1.0
+; Layers whose loops are exactly the same as those of an earlier layer reuse its perimeters and, when the layers around them are the same too, its infill.
+identical.layers.reuse=true
 
 [inset]
 debug=false
@@ -64,7 +82,12 @@ diaphragm.thickness=0
 infill.rotation.begin=45.0
 infill.rotation.repeat=1
 infill.rotation.odd.layer=90.0
-; LineFillStrategy
+; Sparse infill is printed every n layers with the volume of the n layers, the perimeters are still printed every layer. 1 prints it every layer.
+; Above 1 each group of n layers starts the infill rotation one turn after the group before it, so the combined infill also turns.
+infill.sparse.combine.layers=1
+; lines | grid | triangles, the pattern of the sparse infill of the RectilinearFillStrategy.
+infill.sparse.pattern=lines
+; LineFillStrategy | RectilinearFillStrategy
 strategy.path=plugins/strategies
 strategy=LineFillStrategy
 
@@ -140,3 +163,10 @@ cool.end.file=cool_end.gmc
 strategy.path=plugins/strategies
 strategy=SlowDownCoolStrategy
 orbital.margin=10.0
+
+[estimate]
+; Report of the per layer and total print time, distances and filament. Written next to the model unless an output filename is given.
+export.report=true
+report.extension=estimate.txt
+; Models acceleration.rate from the speed section with a trapezoidal profile per segment.
+acceleration.active=true
\ No newline at end of file
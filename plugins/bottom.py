@@ -12,14 +12,13 @@ License:
 
 from fabmetheus_utilities import archive
 import os, sys, time, math, logging
-from config import config
 
 logger = logging.getLogger(__name__)
 name = __name__
 
 def performAction(slicedModel):
 	"Align the model to the bottom of the printing plane"
-	if not config.getboolean(name, 'active'):
+	if not slicedModel.runtimeParameters.profile.getboolean(name, 'active'):
 		logger.info("%s plugin is not active", name.capitalize())
 		return
 	BottomSkein(slicedModel).bottom()
@@ -28,11 +27,12 @@ class BottomSkein:
 	"A class to bottom a skein of extrusions."
 	def __init__(self, slicedModel):
 		self.slicedModel = slicedModel
-		self.additionalHeightRatio = config.getfloat(name, 'additional.height.ratio')
-		self.altitude = config.getfloat(name, 'altitude')
-		self.layerThickness = config.getfloat('carve', 'layer.height')
-		self.perimeterWidth = config.getfloat('carve', 'extrusion.width')
-		self.decimalPlaces = config.getint('general', 'decimal.places')
+		profile = slicedModel.runtimeParameters.profile
+		self.additionalHeightRatio = profile.getfloat(name, 'additional.height.ratio')
+		self.altitude = profile.getfloat(name, 'altitude')
+		self.layerThickness = profile.getfloat('carve', 'layer.height')
+		self.perimeterWidth = profile.getfloat('carve', 'extrusion.width')
+		self.decimalPlaces = profile.getint('general', 'decimal.places')
 
 	def bottom(self):
 		"Parse svgText and store the bottom svgText."
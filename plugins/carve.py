@@ -10,8 +10,8 @@ License:
 	GNU Affero General Public License http://www.gnu.org/licenses/agpl.html
 """
 
-from config import config
 from fabmetheus_utilities import archive, svg_writer, vector3
+import json
 import logging
 import math
 
@@ -25,7 +25,7 @@ def performAction(slicedModel):
 	carving = svg_writer.getCarving(filename)
 	if carving == None:
 		return
-	if config.getboolean(name, 'debug'):
+	if slicedModel.runtimeParameters.profile.getboolean(name, 'debug'):
 		carvingFilename = filename[: filename.rfind('.')] + '.carving.xml'
 		archive.writeFileText(carvingFilename , str(carving))
 		logger.info("Carving XML written to %s", carvingFilename)
@@ -37,14 +37,24 @@ class CarveSkein:
 	def __init__(self, slicedModel):
 		'Initialize'
 		self.slicedModel = slicedModel
-		self.layerHeight = config.getfloat(name, 'layer.height')
-		self.extrusionWidth = config.getfloat(name, 'extrusion.width')
-		self.infillBridgeDirection = config.getboolean(name, 'infill.bridge.direction')
-		self.importCoarsenessRatio = config.getfloat(name, 'import.coarseness.ratio')
-		self.correctMesh = config.getboolean(name, 'mesh.correct')
-		self.decimalPlaces = config.getint('general', 'decimal.places')
-		self.layerPrintFrom = config.getint(name, 'layer.print.from')
-		self.layerPrintTo = config.getint(name, 'layer.print.to')
+		profile = slicedModel.runtimeParameters.profile
+		self.layerHeight = profile.getfloat(name, 'layer.height')
+		self.extrusionWidth = profile.getfloat(name, 'extrusion.width')
+		self.infillBridgeDirection = profile.getboolean(name, 'infill.bridge.direction')
+		self.importCoarsenessRatio = profile.getfloat(name, 'import.coarseness.ratio')
+		self.correctMesh = profile.getboolean(name, 'mesh.correct')
+		self.meshRepair = profile.getboolean(name, 'mesh.repair')
+		self.meshRepairTolerance = profile.getfloat(name, 'mesh.repair.tolerance')
+		self.meshRepairHolePerimeter = profile.getfloat(name, 'mesh.repair.hole.perimeter')
+		self.meshIntersectionCheck = profile.getboolean(name, 'mesh.intersection.check')
+		self.decimalPlaces = profile.getint('general', 'decimal.places')
+		self.layerPrintFrom = profile.getint(name, 'layer.print.from')
+		self.layerPrintTo = profile.getint(name, 'layer.print.to')
+		self.adaptiveLayerHeight = profile.getboolean(name, 'layer.height.adaptive')
+		self.adaptiveLayerHeightMinimum = profile.getfloat(name, 'layer.height.adaptive.minimum')
+		self.adaptiveLayerHeightMaximum = profile.getfloat(name, 'layer.height.adaptive.maximum')
+		self.adaptiveCuspHeight = profile.getfloat(name, 'layer.height.adaptive.cusp')
+		self.debug = profile.getboolean(name, 'debug')
 				
 	def carve(self, carving):
 		"Parse 3D model file and store the carved slicedModel."
@@ -54,17 +64,23 @@ class CarveSkein:
 		importRadius = 0.5 * self.importCoarsenessRatio * abs(self.extrusionWidth)
 		carving.setCarveImportRadius(max(importRadius, 0.001 * self.layerHeight))
 		carving.setCarveIsCorrectMesh(self.correctMesh)
+		carving.setCarveIsIntersectionChecked(self.meshIntersectionCheck)
+		if self.meshRepair:
+			self.repairMesh(carving)
+		carving.setCarveLayerRange(self.layerPrintFrom, self.layerPrintTo)
+		if self.adaptiveLayerHeight:
+			carving.setCarveAdaptiveLayerThickness(self.adaptiveLayerHeightMinimum, self.adaptiveLayerHeightMaximum, self.adaptiveCuspHeight)
 		
-		rotatedLoopLayers = carving.getCarveRotatedBoundaryLayers()
+		toBePrintedLayers = carving.getCarveRotatedBoundaryLayers()
+		self.reportDiagnostics(carving.getCarveDiagnostics())
 
-		if len(rotatedLoopLayers) < 1:
-			logger.warning('There are no slices for the model, this could be because the model is too small for the Layer Thickness.')
+		if len(toBePrintedLayers) < 1:
+			logger.warning('There are no slices for the model, this could be because the model is too small for the Layer Thickness or the layer print range is empty.')
 			return
 		
 		self.slicedModel.carvingCornerMaximum = carving.getCarveCornerMaximum()
 		self.slicedModel.carvingCornerMinimum = carving.getCarveCornerMinimum()
 
-		toBePrintedLayers = rotatedLoopLayers[self.layerPrintFrom : self.layerPrintTo]
 		for toBePrintedLayer in toBePrintedLayers:
 			sortedLoops = []
 			for toBePrintedLayerLoop in toBePrintedLayer.loops:
@@ -75,7 +91,7 @@ class CarveSkein:
 
 		self.slicedModel.rotatedLoopLayers = toBePrintedLayers
 				
-		if config.getboolean(name, 'debug'):
+		if self.debug:
 			filename = self.slicedModel.runtimeParameters.inputFilename
 			svgFilename = filename[: filename.rfind('.')] + '.svg'
 			svgWriter = svg_writer.SVGWriter(
@@ -88,6 +104,35 @@ class CarveSkein:
 			archive.writeFileText(svgFilename , svgWriter.getReplacedSVGTemplate(self.slicedModel.runtimeParameters.inputFilename, '', self.slicedModel.rotatedLoopLayers))
 			logger.info("Carving SVG written to %s", svgFilename)
 			
+	def repairMesh(self, carving):
+		'Repair the mesh of the carving and log what was fixed and what faults are left.'
+		report = carving.repairCarveMesh(self.meshRepairTolerance, self.meshRepairHolePerimeter)
+		if report == None:
+			return
+		if report.isChanged():
+			logger.info('Mesh repaired: %s.', report)
+		if not report.isCorrect():
+			logger.warning('The mesh still has %s open edges and %s non manifold edges after the repair, the layers cutting them are sliced as an unproven mesh.', report.openEdges, report.nonManifoldEdges)
+
+	def reportDiagnostics(self, diagnostics):
+		'Log the mesh topology problems and the layers which could not be sliced as a correct mesh, and write them as JSON when debugging.'
+		if diagnostics == None:
+			return
+		if not diagnostics.isTopologyValid:
+			logger.warning('The mesh has %s open edges, %s non manifold edges and %s edges with a missing vertex, so the loops of each layer are checked for intersections.',
+				diagnostics.openEdges, diagnostics.nonManifoldEdges, diagnostics.missingVertexEdges)
+		issueDescriptions = {
+			'dangling': 'have dangling edges',
+			'hole': 'cut a hole in the mesh',
+			'intersection': 'have intersecting loops'}
+		for issue, zs in sorted(diagnostics.getIssueZs().items()):
+			logger.warning('%s layers %s and are sliced as an unproven mesh, check the layers at z: %s', len(zs), issueDescriptions.get(issue, issue), ', '.join(str(z) for z in zs))
+		if self.debug:
+			filename = self.slicedModel.runtimeParameters.inputFilename
+			diagnosticsFilename = filename[: filename.rfind('.')] + '.diagnostics.json'
+			archive.writeFileText(diagnosticsFilename, json.dumps(diagnostics.getReport(), indent=1))
+			logger.info('Mesh diagnostics written to %s', diagnosticsFilename)
+
 	def getLowerLeftCorner(self, points):
 		'Get the lower left corner point from a set of points.'
 		lowerLeftCorner = None
@@ -11,7 +11,6 @@ License:
 	GNU Affero General Public License http://www.gnu.org/licenses/agpl.html
 """
 
-from config import config
 from fabmetheus_utilities import archive, euclidean, intercircle
 import logging
 import math
@@ -36,10 +35,7 @@ class CombSkein:
 		perimeters = []
 		layer.getPerimeterPaths(perimeters)
 		for perimeter in perimeters:
-			x = []
-			for boundaryPoint in perimeter.boundaryPoints:
-				x.append(boundaryPoint.dropAxis())
-			self.boundaries.append(x)
+			self.boundaries.append(perimeter.boundaryPoints)
 				
 	def getBetweens(self):
 		"Set betweens for the layer."
@@ -10,7 +10,6 @@ License:
 	GNU Affero General Public License http://www.gnu.org/licenses/agpl.html
 """
 
-from config import config
 from fabmetheus_utilities import archive, euclidean, intercircle
 from entities import GcodeCommand
 import gcodes
@@ -23,7 +22,7 @@ logger = logging.getLogger(name)
 
 def performAction(slicedModel):
 	'Give the extrusion time to cool down.'
-	if not config.getboolean(name, 'active'):
+	if not slicedModel.runtimeParameters.profile.getboolean(name, 'active'):
 		logger.info("%s plugin is not active", name.capitalize())
 		return
 	CoolSkein(slicedModel).cool()
@@ -32,13 +31,14 @@ class CoolSkein:
 	'A class to cool a skein of extrusions.'
 	def __init__(self, slicedModel):
 		self.slicedModel = slicedModel
+		profile = slicedModel.runtimeParameters.profile
 		
-		self.turnFanOnAtBeginning = config.getboolean(name, 'turn.on.fan.at.beginning')
-		self.turnFanOffAtEnding = config.getboolean(name, 'turn.off.fan.at.end')
-		self.nameOfCoolStartFile = config.get(name, 'cool.start.file')
-		self.nameOfCoolEndFile = config.get(name, 'cool.end.file')
-		self.coolStrategyName = config.get(name, 'strategy')
-		self.coolStrategyPath = config.get(name, 'strategy.path')
+		self.turnFanOnAtBeginning = profile.getboolean(name, 'turn.on.fan.at.beginning')
+		self.turnFanOffAtEnding = profile.getboolean(name, 'turn.off.fan.at.end')
+		self.nameOfCoolStartFile = profile.get(name, 'cool.start.file')
+		self.nameOfCoolEndFile = profile.get(name, 'cool.end.file')
+		self.coolStrategyName = profile.get(name, 'strategy')
+		self.coolStrategyPath = profile.get(name, 'strategy.path')
 		self.absoluteCoolStartFilePath = os.path.join('alterations', self.nameOfCoolStartFile)
 		self.absoluteCoolEndFilePath = os.path.join('alterations', self.nameOfCoolEndFile)
 		self.coolStartLines = archive.getTextLines(archive.getFileText(self.absoluteCoolEndFilePath, printWarning=False))
@@ -0,0 +1,174 @@
+"""
+Estimates the print time, travel and extrusion distances and the filament used by the sliced model, without generating any gcode.
+
+The estimate follows the same path order as the gcode writer: each path is preceded by a travel from the end of the previous path,
+including the retraction and reverse retraction when dimension is active. Comb detours are not followed, travels are taken as straight lines.
+When acceleration is modelled each segment is treated as starting and ending at rest with a trapezoidal speed profile.
+
+License:
+	GNU Affero General Public License http://www.gnu.org/licenses/agpl.html
+"""
+
+from entities import TravelPath
+from fabmetheus_utilities import archive
+from fabmetheus_utilities.vector3 import Vector3
+from StringIO import StringIO
+from datetime import timedelta
+import logging
+import math
+import os
+import string
+
+name = 'estimate'
+logger = logging.getLogger(name)
+
+def performAction(slicedModel):
+	'Estimate the print time and filament used by the sliced model.'
+	return EstimateSkein(slicedModel).estimate()
+
+class EstimateSkein:
+	'A class to estimate the print time of a skein of extrusions.'
+	def __init__(self, slicedModel):
+		self.slicedModel = slicedModel
+		profile = slicedModel.runtimeParameters.profile
+		self.exportReport = profile.getboolean(name, 'export.report')
+		self.reportExtension = profile.get(name, 'report.extension')
+		self.addProfileExtension = profile.getboolean('export', 'file.extension.profile')
+		self.firstLayerFeedRateRatio = profile.getfloat('speed', 'feed.rate.first.layer.ratio')
+		self.firstLayerFlowRateRatio = profile.getfloat('speed', 'flow.rate.first.layer.ratio')
+		self.accelerationRate = 0.0
+		if profile.getboolean(name, 'acceleration.active'):
+			self.accelerationRate = profile.getfloat('speed', 'acceleration.rate')
+		runtimeParameters = self.slicedModel.runtimeParameters
+		self.dimensionActive = runtimeParameters.dimensionActive
+		self.extruderRetractionSpeed = runtimeParameters.extruderRetractionSpeed
+		filamentRadius = 0.5 * runtimeParameters.filamentDiameter
+		self.filamentArea = math.pi * filamentRadius * filamentRadius
+
+	def estimate(self):
+		'Estimate each layer and export the report.'
+		printEstimate = PrintEstimate(self.filamentArea)
+		layerCount = len(self.slicedModel.layers)
+		for layer in self.slicedModel.layers:
+			lookaheadStartVector = None
+			lookaheadIndex = layer.index + 1
+			if lookaheadIndex < layerCount:
+				lookaheadLayer = self.slicedModel.layers[lookaheadIndex]
+				lookaheadStartPoint = lookaheadLayer.getStartPoint()
+				if lookaheadStartPoint != None:
+					lookaheadStartVector = Vector3(lookaheadStartPoint.real, lookaheadStartPoint.imag, lookaheadLayer.z)
+			printEstimate.layerEstimates.append(self.getLayerEstimate(layer, lookaheadStartVector))
+
+		logger.info('Estimated print time: %s, extrusion distance: %.1fmm, travel distance: %.1fmm, filament: %.1fmm (%.2fcm3)',
+			timedelta(seconds=round(printEstimate.getDuration())), printEstimate.getExtrusionDistance(), printEstimate.getTravelDistance(),
+			printEstimate.getFilamentLength(), printEstimate.getFilamentVolume() / 1000.0)
+
+		if self.exportReport:
+			reportFilename = self.getReportFilename()
+			archive.writeFileText(reportFilename, str(printEstimate))
+			logger.info('Estimate exported to: %s', reportFilename)
+		return printEstimate
+
+	def getFeedAndFlowRateMultiplier(self, layer):
+		'Get the layer multiplier, using the first layer ratios as the export does.'
+		if layer.index == 0:
+			return [self.firstLayerFeedRateRatio, self.firstLayerFlowRateRatio]
+		return layer.feedAndFlowRateMultiplier
+
+	def getLayerEstimate(self, layer, parentLookaheadStartVector=None):
+		'Follow the ordered paths of the layer, adding the travel between each path.'
+		layerEstimate = LayerEstimate(layer.index, layer.z)
+		feedAndFlowRateMultiplier = self.getFeedAndFlowRateMultiplier(layer)
+		layerParameters = self.slicedModel.runtimeParameters.getPathParameters(layer.thickness)
+		pathList = layer.getOrderedPathList()
+		pathListCount = len(pathList)
+		for (index, path) in enumerate(pathList):
+			if index + 1 < pathListCount:
+				lookaheadStartPoint = pathList[index + 1].getStartPoint()
+				lookaheadVector = Vector3(lookaheadStartPoint.real, lookaheadStartPoint.imag, layer.z)
+			else:
+				lookaheadVector = parentLookaheadStartVector
+
+			previousVector = None
+			if index > 0:
+				previousPoint = pathList[index - 1].getEndPoint()
+				previousVector = Vector3(previousPoint.real, previousPoint.imag, layer.z)
+
+			nextPoint = path.getStartPoint()
+			nextVector = Vector3(nextPoint.real, nextPoint.imag, layer.z)
+
+			travelPath = TravelPath(layer.z, layer.runtimeParameters, previousVector, nextVector, None)
+			(travelDistance, travelDuration) = travelPath.getDistanceAndDuration(feedAndFlowRateMultiplier[0], self.accelerationRate)
+			layerEstimate.travelDistance += travelDistance
+			layerEstimate.duration += travelDuration
+			if self.dimensionActive:
+				retractionDistance = travelPath.getRetractionExtrusionDistance(lookaheadVector)
+				if retractionDistance > 0.0:
+					layerEstimate.retractionCount += 1
+					layerEstimate.duration += 2.0 * retractionDistance / self.extruderRetractionSpeed
+
+			(pathDistance, pathDuration) = path.getDistanceAndDuration(feedAndFlowRateMultiplier[0], self.accelerationRate)
+			layerEstimate.extrusionDistance += pathDistance
+			layerEstimate.duration += pathDuration
+			if self.dimensionActive:
+				layerEstimate.filamentLength += path.getFilamentLength(pathDistance, feedAndFlowRateMultiplier, layerParameters)
+		return layerEstimate
+
+	def getReportFilename(self):
+		'Get the report filename, following the naming of the export plugin.'
+		runtimeParameters = self.slicedModel.runtimeParameters
+		if runtimeParameters.outputFilename != None:
+			return runtimeParameters.outputFilename
+		reportFilename = os.path.splitext(runtimeParameters.inputFilename)[0]
+		if self.addProfileExtension and runtimeParameters.profileName:
+			reportFilename += '.' + string.replace(runtimeParameters.profileName, ' ', '_')
+		return reportFilename + '.' + self.reportExtension
+
+class LayerEstimate:
+	'The estimated time and distances of a single layer.'
+	def __init__(self, index, z):
+		self.index = index
+		self.z = z
+		self.duration = 0.0
+		self.extrusionDistance = 0.0
+		self.travelDistance = 0.0
+		self.filamentLength = 0.0
+		self.retractionCount = 0
+
+	def __str__(self):
+		'Get the string representation.'
+		return '%6s %10s %12.3f %14.3f %12.3f %12.3f %8s' % (self.index, self.z, self.duration, self.extrusionDistance, self.travelDistance, self.filamentLength, self.retractionCount)
+
+class PrintEstimate:
+	'The estimated time and distances of the whole print.'
+	def __init__(self, filamentArea):
+		self.filamentArea = filamentArea
+		self.layerEstimates = []
+
+	def __str__(self):
+		'Get the string representation.'
+		output = StringIO()
+		output.write('%6s %10s %12s %14s %12s %12s %8s\n' % ('layer', 'z', 'duration(s)', 'extrusion(mm)', 'travel(mm)', 'filament(mm)', 'retracts'))
+		for layerEstimate in self.layerEstimates:
+			output.write('%s\n' % layerEstimate)
+		output.write('\nduration: %.3fs (%s)\n' % (self.getDuration(), timedelta(seconds=round(self.getDuration()))))
+		output.write('extrusion distance: %.3fmm\n' % self.getExtrusionDistance())
+		output.write('travel distance: %.3fmm\n' % self.getTravelDistance())
+		output.write('filament length: %.3fmm\n' % self.getFilamentLength())
+		output.write('filament volume: %.3fmm3\n' % self.getFilamentVolume())
+		return output.getvalue()
+
+	def getDuration(self):
+		return sum(layerEstimate.duration for layerEstimate in self.layerEstimates)
+
+	def getExtrusionDistance(self):
+		return sum(layerEstimate.extrusionDistance for layerEstimate in self.layerEstimates)
+
+	def getTravelDistance(self):
+		return sum(layerEstimate.travelDistance for layerEstimate in self.layerEstimates)
+
+	def getFilamentLength(self):
+		return sum(layerEstimate.filamentLength for layerEstimate in self.layerEstimates)
+
+	def getFilamentVolume(self):
+		return self.getFilamentLength() * self.filamentArea
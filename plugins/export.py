@@ -10,7 +10,6 @@ License:
 	GNU Affero General Public License http://www.gnu.org/licenses/agpl.html
 """
 
-from config import config
 from datetime import timedelta
 from fabmetheus_utilities import archive, euclidean
 from utilities import memory_tracker
@@ -43,16 +42,20 @@ class ExportSkein:
 	'A class to export a skein of extrusions.'
 	def __init__(self, slicedModel):
 		self.slicedModel = slicedModel
-		self.debug = config.getboolean(name, 'debug')
-		self.deleteComments = config.getboolean(name, 'delete.comments')
-		self.fileExtension = config.get(name, 'file.extension')
-		self.nameOfReplaceFile = config.get(name, 'replace.filename')
-		self.exportSlicedModel = config.getboolean(name, 'export.slicedmodel')
-		self.exportSlicedModelExtension = config.get(name, 'export.slicedmodel.extension')
-		self.addProfileExtension = config.getboolean(name, 'file.extension.profile')
-		self.overwriteExportedSlicedModel = config.getboolean(name, 'overwrite.exported.slicedmodel')
-		self.firstLayerFeedRateRatio = config.getfloat('speed', 'feed.rate.first.layer.ratio')
-		self.firstLayerFlowRateRatio = config.getfloat('speed', 'flow.rate.first.layer.ratio')
+		profile = slicedModel.runtimeParameters.profile
+		self.debug = profile.getboolean(name, 'debug')
+		self.deleteComments = profile.getboolean(name, 'delete.comments')
+		self.fileExtension = profile.get(name, 'file.extension')
+		self.nameOfReplaceFile = profile.get(name, 'replace.filename')
+		self.exportSlicedModel = profile.getboolean(name, 'export.slicedmodel')
+		self.exportSlicedModelExtension = profile.get(name, 'export.slicedmodel.extension')
+		self.addProfileExtension = profile.getboolean(name, 'file.extension.profile')
+		self.overwriteExportedSlicedModel = profile.getboolean(name, 'overwrite.exported.slicedmodel')
+		self.firstLayerFeedRateRatio = profile.getfloat('speed', 'feed.rate.first.layer.ratio')
+		self.firstLayerFlowRateRatio = profile.getfloat('speed', 'flow.rate.first.layer.ratio')
+		self.workers = None
+		if profile.getboolean(name, 'multiprocess'):
+			self.workers = profile.getint(name, 'multiprocess.workers')
 		
 	def getReplaceableExportGcode(self, nameOfReplaceFile, replaceableExportGcode):
 		'Get text with strings replaced according to replace.csv file.'
@@ -99,7 +102,7 @@ class ExportSkein:
 		
 		self.setFirstLayerRates()
 		
-		replaceableExportGcode = self.getReplaceableExportGcode(self.nameOfReplaceFile, GcodeWriter(self.slicedModel).getSlicedModel())		
+		replaceableExportGcode = self.getReplaceableExportGcode(self.nameOfReplaceFile, GcodeWriter(self.slicedModel).getSlicedModel(workers=self.workers))		
 		archive.writeFileText(exportFileName, replaceableExportGcode)
 		logger.info('Gcode exported to: %s', os.path.basename(exportFileName))
 		
@@ -1,6 +1,15 @@
 """
 Fills the perimeters.
 
+The filling is done by the strategy named by the strategy setting, a module found in the strategy.path directory. The
+module has a getStrategy(slicedModel) function returning an object with a fill(layer) method, which is called once for
+each layer, from the bottom up. For each nested ring of the layer, fill adds the extra loops to nestedRing.extraLoops,
+hands the infill paths, lists of complex points, to nestedRing.transferPaths and then calls nestedRing.addToThreads to
+order the loops and the infill into the threads of the layer.
+
+LineFillStrategy is the skeinforge fill. RectilinearFillStrategy is a fast fill, linking its lines in a simple zig-zag,
+meant for sparse interior infill.
+
 Credits:
 	Original Author: Enrique Perez (http://skeinforge.com)
 	Contributors: Please see the documentation in Skeinforge 
@@ -10,7 +19,6 @@ License:
 	GNU Affero General Public License http://www.gnu.org/licenses/agpl.html
 """
 
-from config import config
 from importlib import import_module
 from utilities import memory_tracker
 import logging
@@ -22,7 +30,7 @@ name = __name__
 
 def performAction(slicedModel):
 	'Fills the perimeters.'
-	if not config.getboolean(name, 'active'):
+	if not slicedModel.runtimeParameters.profile.getboolean(name, 'active'):
 		logger.info("%s plugin is inactive", name.capitalize())
 		return
 	
@@ -37,9 +45,10 @@ class FillSkein:
 	'A class to fill a skein of extrusions.'
 	def __init__(self, slicedModel):
 		self.slicedModel = slicedModel
-		self.extrusionWidth = config.getfloat('carve', 'extrusion.width')
-		self.fillStrategyName = config.get(name, 'strategy')
-		self.fillStrategyPath = config.get(name, 'strategy.path')
+		profile = slicedModel.runtimeParameters.profile
+		self.extrusionWidth = profile.getfloat('carve', 'extrusion.width')
+		self.fillStrategyName = profile.get(name, 'strategy')
+		self.fillStrategyPath = profile.get(name, 'strategy.path')
 
 	def fill(self):
 		'Fills the layers.'
@@ -10,7 +10,6 @@ License:
 	GNU Affero General Public License http://www.gnu.org/licenses/agpl.html
 """
 
-from config import config, config
 from fabmetheus_utilities import archive, euclidean, intercircle
 from fabmetheus_utilities.geometry.solids import triangle_mesh
 from entities import NestedRing, Layer, GcodeCommand,  BoundaryPerimeter
@@ -44,22 +43,26 @@ class InsetSkein:
 	"A class to inset a skein of extrusions."
 	def __init__(self, slicedModel):
 		self.slicedModel = slicedModel
-		self.overlapRemovalWidthOverPerimeterWidth = config.getfloat(name, 'overlap.removal.scaler')
-		self.nozzleDiameter = config.getfloat(name, 'nozzle.diameter')
-		self.bridgeWidthMultiplier = config.getfloat(name, 'bridge.width.multiplier.ratio')
-		self.loopOrderAscendingArea = config.getboolean(name, 'loop.order.preferloops')
+		profile = slicedModel.runtimeParameters.profile
+		self.overlapRemovalWidthOverPerimeterWidth = profile.getfloat(name, 'overlap.removal.scaler')
+		self.nozzleDiameter = profile.getfloat(name, 'nozzle.diameter')
+		self.bridgeWidthMultiplier = profile.getfloat(name, 'bridge.width.multiplier.ratio')
+		self.loopOrderAscendingArea = profile.getboolean(name, 'loop.order.preferloops')
 		self.layerThickness = self.slicedModel.runtimeParameters.layerThickness
 		self.perimeterWidth = self.slicedModel.runtimeParameters.perimeterWidth
 		self.halfPerimeterWidth = 0.5 * self.perimeterWidth
 		self.overlapRemovalWidth = self.perimeterWidth * (0.7853) * self.overlapRemovalWidthOverPerimeterWidth
-		self.multiprocess = config.getboolean(name, 'multiprocess')
+		self.multiprocess = profile.getboolean(name, 'multiprocess')
 		
 	def inset(self):
-		"Inset the layers"
+		"Inset the layers, the layers identical to an earlier layer copy its perimeters."
+		
+		identicalLayerIndexes = getIdenticalLayerIndexes(self.slicedModel.layers)
+		insetLayers = [layer for layer in self.slicedModel.layers if identicalLayerIndexes[layer.index] == None]
 		
 		if self.multiprocess:
 			manager = Manager()
-			sharedLayers = manager.list(self.slicedModel.layers)
+			sharedLayers = manager.list(insetLayers)
 			
 			p = Pool()
 			resultLayers = p.map(self.addInsetForLayer, sharedLayers)
@@ -71,13 +74,26 @@ class InsetSkein:
 			
 		else:
 			
-			for layer in self.slicedModel.layers:
+			for layer in insetLayers:
 				self.addInsetForLayer(layer)
+		
+		for layer in self.slicedModel.layers:
+			identicalLayerIndex = identicalLayerIndexes[layer.index]
+			if identicalLayerIndex != None:
+				for (nestedRing, identicalNestedRing) in zip(layer.nestedRings, self.slicedModel.layers[identicalLayerIndex].nestedRings):
+					nestedRing.copyInsetFrom(identicalNestedRing)
+		
+		reusedLayerCount = len(self.slicedModel.layers) - len(insetLayers)
+		if reusedLayerCount > 0:
+			logger.info('Reused the perimeters of identical layers for %s of %s layers.', reusedLayerCount, len(self.slicedModel.layers))
 			
 	def addInsetForLayer(self, layer):
 		halfWidth = self.halfPerimeterWidth * 0.7853
 		if layer.bridgeRotation != None:
-			halfWidth = self.bridgeWidthMultiplier * ((2 * self.nozzleDiameter - self.layerThickness) / 2) * 0.7853
+			layerThickness = self.layerThickness
+			if layer.thickness != None:
+				layerThickness = layer.thickness
+			halfWidth = self.bridgeWidthMultiplier * ((2 * self.nozzleDiameter - layerThickness) / 2) * 0.7853
 		
 		alreadyFilledArounds = []
 		
@@ -220,6 +236,23 @@ def addSegmentOutline(isThick, outlines, pointBegin, pointEnd, width):
 		outline.append(outsideBeginCenterDown)
 	outlines.append(euclidean.getPointsRoundZAxis(normalizedSegment, outline))
 
+def getIdenticalLayerIndexes(layers):
+	"Get the index of the first earlier layer identical to each layer, or None when there is no earlier identical layer."
+	identicalLayerIndexes = []
+	firstLayersTable = {}
+	for layer in layers:
+		identicalLayerIndex = None
+		if layer.boundaryHash != None:
+			firstLayers = firstLayersTable.setdefault(layer.boundaryHash, [])
+			for firstLayer in firstLayers:
+				if layer.isIdentical(firstLayer):
+					identicalLayerIndex = firstLayer.index
+					break
+			if identicalLayerIndex == None:
+				firstLayers.append(layer)
+		identicalLayerIndexes.append(identicalLayerIndex)
+	return identicalLayerIndexes
+
 def getInteriorSegments(loops, segments):
 	'Get segments inside the loops.'
 	interiorSegments = []
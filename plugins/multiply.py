@@ -10,7 +10,6 @@ License:
 	GNU Affero General Public License http://www.gnu.org/licenses/agpl.html
 """
 
-from config import config
 from fabmetheus_utilities import archive, euclidean
 from fabmetheus_utilities.vector3 import Vector3
 import copy
@@ -21,7 +20,7 @@ name = 'multiply'
 
 def performAction(slicedModel):
 	'Multiply the 3D model.'
-	if not config.getboolean(name, 'active'):
+	if not slicedModel.runtimeParameters.profile.getboolean(name, 'active'):
 		logger.info("%s plugin is inactive", name.capitalize())
 		return
 	return MultiplySkein(slicedModel).multiply()
@@ -30,6 +29,7 @@ class MultiplySkein:
 	'A class to multiply a skein of extrusions.'
 	def __init__(self, slicedModel):
 		self.slicedModel = slicedModel
+		profile = slicedModel.runtimeParameters.profile
 		self.isExtrusionActive = False
 		self.layerIndex = 0
 		self.layerLines = []
@@ -39,13 +39,13 @@ class MultiplySkein:
 		self.rowIndex = 0
 		self.shouldAccumulate = True
 
-		self.centerX = config.getfloat(name, 'center.x')
-		self.centerY = config.getfloat(name, 'center.y')
-		self.numberOfColumns = config.getint(name, 'columns')
-		self.numberOfRows = config.getint(name, 'rows')
-		self.reverseSequenceEveryOddLayer = config.getboolean(name, 'sequence.reverse.odd.layers')
-		self.separationOverPerimeterWidth = config.getfloat(name, 'separation.over.perimeter.width')
-		self.extrusionWidth = config.getfloat('carve', 'extrusion.width')
+		self.centerX = profile.getfloat(name, 'center.x')
+		self.centerY = profile.getfloat(name, 'center.y')
+		self.numberOfColumns = profile.getint(name, 'columns')
+		self.numberOfRows = profile.getint(name, 'rows')
+		self.reverseSequenceEveryOddLayer = profile.getboolean(name, 'sequence.reverse.odd.layers')
+		self.separationOverPerimeterWidth = profile.getfloat(name, 'separation.over.perimeter.width')
+		self.extrusionWidth = profile.getfloat('carve', 'extrusion.width')
 		self.centerOffset = complex(self.centerX, self.centerY)
 		cornerMaximumComplex = self.slicedModel.carvingCornerMaximum.dropAxis()
 		cornerMinimumComplex = self.slicedModel.carvingCornerMinimum.dropAxis()
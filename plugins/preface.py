@@ -10,7 +10,6 @@ License:
 	GNU Affero General Public License http://www.gnu.org/licenses/agpl.html
 """
 
-from config import config
 from entities import NestedRing, GcodeCommand, Layer, BoundaryPerimeter
 from fabmetheus_utilities import euclidean, archive
 from time import strftime
@@ -29,12 +28,13 @@ class PrefaceSkein:
 	"A class to preface a skein of extrusions."
 	def __init__(self, slicedModel):
 		self.slicedModel = slicedModel
-		self.setPositioningToAbsolute = config.getboolean(name, 'positioning.absolute')
-		self.setUnitsToMillimeters = config.getboolean(name, 'units.millimeters')
-		self.startAtHome = config.getboolean(name, 'startup.at.home')
-		self.resetExtruder = config.getboolean(name, 'startup.extruder.reset')
-		self.endFile = config.get(name, 'end.file')
-		self.startFile = config.get(name, 'start.file')
+		profile = slicedModel.runtimeParameters.profile
+		self.setPositioningToAbsolute = profile.getboolean(name, 'positioning.absolute')
+		self.setUnitsToMillimeters = profile.getboolean(name, 'units.millimeters')
+		self.startAtHome = profile.getboolean(name, 'startup.at.home')
+		self.resetExtruder = profile.getboolean(name, 'startup.extruder.reset')
+		self.endFile = profile.get(name, 'end.file')
+		self.startFile = profile.get(name, 'start.file')
 		
 	def preface(self):
 		"Prefaces and converts the svg text to Gcode."
@@ -50,12 +50,14 @@ class PrefaceSkein:
 	def addPrefaceToGcode(self, index, rotatedLoopLayer):
 		decimalPlaces = self.slicedModel.runtimeParameters.decimalPlaces
 		z = round(rotatedLoopLayer.z, 3)
-		layer = Layer(z, index, self.slicedModel.runtimeParameters)		
+		layer = Layer(z, index, self.slicedModel.runtimeParameters, getattr(rotatedLoopLayer, 'thickness', None))
 		
 		if rotatedLoopLayer.rotation != None:
 			layer.bridgeRotation = complex(rotatedLoopLayer.rotation)
 		
 		loops = rotatedLoopLayer.loops
+		if self.slicedModel.runtimeParameters.identicalLayersReuse:
+			layer.boundaryHash = euclidean.getLoopsHash(loops)
 		internalLoops = self.createLoopHierarchy(loops)
 		
 		nestRingPlaceholder = {}
@@ -91,7 +93,7 @@ class PrefaceSkein:
 		return internalLoops
 	
 	def addStartCommandsToGcode(self):		
-		if config.get(name, 'start.file') != None:
+		if self.startFile != None:
 			for line in archive.getLinesFromAlterationsFile(self.startFile):
 				self.slicedModel.startGcodeCommands.append(line)
 		
@@ -105,7 +107,7 @@ class PrefaceSkein:
 			self.slicedModel.startGcodeCommands.append(GcodeCommand(gcodes.RESET_EXTRUDER_DISTANCE, [('E', '0')]))
 		
 	def addEndCommandsToGcode(self):
-		if config.get(name, 'end.file') != None:
+		if self.endFile != None:
 			for line in archive.getLinesFromAlterationsFile(self.endFile):
 				self.slicedModel.endGcodeCommands.append(line)
 
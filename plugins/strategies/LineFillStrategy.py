@@ -10,7 +10,6 @@ License:
     GNU Affero General Public License http://www.gnu.org/licenses/agpl.html
 """
 
-from config import config
 from fabmetheus_utilities import archive, euclidean, intercircle
 from fabmetheus_utilities.vector3 import Vector3
 import logging
@@ -26,31 +25,53 @@ class LineFillStrategy:
     def __init__(self, slicedModel):
         # TODO - remove or reduce dependency on slicedModel
         self.slicedModel = slicedModel
+        profile = slicedModel.runtimeParameters.profile
         
-        self.infillSolidity = config.getfloat('fill', 'infill.solidity.ratio')
-        self.infillWidthOverThickness = config.getfloat('fill', 'extrusion.lines.extra.spacer.scaler')
-        self.infillPerimeterOverlap = config.getfloat('fill', 'infill.overlap.over.perimeter.scaler')
-        self.extraShellsAlternatingSolidLayer = config.getint('fill', 'shells.alternating.solid')
-        self.extraShellsBase = config.getint('fill', 'shells.base')
-        self.extraShellsSparseLayer = config.getint('fill', 'shells.sparse')
-        self.solidSurfaceThickness = config.getint('fill', 'fully.filled.layers')
+        self.infillSolidity = profile.getfloat('fill', 'infill.solidity.ratio')
+        self.infillWidthOverThickness = profile.getfloat('fill', 'extrusion.lines.extra.spacer.scaler')
+        self.infillPerimeterOverlap = profile.getfloat('fill', 'infill.overlap.over.perimeter.scaler')
+        self.extraShellsAlternatingSolidLayer = profile.getint('fill', 'shells.alternating.solid')
+        self.extraShellsBase = profile.getint('fill', 'shells.base')
+        self.extraShellsSparseLayer = profile.getint('fill', 'shells.sparse')
+        self.solidSurfaceThickness = profile.getint('fill', 'fully.filled.layers')
         self.doubleSolidSurfaceThickness = self.solidSurfaceThickness + self.solidSurfaceThickness
-        self.startFromChoice = config.get('fill', 'extrusion.sequence.start.layer')
-        self.threadSequenceChoice = config.get('fill', 'extrusion.sequence.print.order')
+        self.startFromChoice = profile.get('fill', 'extrusion.sequence.start.layer')
+        self.threadSequenceChoice = profile.get('fill', 'extrusion.sequence.print.order')
         self.threadSequence = self.threadSequenceChoice.split(",")
-        self.diaphragmPeriod = config.getint('fill', 'diaphragm.every.n.layers')
-        self.diaphragmThickness = config.getint('fill', 'diaphragm.thickness')
-        self.infillBeginRotation = math.radians(config.getfloat('fill', 'infill.rotation.begin'))
-        self.infillBeginRotationRepeat = config.getint('fill', 'infill.rotation.repeat')
-        self.infillOddLayerExtraRotation = math.radians(config.getfloat('fill', 'infill.rotation.odd.layer'))
-        self.bridgeWidthMultiplier = config.getfloat('inset', 'bridge.width.multiplier.ratio')
-        self.extrusionWidth = config.getfloat('carve', 'extrusion.width')
+        self.diaphragmPeriod = profile.getint('fill', 'diaphragm.every.n.layers')
+        self.diaphragmThickness = profile.getint('fill', 'diaphragm.thickness')
+        self.sparseInfillCombineLayers = max(1, profile.getint('fill', 'infill.sparse.combine.layers'))
+        self.combinedIndex = None
+        self.combinedOutsetCarves = []
+        self.infillBeginRotation = math.radians(profile.getfloat('fill', 'infill.rotation.begin'))
+        self.infillBeginRotationRepeat = profile.getint('fill', 'infill.rotation.repeat')
+        self.infillOddLayerExtraRotation = math.radians(profile.getfloat('fill', 'infill.rotation.odd.layer'))
+        self.bridgeWidthMultiplier = profile.getfloat('inset', 'bridge.width.multiplier.ratio')
+        self.extrusionWidth = profile.getfloat('carve', 'extrusion.width')
         self.infillWidth = self.extrusionWidth * self.infillWidthOverThickness * (0.7853)
         self.betweenWidth = self.extrusionWidth * self.infillWidthOverThickness * (0.7853)
         self.previousExtraShells = -1
         self.oldOrderedLocation = None
+        self.filledLayersTable = {}
         
     def fill(self, layer):
+        '''Add fill to the carve layer, or copy the fill of an earlier identical layer, with the layers around them identical
+            and the same rotation, solid surface and diaphragm as the layer.'''
+        reuseKey = self.getReuseKey(layer)
+        if reuseKey in self.filledLayersTable:
+            (filledLayer, previousExtraShells, orderedLocation) = self.filledLayersTable[reuseKey]
+            if self.isFillReusable(layer, filledLayer):
+                for (nestedRing, filledNestedRing) in zip(layer.nestedRings, filledLayer.nestedRings):
+                    nestedRing.copyFillFrom(filledNestedRing)
+                self.previousExtraShells = previousExtraShells
+                self.oldOrderedLocation = Vector3(orderedLocation.x, orderedLocation.y, orderedLocation.z)
+                return
+        self.addFill(layer)
+        if reuseKey != None:
+            orderedLocation = self.oldOrderedLocation
+            self.filledLayersTable[reuseKey] = (layer, self.previousExtraShells, Vector3(orderedLocation.x, orderedLocation.y, orderedLocation.z))
+        
+    def addFill(self, layer):
         'Add fill to the carve layer.'
         layerIndex = layer.index
         alreadyFilledArounds = []
@@ -88,6 +109,7 @@ class LineFillStrategy:
         gridPointInsetX = 0.5 * layerFillInset
         doubleExtrusionWidth = 2.0 * self.layerExtrusionWidth
         endpoints = []
+        combinedEndpoints = []
         infillPaths = []
         layerInfillSolidity = self.infillSolidity
         
@@ -141,11 +163,23 @@ class LineFillStrategy:
         if len(surroundingCarves) >= self.doubleSolidSurfaceThickness:
             xIntersectionIndexLists = []
             self.frontOverWidth = euclidean.getFrontOverWidthAddXListYList(front, surroundingCarves, numberOfLines, xIntersectionIndexLists, self.layerExtrusionWidth, self.yList)
+            combinedCarves = self.getCombinedCarves(layerIndex, reverseRotation)
+            if combinedCarves != None:
+                combinedXIntersectionIndexLists = []
+                euclidean.getFrontOverWidthAddXListYList(front, combinedCarves, numberOfLines, combinedXIntersectionIndexLists, self.layerExtrusionWidth, [])
             for fillLine in xrange(len(self.horizontalSegmentLists)):
                 xIntersectionIndexList = xIntersectionIndexLists[fillLine]
                 surroundingXIntersections = euclidean.getIntersectionOfXIntersectionIndexes(self.doubleSolidSurfaceThickness, xIntersectionIndexList)
                 self.surroundingXIntersectionLists.append(surroundingXIntersections)
-                addSparseEndpoints(doubleExtrusionWidth, endpoints, fillLine, self.horizontalSegmentLists, layerInfillSolidity, removedEndpoints, self.solidSurfaceThickness, surroundingXIntersections)
+                if combinedCarves == None:
+                    addSparseEndpoints(doubleExtrusionWidth, endpoints, fillLine, self.horizontalSegmentLists, layerInfillSolidity, removedEndpoints, self.solidSurfaceThickness, surroundingXIntersections)
+                else:
+                    lineEndpoints = []
+                    addSparseEndpoints(doubleExtrusionWidth, lineEndpoints, fillLine, self.horizontalSegmentLists, layerInfillSolidity, removedEndpoints, self.solidSurfaceThickness, surroundingXIntersections)
+                    combinedXIntersections = euclidean.getIntersectionOfXIntersectionIndexes(len(combinedCarves), combinedXIntersectionIndexLists[fillLine])
+                    addCombinedEndpoints(combinedEndpoints, combinedXIntersections, endpoints, lineEndpoints)
+            if layerIndex % self.sparseInfillCombineLayers != self.sparseInfillCombineLayers - 1:
+                combinedEndpoints = []
         else:
             for fillLine in xrange(len(self.horizontalSegmentLists)):
                 addSparseEndpoints(doubleExtrusionWidth, endpoints, fillLine, self.horizontalSegmentLists, layerInfillSolidity, removedEndpoints, self.solidSurfaceThickness, None)
@@ -165,6 +199,15 @@ class LineFillStrategy:
 
         for nestedRing in nestedRings:
             nestedRing.transferPaths(infillPaths)
+        
+        if len(combinedEndpoints) > 0:
+            combinedPaths = euclidean.getPathsFromEndpoints(combinedEndpoints, 5.0 * self.layerExtrusionWidth, pixelTable, aroundWidth)
+            combinedPaths = euclidean.getConnectedPaths(combinedPaths, pixelTable, aroundWidth)
+            combinedInfillPaths = []
+            for path in combinedPaths:
+                addPathToInfillPaths(self.layerExtrusionWidth, combinedInfillPaths, path, layerRotation)
+            for nestedRing in nestedRings:
+                nestedRing.transferPaths(combinedInfillPaths, self.sparseInfillCombineLayers)
          
         self.addThreadsBridgeLayer(layerIndex, nestedRings, layer)
 
@@ -179,12 +222,40 @@ class LineFillStrategy:
         nestedRings = layer.nestedRings
         rotatedCarve = []
         for nestedRing in nestedRings:
-            planeRotatedLoop = euclidean.getPointsRoundZAxis(reverseRotation, nestedRing.getXYBoundaries())
+            planeRotatedLoop = euclidean.getPointsRoundZAxis(reverseRotation, nestedRing.getBoundaryPolyline())
             rotatedCarve.append(planeRotatedLoop)
         outsetRadius = float(abs(layerDelta)) * self.extrusionWidth #todo investigate was   float(abs(layerDelta)) * self.layerThickness
         rotatedCarve = intercircle.getInsetSeparateLoopsFromLoops(-outsetRadius, rotatedCarve)
         surroundingCarves.append(rotatedCarve)
 
+    def getCombinedCarves(self, layerIndex, reverseRotation):
+        '''Get the carves around the group of layers whose sparse infill is printed by the top layer of the group,
+            or None when the sparse infill of the layer is not combined. The carves are outset from the top layer,
+            so every layer of the group finds the same interior, and are kept for the other layers of the group.'''
+        if self.sparseInfillCombineLayers < 2:
+            return None
+        firstIndex = layerIndex - layerIndex % self.sparseInfillCombineLayers
+        combinedIndex = firstIndex + self.sparseInfillCombineLayers - 1
+        if combinedIndex >= len(self.slicedModel.layers):
+            return None
+        for groupIndex in xrange(firstIndex, combinedIndex + 1):
+            if groupIndex % self.diaphragmPeriod < self.diaphragmThickness or self.slicedModel.layers[groupIndex].bridgeRotation != None:
+                return None
+        if self.combinedIndex != combinedIndex:
+            self.combinedIndex = combinedIndex
+            self.combinedOutsetCarves = []
+            for surroundingIndex in xrange(firstIndex - self.solidSurfaceThickness, combinedIndex + self.solidSurfaceThickness + 1):
+                if surroundingIndex != combinedIndex and surroundingIndex >= 0 and surroundingIndex < len(self.slicedModel.layers):
+                    boundaries = [nestedRing.getXYBoundaries() for nestedRing in self.slicedModel.layers[surroundingIndex].nestedRings]
+                    outsetRadius = float(abs(surroundingIndex - combinedIndex)) * self.extrusionWidth
+                    self.combinedOutsetCarves.append(intercircle.getInsetSeparateLoopsFromLoops(-outsetRadius, boundaries))
+        if len(self.combinedOutsetCarves) < combinedIndex - firstIndex + self.doubleSolidSurfaceThickness:
+            return None
+        combinedCarves = []
+        for outsetCarve in self.combinedOutsetCarves:
+            combinedCarves.append([euclidean.getPointsRoundZAxis(reverseRotation, loop) for loop in outsetCarve])
+        return combinedCarves
+
     def addThreadsBridgeLayer(self, layerIndex, nestedRings, rotatedLayer):
         'Add the threads, add the bridge end & the layer end tag.'
         if self.oldOrderedLocation == None or self.startFromChoice == "LowerLeft":
@@ -197,15 +268,57 @@ class LineFillStrategy:
         for nestedRing in nestedRings:
             nestedRing.addToThreads(extrusionHalfWidth, self.oldOrderedLocation, threadSequence)
 
+    def getReuseKey(self, layer):
+        '''Get the key of what the fill of the layer depends on: the boundaries of the layers around it, the rotation, the diaphragm,
+            the shells of the previous layer and, unless each layer starts from the lower left, the location the layer starts from.
+            Returns None when the fill of the layer is not reused.'''
+        if layer.boundaryHash == None or layer.bridgeRotation != None or self.sparseInfillCombineLayers > 1:
+            return None
+        layers = self.slicedModel.layers
+        boundaryHashes = []
+        for surroundingIndex in xrange(layer.index - self.solidSurfaceThickness, layer.index + self.solidSurfaceThickness + 1):
+            if surroundingIndex >= 0 and surroundingIndex < len(layers):
+                boundaryHashes.append(layers[surroundingIndex].boundaryHash)
+            else:
+                boundaryHashes.append(None)
+        orderedLocation = None
+        if self.startFromChoice != "LowerLeft" and self.oldOrderedLocation != None:
+            orderedLocation = (self.oldOrderedLocation.x, self.oldOrderedLocation.y)
+        rotationIndex = layer.index % (self.infillBeginRotationRepeat + 1)
+        isDiaphragm = layer.index % self.diaphragmPeriod < self.diaphragmThickness
+        return (tuple(boundaryHashes), rotationIndex, isDiaphragm, self.previousExtraShells, orderedLocation)
+
+    def isFillReusable(self, layer, filledLayer):
+        'Determine if the layers around the layer are identical to the layers around the filled layer, so the filled layer fill can be copied.'
+        layers = self.slicedModel.layers
+        for layerDelta in xrange(-self.solidSurfaceThickness, self.solidSurfaceThickness + 1):
+            surroundingIndex = layer.index + layerDelta
+            filledSurroundingIndex = filledLayer.index + layerDelta
+            if surroundingIndex >= 0 and surroundingIndex < len(layers):
+                if not layers[surroundingIndex].isIdentical(layers[filledSurroundingIndex]):
+                    return False
+        return True
+
     def getLayerRotation(self, layerIndex, rotatedLayer):
-        'Get the layer rotation.'
+        '''Get the layer rotation. The rotation turns with each layer, and when the sparse infill is combined each group of layers
+            starts one turn after the group before it, so the combined infill printed by the top layers of the groups also turns.'''
         rotation = rotatedLayer.bridgeRotation
         if rotation != None:
             return rotation
-        infillOddLayerRotationMultiplier = float(layerIndex % (self.infillBeginRotationRepeat + 1) == self.infillBeginRotationRepeat)
+        rotationIndex = layerIndex // self.sparseInfillCombineLayers + layerIndex % self.sparseInfillCombineLayers
+        infillOddLayerRotationMultiplier = float(rotationIndex % (self.infillBeginRotationRepeat + 1) == self.infillBeginRotationRepeat)
         layerAngle = self.infillBeginRotation + infillOddLayerRotationMultiplier * self.infillOddLayerExtraRotation
         return euclidean.getWiddershinsUnitPolar(layerAngle)
 
+def addCombinedEndpoints(combinedEndpoints, combinedXIntersections, endpoints, lineEndpoints):
+    'Add the segments inside the interior of the combined layers to the combined endpoints, the others to the endpoints.'
+    for endpointIndex in xrange(0, len(lineEndpoints), 2):
+        segment = lineEndpoints[endpointIndex : endpointIndex + 2]
+        if isSegmentCompletelyInAnIntersection(segment, combinedXIntersections):
+            combinedEndpoints += segment
+        else:
+            endpoints += segment
+
 def addPathToInfillPaths(infillWidth, infillPaths, path, rotationPlaneAngle):
     'Add simplified path to fill.'
     simplifiedPath = euclidean.getSimplifiedPath(path, infillWidth)
@@ -319,7 +432,7 @@ def getLowerLeftCorner(nestedRings):
     lowerLeftCorner = Vector3()
     lowestRealPlusImaginary = 987654321.0
     for nestedRing in nestedRings:
-        for point in nestedRing.getXYBoundaries():
+        for point in nestedRing.getBoundaryPolyline():
             realPlusImaginary = point.real + point.imag
             if realPlusImaginary < lowestRealPlusImaginary:
                 lowestRealPlusImaginary = realPlusImaginary
@@ -1,7 +1,6 @@
 """
 Apply the cooling by moving the nozzle around the print.
 """
-from config import config
 from data_structures import GcodeCommand
 from fabmetheus_utilities import euclidean
 import gcodes
@@ -14,10 +13,10 @@ class OrbitCoolStrategy:
     '''Allows a layer to cool by orbiting around the model for a set time.'''
     def __init__(self, runtimeParameters):
         
-        self.minimumLayerTime = config.getfloat('cool','minimum.layer.time')
+        self.minimumLayerTime = runtimeParameters.profile.getfloat('cool','minimum.layer.time')
         self.orbitalFeedRateSecond = runtimeParameters.orbitalFeedRateSecond
         self.orbitalFeedRateMinute = runtimeParameters.orbitalFeedRateMinute
-        self.oribitalMarginDistance = config.getfloat('cool','orbital.margin')
+        self.oribitalMarginDistance = runtimeParameters.profile.getfloat('cool','orbital.margin')
         self.oribitalMargin = complex(self.oribitalMarginDistance, self.oribitalMarginDistance)
         self.decimalPlaces = runtimeParameters.decimalPlaces
         
@@ -0,0 +1,323 @@
+"""
+Fills a layer with straight lines, linked in a zig-zag.
+
+The scanline intersections of every line of a layer are found in a single pass over the edges of the loops, instead of
+line by line through the pixel tables and endpoint linking of the LineFillStrategy. A line is linked to a line of the
+next row when their ends are close, otherwise it starts a new thread. The strategy is meant for sparse interior infill,
+where the speed of the fill matters more than the quality of the linking.
+
+The sparse infill lines of a pattern are the same on every layer with the same rotation, so the lattice of the pattern
+is made once for each rotation, as a pattern tile spanning the model, and each layer only clips the lines of the tile
+against its fill. The grid and triangles patterns add lines in the other directions of the pattern, each direction of a
+tile being clipped the same way.
+
+License:
+    GNU Affero General Public License http://www.gnu.org/licenses/agpl.html
+"""
+
+from LineFillStrategy import addPathToInfillPaths, createFillForSurroundings, getLowerLeftCorner
+from fabmetheus_utilities import euclidean
+import bisect
+import math
+
+patternAngles = {'lines': [0.0], 'grid': [0.0, 90.0], 'triangles': [0.0, 60.0, 120.0]}
+
+def getStrategy(slicedModel):
+    '''Returns an instance of the strategy'''
+    return RectilinearFillStrategy(slicedModel)
+
+class RectilinearFillStrategy:
+    def __init__(self, slicedModel):
+        self.slicedModel = slicedModel
+        profile = slicedModel.runtimeParameters.profile
+
+        self.infillSolidity = profile.getfloat('fill', 'infill.solidity.ratio')
+        self.infillWidthOverThickness = profile.getfloat('fill', 'extrusion.lines.extra.spacer.scaler')
+        self.extraShellsSparseLayer = profile.getint('fill', 'shells.sparse')
+        self.solidSurfaceThickness = profile.getint('fill', 'fully.filled.layers')
+        self.startFromChoice = profile.get('fill', 'extrusion.sequence.start.layer')
+        self.threadSequence = profile.get('fill', 'extrusion.sequence.print.order').split(",")
+        self.diaphragmPeriod = profile.getint('fill', 'diaphragm.every.n.layers')
+        self.diaphragmThickness = profile.getint('fill', 'diaphragm.thickness')
+        self.infillBeginRotation = math.radians(profile.getfloat('fill', 'infill.rotation.begin'))
+        self.infillBeginRotationRepeat = profile.getint('fill', 'infill.rotation.repeat')
+        self.infillOddLayerExtraRotation = math.radians(profile.getfloat('fill', 'infill.rotation.odd.layer'))
+        self.bridgeWidthMultiplier = profile.getfloat('inset', 'bridge.width.multiplier.ratio')
+        self.extrusionWidth = profile.getfloat('carve', 'extrusion.width')
+        self.infillWidth = self.extrusionWidth * self.infillWidthOverThickness * (0.7853)
+        self.sparsePattern = profile.get('fill', 'infill.sparse.pattern')
+        if self.sparsePattern not in patternAngles:
+            raise ValueError('Unknown sparse infill pattern: %s' % self.sparsePattern)
+        self.oldOrderedLocation = None
+        self.patternTiles = {}
+        self.surroundingXIntersectionsTable = {}
+
+    def fill(self, layer):
+        'Add the extra loops and the zig-zag infill to the nested rings of the layer.'
+        layerIndex = layer.index
+        nestedRings = layer.nestedRings
+        lineWidth = self.infillWidth
+        betweenWidth = self.extrusionWidth / 1.7594801994
+        extraShells = self.extraShellsSparseLayer
+        if layer.bridgeRotation != None:
+            lineWidth *= self.bridgeWidthMultiplier
+            betweenWidth *= self.bridgeWidthMultiplier
+            extraShells = 0
+
+        createFillForSurroundings(nestedRings, betweenWidth, False)
+        for extraShellIndex in xrange(extraShells):
+            createFillForSurroundings(nestedRings, lineWidth, True)
+
+        layerRotation = self.getLayerRotation(layerIndex, layer)
+        reverseRotation = complex(layerRotation.real, -layerRotation.imag)
+        fillLoops = [euclidean.getPointsRoundZAxis(reverseRotation, loop) for loop in euclidean.getFillOfSurroundings(nestedRings, None)]
+        fillXIntersectionsTable = getXIntersectionsTable(fillLoops, lineWidth)
+        interiorXIntersectionsTable = self.getInteriorXIntersectionsTable(layer, reverseRotation, lineWidth, None)
+        patternTile = None
+        if interiorXIntersectionsTable != None:
+            patternTile = self.getPatternTile(layerRotation)
+
+        segmentsTable = {}
+        halfLineWidth = 0.5 * lineWidth
+        for lineIndex in fillXIntersectionsTable:
+            xIntersections = getTrimmedXIntersections(fillXIntersectionsTable[lineIndex], halfLineWidth)
+            if patternTile != None and lineIndex not in patternTile.lineIndexSets[0]:
+                xIntersections = getDifferenceOfXIntersections(xIntersections, interiorXIntersectionsTable.get(lineIndex, []))
+            addSegments(lineIndex, lineWidth, segmentsTable, xIntersections)
+
+        infillPaths = []
+        for path in getZigZagPaths(segmentsTable, lineWidth):
+            addPathToInfillPaths(lineWidth, infillPaths, path, layerRotation)
+        if patternTile != None:
+            for directionIndex in xrange(1, len(patternTile.rotations)):
+                self.addDirectionInfillPaths(directionIndex, fillLoops, infillPaths, layer, layerRotation, patternTile)
+        for nestedRing in nestedRings:
+            nestedRing.transferPaths(infillPaths)
+
+        self.addThreads(layerIndex, nestedRings, lineWidth)
+
+    def addDirectionInfillPaths(self, directionIndex, fillLoops, infillPaths, layer, layerRotation, patternTile):
+        'Add the sparse infill paths of a direction of the pattern, the lines of the tile clipped against the interior of the fill.'
+        lineWidth = self.infillWidth
+        directionRotation = patternTile.rotations[directionIndex]
+        lineIndexes = patternTile.lineIndexLists[directionIndex]
+        reverseRotation = complex(directionRotation.real, -directionRotation.imag)
+        # the fill loops are already rotated by the reverse of the layer rotation
+        rotatedFillLoops = [euclidean.getPointsRoundZAxis(reverseRotation * layerRotation, loop) for loop in fillLoops]
+        fillXIntersectionsTable = getXIntersectionsTable(rotatedFillLoops, lineWidth, lineIndexes)
+        interiorXIntersectionsTable = self.getInteriorXIntersectionsTable(layer, reverseRotation, lineWidth, lineIndexes)
+        segmentsTable = {}
+        for lineIndex in fillXIntersectionsTable:
+            if lineIndex in interiorXIntersectionsTable:
+                xIntersections = getTrimmedXIntersections(fillXIntersectionsTable[lineIndex], 0.5 * lineWidth)
+                xIntersections = getIntersectionOfXIntersections(xIntersections, interiorXIntersectionsTable[lineIndex])
+                addSegments(lineIndex, lineWidth, segmentsTable, xIntersections)
+        for path in getZigZagPaths(segmentsTable, lineWidth):
+            addPathToInfillPaths(lineWidth, infillPaths, path, directionRotation)
+
+    def addThreads(self, layerIndex, nestedRings, lineWidth):
+        'Add the loops and the infill of the nested rings to their threads.'
+        if self.oldOrderedLocation == None or self.startFromChoice == "LowerLeft":
+            self.oldOrderedLocation = getLowerLeftCorner(nestedRings)
+        threadSequence = self.threadSequence
+        if layerIndex < 1:
+            threadSequence = ['perimeter', 'loops', 'infill']
+        for nestedRing in nestedRings:
+            nestedRing.addToThreads(0.5 * lineWidth, self.oldOrderedLocation, threadSequence)
+
+    def getInteriorXIntersectionsTable(self, layer, reverseRotation, lineWidth, lineIndexes):
+        '''Get the x intersections of the region inside all the layers around the layer, which is filled sparsely,
+            on the lines of the line indexes or on every line when they are None.
+            Returns None when the whole layer is filled solid: a bridge or diaphragm layer, or a layer near the bottom or top.'''
+        layerIndex = layer.index
+        layers = self.slicedModel.layers
+        if layer.bridgeRotation != None or layerIndex % self.diaphragmPeriod < self.diaphragmThickness:
+            return None
+        if layerIndex - self.solidSurfaceThickness < 0 or layerIndex + self.solidSurfaceThickness >= len(layers):
+            return None
+        for key in self.surroundingXIntersectionsTable.keys():
+            if key[0] < layerIndex - self.solidSurfaceThickness:
+                del self.surroundingXIntersectionsTable[key]
+        interiorXIntersectionsTable = None
+        for surroundingIndex in xrange(layerIndex - self.solidSurfaceThickness, layerIndex + self.solidSurfaceThickness + 1):
+            if surroundingIndex == layerIndex:
+                continue
+            key = (surroundingIndex, reverseRotation, lineWidth, lineIndexes == None)
+            if key not in self.surroundingXIntersectionsTable:
+                boundaries = [euclidean.getPointsRoundZAxis(reverseRotation, nestedRing.getBoundaryPolyline()) for nestedRing in layers[surroundingIndex].nestedRings]
+                self.surroundingXIntersectionsTable[key] = getXIntersectionsTable(boundaries, lineWidth, lineIndexes)
+            surroundingXIntersectionsTable = self.surroundingXIntersectionsTable[key]
+            if interiorXIntersectionsTable == None:
+                interiorXIntersectionsTable = surroundingXIntersectionsTable
+                continue
+            intersectionTable = {}
+            for lineIndex in interiorXIntersectionsTable:
+                if lineIndex in surroundingXIntersectionsTable:
+                    xIntersections = getIntersectionOfXIntersections(interiorXIntersectionsTable[lineIndex], surroundingXIntersectionsTable[lineIndex])
+                    if len(xIntersections) > 0:
+                        intersectionTable[lineIndex] = xIntersections
+            interiorXIntersectionsTable = intersectionTable
+        return interiorXIntersectionsTable
+
+    def getLayerRotation(self, layerIndex, layer):
+        'Get the layer rotation, as the LineFillStrategy does.'
+        if layer.bridgeRotation != None:
+            return layer.bridgeRotation
+        infillOddLayerRotationMultiplier = float(layerIndex % (self.infillBeginRotationRepeat + 1) == self.infillBeginRotationRepeat)
+        layerAngle = self.infillBeginRotation + infillOddLayerRotationMultiplier * self.infillOddLayerExtraRotation
+        return euclidean.getWiddershinsUnitPolar(layerAngle)
+
+    def getPatternTile(self, layerRotation):
+        'Get the pattern tile of the rotation, making it the first time the rotation is used.'
+        if layerRotation not in self.patternTiles:
+            angles = patternAngles[self.sparsePattern]
+            rotations = [layerRotation * euclidean.getWiddershinsUnitPolar(math.radians(angle)) for angle in angles]
+            self.patternTiles[layerRotation] = PatternTile(self.getCorners(), self.infillSolidity / float(len(angles)), self.infillWidth, rotations)
+        return self.patternTiles[layerRotation]
+
+    def getCorners(self):
+        'Get the corners of the horizontal bounding box of the model.'
+        if self.slicedModel.carvingCornerMinimum != None and self.slicedModel.carvingCornerMaximum != None:
+            return [self.slicedModel.carvingCornerMinimum.dropAxis(), self.slicedModel.carvingCornerMaximum.dropAxis()]
+        boundaries = []
+        for layer in self.slicedModel.layers:
+            for nestedRing in layer.nestedRings:
+                boundaries.append(nestedRing.getBoundaryPolyline())
+        return [euclidean.getMinimumByComplexPaths(boundaries), euclidean.getMaximumByComplexPaths(boundaries)]
+
+class PatternTile:
+    '''The lattice of the sparse infill for a layer rotation, spanning the model. For each direction of the pattern it keeps the
+        rotation and the sorted indexes of the sparse lines, which are at multiples of the line width as the lines of the layer.'''
+    def __init__(self, corners, solidity, lineWidth, rotations):
+        self.rotations = rotations
+        self.lineIndexLists = []
+        self.lineIndexSets = []
+        boxCorners = [corners[0], corners[1], complex(corners[0].real, corners[1].imag), complex(corners[1].real, corners[0].imag)]
+        for rotation in rotations:
+            reverseRotation = complex(rotation.real, -rotation.imag)
+            rotatedYs = [(corner * reverseRotation).imag for corner in boxCorners]
+            lineIndexes = []
+            for lineIndex in xrange(int(math.floor(min(rotatedYs) / lineWidth)), int(math.ceil(max(rotatedYs) / lineWidth)) + 1):
+                if isSparseLine(lineIndex, solidity):
+                    lineIndexes.append(lineIndex)
+            self.lineIndexLists.append(lineIndexes)
+            self.lineIndexSets.append(set(lineIndexes))
+
+def addSegments(lineIndex, lineWidth, segmentsTable, xIntersections):
+    'Add the segments of the x intersections which are at least a line width long to the segments table.'
+    segments = []
+    for xIntersectionIndex in xrange(0, len(xIntersections) - 1, 2):
+        if xIntersections[xIntersectionIndex + 1] - xIntersections[xIntersectionIndex] >= lineWidth:
+            segments.append((xIntersections[xIntersectionIndex], xIntersections[xIntersectionIndex + 1]))
+    if len(segments) > 0:
+        segmentsTable[lineIndex] = segments
+
+def getDifferenceOfXIntersections(xIntersections, subtractedXIntersections):
+    'Get the x intersections of the intervals less the subtracted intervals.'
+    if len(subtractedXIntersections) < 1:
+        return xIntersections
+    events = [(x, 0) for x in xIntersections] + [(x, 1) for x in subtractedXIntersections]
+    events.sort()
+    inside = [False, False]
+    difference = []
+    for (x, which) in events:
+        wasInside = inside[0] and not inside[1]
+        inside[which] = not inside[which]
+        if wasInside != (inside[0] and not inside[1]):
+            difference.append(x)
+    return difference
+
+def getIntersectionOfXIntersections(xIntersections, otherXIntersections):
+    'Get the x intersections of the intervals inside both intervals.'
+    events = [(x, 0) for x in xIntersections] + [(x, 1) for x in otherXIntersections]
+    events.sort()
+    inside = [False, False]
+    intersection = []
+    for (x, which) in events:
+        wasInside = inside[0] and inside[1]
+        inside[which] = not inside[which]
+        if wasInside != (inside[0] and inside[1]):
+            intersection.append(x)
+    return intersection
+
+def getTrimmedXIntersections(xIntersections, trim):
+    'Get the x intersections with each interval shortened by the trim at both ends, dropping the intervals which vanish.'
+    trimmed = []
+    for xIntersectionIndex in xrange(0, len(xIntersections) - 1, 2):
+        begin = xIntersections[xIntersectionIndex] + trim
+        end = xIntersections[xIntersectionIndex + 1] - trim
+        if end > begin:
+            trimmed += [begin, end]
+    return trimmed
+
+def getXIntersectionsTable(loops, lineWidth, lineIndexes=None):
+    '''Get the sorted x intersections of the loops with every scanline, keyed by the line index, in one pass over the edges.
+        The scanlines are at multiples of the line width, so the lines of layers with the same rotation line up.
+        When the sorted line indexes of a pattern tile are given, only those scanlines are intersected.'''
+    xIntersectionsTable = {}
+    for loop in loops:
+        if len(loop) < 3:
+            continue
+        begin = loop[-1]
+        for end in loop:
+            if begin.imag != end.imag:
+                if begin.imag < end.imag:
+                    (low, high) = (begin, end)
+                else:
+                    (low, high) = (end, begin)
+                xPerY = (high.real - low.real) / (high.imag - low.imag)
+                beginLineIndex = int(math.ceil(low.imag / lineWidth))
+                endLineIndex = int(math.ceil(high.imag / lineWidth))
+                if lineIndexes == None:
+                    edgeLineIndexes = xrange(beginLineIndex, endLineIndex)
+                else:
+                    edgeLineIndexes = lineIndexes[bisect.bisect_left(lineIndexes, beginLineIndex) : bisect.bisect_left(lineIndexes, endLineIndex)]
+                for lineIndex in edgeLineIndexes:
+                    x = low.real + (lineIndex * lineWidth - low.imag) * xPerY
+                    if lineIndex in xIntersectionsTable:
+                        xIntersectionsTable[lineIndex].append(x)
+                    else:
+                        xIntersectionsTable[lineIndex] = [x]
+            begin = end
+    for xIntersections in xIntersectionsTable.values():
+        xIntersections.sort()
+    return xIntersectionsTable
+
+def isSparseLine(lineIndex, solidity):
+    'Determine if the line is one of the lines kept in the sparse interior, as the LineFillStrategy does.'
+    if solidity <= 0.0:
+        return False
+    return int(round(round(lineIndex * solidity) / solidity)) == lineIndex
+
+def getZigZagPaths(segmentsTable, lineWidth):
+    '''Get the paths linking the segments of each line to the close segments of the next line in a zig-zag.
+        A segment is linked when the end of a thread is within twice the line spacing of one of its ends.'''
+    paths = []
+    openThreads = []
+    for lineIndex in sorted(segmentsTable.keys()):
+        y = lineIndex * lineWidth
+        threads = []
+        for (begin, end) in segmentsTable[lineIndex]:
+            closestThread = None
+            closestDistance = None
+            for thread in openThreads:
+                (path, lastLineIndex) = thread
+                lastPoint = path[-1]
+                maximumDistance = 2.0 * (lineIndex - lastLineIndex) * lineWidth
+                distance = min(abs(lastPoint.real - begin), abs(lastPoint.real - end))
+                if distance <= maximumDistance and (closestDistance == None or distance < closestDistance):
+                    closestThread = thread
+                    closestDistance = distance
+            if closestThread == None:
+                path = []
+                paths.append(path)
+            else:
+                openThreads.remove(closestThread)
+                path = closestThread[0]
+            if len(path) > 0 and abs(path[-1].real - end) < abs(path[-1].real - begin):
+                (begin, end) = (end, begin)
+            path.append(complex(begin, y))
+            path.append(complex(end, y))
+            threads.append((path, lineIndex))
+        openThreads = threads
+    return paths
@@ -1,7 +1,6 @@
 """
 Allows a layer to cool slowing down the nozzle movement.
 """
-from config import config
 from fabmetheus_utilities import euclidean
 import gcodes
 
@@ -14,7 +13,7 @@ class SlowDownCoolStrategy:
     '''Allows a layer to cool slowing down the nozzle movement.'''
     def __init__(self, runtimeParameters):
         
-        self.minimumLayerTime = config.getfloat('cool','minimum.layer.time')
+        self.minimumLayerTime = runtimeParameters.profile.getfloat('cool','minimum.layer.time')
                 
         
     def cool(self, layer):
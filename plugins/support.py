@@ -11,7 +11,6 @@ License:
 	GNU Affero General Public License http://www.gnu.org/licenses/agpl.html	
 """
 
-from config import config
 from fabmetheus_utilities import archive, euclidean, intercircle
 from fabmetheus_utilities.geometry.solids import triangle_mesh
 from fabmetheus_utilities.vector3 import Vector3
@@ -25,7 +24,7 @@ logger = logging.getLogger(name)
 
 def performAction(slicedModel):
 	"Add support layers."
-	if not config.getboolean(name, 'active'):
+	if not slicedModel.runtimeParameters.profile.getboolean(name, 'active'):
 		logger.info("%s plugin is not active", name.capitalize())
 		return
 	SupportSkein(slicedModel).support()
@@ -34,34 +33,35 @@ class SupportSkein:
 	'A class to support a skein of extrusions.'
 	def __init__(self, slicedModel):
 		self.slicedModel = slicedModel
+		profile = slicedModel.runtimeParameters.profile
 		self.boundaryLayers = []
 		self.supportLayers = []
 		
-		self.debug = config.getboolean(name, 'debug')
-		self.supportLocation = config.get(name, 'location')
-		self.supportMinimumAngle = config.getfloat(name, 'min.angle')
+		self.debug = profile.getboolean(name, 'debug')
+		self.supportLocation = profile.get(name, 'location')
+		self.supportMinimumAngle = profile.getfloat(name, 'min.angle')
 		self.minimumSupportRatio = math.tan(math.radians(self.supportMinimumAngle))
-		self.supportCrossHatchNthLayer = config.getint(name, 'crosshatch.every.nth.layer')
-		self.supportFeedRate = config.getfloat('speed', 'feed.rate.support')
-		self.supportFlowRateRatio = config.getfloat('speed', 'flow.rate.support.ratio')
+		self.supportCrossHatchNthLayer = profile.getint(name, 'crosshatch.every.nth.layer')
+		self.supportFeedRate = profile.getfloat('speed', 'feed.rate.support')
+		self.supportFlowRateRatio = profile.getfloat('speed', 'flow.rate.support.ratio')
 		
-		self.raftAdditionalMarginOverLengthPercent = config.getfloat(name, 'extension.percent')
-		self.raftMargin = config.getfloat(name, 'extension.distance')
-		self.infillOverhangOverExtrusionWidth = config.getfloat(name, 'infill.overhang.ratio')
+		self.raftAdditionalMarginOverLengthPercent = profile.getfloat(name, 'extension.percent')
+		self.raftMargin = profile.getfloat(name, 'extension.distance')
+		self.infillOverhangOverExtrusionWidth = profile.getfloat(name, 'infill.overhang.ratio')
 		
-		self.supportStartFile = config.get(name, 'support.start.file')
-		self.supportEndFile = config.get(name, 'support.end.file')
+		self.supportStartFile = profile.get(name, 'support.start.file')
+		self.supportEndFile = profile.get(name, 'support.end.file')
 		self.absoluteSupportStartFilePath = os.path.join('alterations', self.supportStartFile)
 		self.absoluteSupportEndFilePath = os.path.join('alterations', self.supportEndFile)
 		self.supportStartLines = archive.getTextLines(archive.getFileText(self.absoluteSupportStartFilePath, printWarning=False))
 		self.supportEndLines = archive.getTextLines(archive.getFileText(self.absoluteSupportEndFilePath, printWarning=False))
 	
-		self.extrusionWidth = config.getfloat('carve', 'extrusion.width')
-		self.supportGapOverPerimeterExtrusionWidth = config.getfloat(name, 'gap.over.perimeter.extrusion.width.ratio')
+		self.extrusionWidth = profile.getfloat('carve', 'extrusion.width')
+		self.supportGapOverPerimeterExtrusionWidth = profile.getfloat(name, 'gap.over.perimeter.extrusion.width.ratio')
 		self.supportOutset = self.extrusionWidth * self.supportGapOverPerimeterExtrusionWidth
 		
-		self.interfaceInfillDensity = config.getfloat(name, 'interface.infill.density')
-		self.interfaceLayerThicknessRatio = config.getfloat(name, 'interface.layer.thickness.ratio')
+		self.interfaceInfillDensity = profile.getfloat(name, 'interface.infill.density')
+		self.interfaceLayerThicknessRatio = profile.getfloat(name, 'interface.layer.thickness.ratio')
 		interfaceExtrusionWidth = self.extrusionWidth * self.interfaceLayerThicknessRatio
 		self.interfaceStep = interfaceExtrusionWidth / self.interfaceInfillDensity		
 		
@@ -78,10 +78,7 @@ class SupportSkein:
 			layer.getPerimeterPaths(perimeters)
 			boundaryLayer = []
 			for perimeter in perimeters:				
-				boundaryLoop = []
-				boundaryLayer.append(boundaryLoop)
-				for boundaryPoint in perimeter.boundaryPoints:
-					boundaryLoop.append(boundaryPoint.dropAxis())
+				boundaryLayer.append(perimeter.boundaryPoints)
 			self.boundaryLayers.append(boundaryLayer)
 			
 		if len(self.boundaryLayers) < 0:
@@ -3,14 +3,16 @@
 Skeins a 3D model into gcode.
 """
 
-from config import config
+from config import readProfile
 from datetime import timedelta
 from entities import SlicedModel, RuntimeParameters
 from fabmetheus_utilities import archive
 from importlib import import_module
+from multiprocessing import Pool
 from utilities import memory_tracker
 import StringIO
 import argparse
+import glob
 import logging
 import os
 import re
@@ -39,65 +41,44 @@ def getCraftedTextFromPlugins(pluginSequence, gcode):
 			logger.info('%s plugin took %s seconds.', plugin.capitalize(), timedelta(seconds=time.time() - lastProcedureTime).total_seconds())
 			lastProcedureTime = time.time()
 
-def main(argv=None):
-    "Starting point for skeinforge engine."
-    parser = argparse.ArgumentParser(description='Skeins a 3D model into slicedModel.')
-    parser.add_argument('file', help='The file to skein. Files accepted: stl, obj, gts, and svg. Or sliced model files produced by SkeinforgeEngine.')
-    parser.add_argument('-c', metavar='config', help='Configuration for skeinforge engine.', default='skeinforge_engine.cfg')
-    parser.add_argument('-p', metavar='profile', help='Profile for the skeining.')
-    parser.add_argument('-o', metavar='output', help='Output filename. Overrides other export filename settings.')
-    parser.add_argument('-r', metavar='reprocess', help='Comma seperated list of plugins to reprocess a sliced model file. The export plugin is automatically appended.')
-
-    
-    if argv is None: 
-    	argv = sys.argv[1:]
-    args = parser.parse_args(argv)
-    
-    if args.c == None:
-    	logger.error('Invalid or missing configuration file.')
-    	return
-    config.read(args.c)
-    
-    logLevel = config.get('general', 'log.level')
-    logging.basicConfig(level=logLevel, format='%(asctime)s %(levelname)s (%(name)s) %(message)s')
-    	
-    defaultProfile = config.get('general', 'default.profile')
-    if defaultProfile != None:
-    	config.read(defaultProfile)
-    profileName = config.get('profile', 'name')
-    
-    if args.p != None:
-    	config.read(args.p)
-        if profileName == 'default':
-            profileName = os.path.splitext(os.path.basename(args.p))[0]
-    
-    logger.info("Profile: %s", profileName)
-        
-    inputFilename = args.file
-    
+def skein(inputFilename, profile, outputFilename=None, reprocess=None, estimate=False):
+    """Skeins the file with the profile, which is passed on to every plugin through the runtime parameters.
+        Returns the sliced model, or None when the file could not be processed."""
     if not os.path.isfile(inputFilename):
     	logger.error('File not found: %s', inputFilename)
     	return
  
     logger.info("Processing file: %s", os.path.basename(inputFilename))
     
-    exportedSlicedModelExtension = config.get('export', 'export.slicedmodel.extension')
-    if inputFilename.endswith(exportedSlicedModelExtension):
+    exportedSlicedModelExtension = profile.get('export', 'export.slicedmodel.extension')
+    isSlicedModelFile = inputFilename.endswith(exportedSlicedModelExtension)
+    if isSlicedModelFile:
         slicedModel = pickle.load(open(inputFilename))
-        slicedModel.runtimeParameters = RuntimeParameters()
+        slicedModel.runtimeParameters = RuntimeParameters(profile)
         inputFilename = inputFilename.replace('.'+exportedSlicedModelExtension, '')
     else:
-    	slicedModel = SlicedModel()
+    	slicedModel = SlicedModel(profile)
     
-    if args.o != None:
-        slicedModel.runtimeParameters.outputFilename = args.o
+    if outputFilename != None:
+        slicedModel.runtimeParameters.outputFilename = outputFilename
+    
+    finalPlugin = 'export'
+    if estimate:
+        finalPlugin = 'estimate'
     
-    if args.r != None:
-    	pluginSequence = args.r.split(',')
-    	if 'export' not in pluginSequence:
-    		pluginSequence.append('export')
+    if reprocess != None:
+    	pluginSequence = reprocess.split(',')
+    	if finalPlugin not in pluginSequence:
+    		pluginSequence.append(finalPlugin)
+    elif estimate and isSlicedModelFile:
+        pluginSequence = [finalPlugin]
     else:
-    	pluginSequence = config.get('general', 'plugin.sequence').split(',')
+    	pluginSequence = profile.get('general', 'plugin.sequence').split(',')
+    
+    if estimate:
+        pluginSequence = [plugin for plugin in pluginSequence if plugin != 'export']
+        if finalPlugin not in pluginSequence:
+            pluginSequence.append(finalPlugin)
     
     if inputFilename.endswith(exportedSlicedModelExtension) and 'carve' in pluginSequence:
         logger.error('Reprocessing a sliced model file with carve is not possible. Please process the original file or choose a different reprocessing sequence.')
@@ -109,7 +90,6 @@ def main(argv=None):
     	memory_tracker.track_object(slicedModel)
     	memory_tracker.create_snapshot('Start')
     
-    slicedModel.runtimeParameters.profileName = profileName
     slicedModel.runtimeParameters.inputFilename = inputFilename
     
     getCraftedTextFromPlugins(pluginSequence[:], slicedModel)
@@ -120,19 +100,140 @@ def main(argv=None):
     
     if slicedModel.runtimeParameters.profileMemory:
     	memory_tracker.create_snapshot('End')
-    	if config.getboolean('general', 'profile.memory.print.summary'):
+    	if profile.getboolean('general', 'profile.memory.print.summary'):
     		memory_tracker.tracker.stats.print_summary()
-    	if config.getboolean('general', 'profile.memory.export.data'):
+    	if profile.getboolean('general', 'profile.memory.export.data'):
     		memory_tracker.tracker.stats.dump_stats('%s.memory_tracker.dat' % inputFilename)
-    	if config.getboolean('general', 'profile.memory.export.html'):
+    	if profile.getboolean('general', 'profile.memory.export.html'):
     		from pympler.classtracker_stats import HtmlStats
     		HtmlStats(tracker=memory_tracker.tracker).create_html('%s.memory_tracker.html' % inputFilename)
             
     return slicedModel
 
+def runJob(job, profile):
+    """Skeins the model of the job, catching any error so one failed model does not stop the others.
+        Returns the result of the job: the model, profile, output, number of layers, seconds taken and the error if it failed."""
+    startTime = time.time()
+    result = {'model': job['model'], 'profile': profile.name, 'output': None, 'layers': None, 'error': None}
+    try:
+        slicedModel = skein(job['model'], profile, job.get('output'), job.get('reprocess'), job.get('estimate', False))
+        if slicedModel == None:
+            result['error'] = 'The model was not processed, see the log.'
+        else:
+            result['output'] = slicedModel.runtimeParameters.outputFilename
+            result['layers'] = len(slicedModel.layers)
+    except Exception, e:
+        logger.error('Skeining %s failed: %s', job['model'], traceback.format_exc())
+        result['error'] = '%s: %s' % (e.__class__.__name__, e)
+    result['seconds'] = round(time.time() - startTime, 3)
+    return result
+
+def runJobInWorker(jobAndProfile):
+    'Runs a job of a batch in a pool worker.'
+    return runJob(jobAndProfile[0], jobAndProfile[1])
+
+def getBatchFilenames(patterns):
+    'Get the files matching each pattern, a pattern that matches nothing is kept so it is reported as not found.'
+    filenames = []
+    for pattern in patterns:
+        matchingFilenames = sorted(glob.glob(pattern))
+        if len(matchingFilenames) < 1:
+            matchingFilenames = [pattern]
+        for filename in matchingFilenames:
+            if filename not in filenames:
+                filenames.append(filename)
+    return filenames
+
+def skeinBatch(filenames, profile, workers=None, reprocess=None, estimate=False):
+    """Skeins each file in its own process from a pool of workers, all with the same profile.
+        Returns the results of the jobs in the order of the files."""
+    jobs = [({'model': filename, 'reprocess': reprocess, 'estimate': estimate}, profile) for filename in filenames]
+    if workers != None and workers < 1:
+        workers = None
+    pool = Pool(workers, maxtasksperchild=1)
+    try:
+        return pool.map(runJobInWorker, jobs, 1)
+    finally:
+        pool.close()
+        pool.join()
+
+def getBatchFailureCount(results):
+    'Get the number of jobs of a batch which failed.'
+    return len([result for result in results if result['error'] != None])
+
+def getBatchSummary(results):
+    'Get the summary table of the results of a batch.'
+    output = StringIO.StringIO()
+    modelWidth = max([len('model')] + [len(os.path.basename(result['model'])) for result in results])
+    output.write('%-*s %10s %7s  %s\n' % (modelWidth, 'model', 'seconds', 'layers', 'result'))
+    for result in results:
+        layers = '-'
+        if result['layers'] != None:
+            layers = result['layers']
+        if result['error'] == None:
+            outcome = result['output']
+        else:
+            outcome = 'failed: %s' % result['error']
+        output.write('%-*s %10.3f %7s  %s\n' % (modelWidth, os.path.basename(result['model']), result['seconds'], layers, outcome))
+    output.write('\n%s models, %s failed, %.3f seconds of skeining.\n' % (len(results), getBatchFailureCount(results), sum(result['seconds'] for result in results)))
+    return output.getvalue()
+
+def main(argv=None):
+    "Starting point for skeinforge engine."
+    parser = argparse.ArgumentParser(description='Skeins a 3D model into slicedModel.')
+    parser.add_argument('file', nargs='+', help='The file to skein. Files accepted: stl, obj, gts, and svg. Or sliced model files produced by SkeinforgeEngine. Several files or glob patterns are skeined as a batch.')
+    parser.add_argument('-c', metavar='config', help='Configuration for skeinforge engine.', default='skeinforge_engine.cfg')
+    parser.add_argument('-p', metavar='profile', help='Profile for the skeining.')
+    parser.add_argument('-o', metavar='output', help='Output filename. Overrides other export filename settings.')
+    parser.add_argument('-r', metavar='reprocess', help='Comma seperated list of plugins to reprocess a sliced model file. The export plugin is automatically appended.')
+    parser.add_argument('-e', action='store_true', help='Estimate the print time and filament instead of exporting gcode. The estimate plugin replaces the export plugin.')
+    parser.add_argument('-w', metavar='workers', type=int, help='Skein the files as a batch with this number of worker processes, defaults to the number of processors.')
+    parser.add_argument('-s', metavar='summary', help='Filename to write the summary table of a batch to.')
+
+    
+    if argv is None: 
+    	argv = sys.argv[1:]
+    args = parser.parse_args(argv)
+    
+    if args.c == None:
+    	logger.error('Invalid or missing configuration file.')
+    	return
+    profile = readProfile(args.c, args.p)
+    
+    logLevel = profile.get('general', 'log.level')
+    logging.basicConfig(level=logLevel, format='%(asctime)s %(levelname)s (%(name)s) %(message)s')
+    
+    logger.info("Profile: %s", profile.name)
+    
+    filenames = getBatchFilenames(args.file)
+    if len(filenames) == 1 and args.w == None:
+        return skein(filenames[0], profile, args.o, args.r, args.e)
+    
+    if args.o != None:
+        logger.error('An output filename cannot be given for a batch of files.')
+        return
+    
+    logger.info('Skeining a batch of %s files.', len(filenames))
+    startTime = time.time()
+    results = skeinBatch(filenames, profile, args.w, args.r, args.e)
+    summary = getBatchSummary(results)
+    logger.info('Batch took %s seconds:\n%s', timedelta(seconds=time.time() - startTime).total_seconds(), summary)
+    if args.s != None:
+        archive.writeFileText(args.s, summary)
+        logger.info('Batch summary written to: %s', args.s)
+    return results
+
+def getExitStatus(mainResult):
+    '''Get the exit status of the result of main, 1 when the model was not processed or when any model of a batch failed, otherwise 0.'''
+    if mainResult == None:
+        return 1
+    if isinstance(mainResult, list) and getBatchFailureCount(mainResult) > 0:
+        return 1
+    return 0
+
 def handleError(self, record):
 	traceback.print_stack()
 
 if __name__ == "__main__":
 	logging.Handler.handleError = handleError	
-	main()
+	sys.exit(getExitStatus(main()))
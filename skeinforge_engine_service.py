@@ -0,0 +1,250 @@
+#!/usr/bin/python
+"""
+Runs skeinforge engine as a long running service which slices jobs from a spool directory and from a local socket.
+
+The plugins and the fabmetheus utilities are imported once when the service starts and the workers are forked from it,
+so a job does not pay the start up cost of the engine. Profiles are read once and only read again when one of their files
+changes. The jobs run on a pool with a fixed number of worker processes and each job is sent with its own profile, which is
+passed through the plugins of that job only.
+
+A job is a JSON object naming the model and optionally the profile, the output filename, a reprocess sequence and whether to
+estimate instead of exporting:
+
+    {"model": "/parts/bracket.stl", "profile": "profiles/pla.profile", "output": "/gcode/bracket.gcode"}
+
+Spool directory: write each job to a file ending in .job. The service renames it to .running while it is sliced and writes
+the result next to it, in a file ending in .done or .failed. A job left running when the service stopped is queued again
+when the service starts.
+
+Socket: connect to the port and send one job per line. The result of each job is sent back as one JSON line as soon as it
+finishes, while the connection stays open for more jobs, so the results come in the order the jobs finish.
+"""
+
+from config import readProfile
+from fabmetheus_utilities import svg_writer
+from importlib import import_module
+from multiprocessing import Pool, cpu_count
+import SocketServer
+import argparse
+import glob
+import json
+import logging
+import os
+import socket
+import skeinforge_engine
+import sys
+import threading
+import time
+import traceback
+
+logger = logging.getLogger('service')
+
+def warmUp(pluginSequence):
+    'Imports the plugins and the model interpreters, so the workers forked from the service start with them loaded.'
+    if skeinforge_engine.__plugins_path__ not in sys.path:
+        sys.path.insert(0, skeinforge_engine.__plugins_path__)
+    for plugin in pluginSequence:
+        import_module(plugin)
+    if svg_writer.__interpret_plugins_path__ not in sys.path:
+        sys.path.insert(0, svg_writer.__interpret_plugins_path__)
+    for interpreter in ['stl', 'obj', 'gts', 'svg']:
+        import_module(interpreter)
+
+def runJob(job, profile):
+    'Runs the job in a worker, any exception of the job is returned as its error so a result is always given for the job.'
+    try:
+        return skeinforge_engine.runJob(job, profile)
+    except BaseException, e:
+        logger.error('Job %s failed: %s', job.get('model'), traceback.format_exc())
+        return {'model': job.get('model'), 'profile': profile.name, 'output': None, 'layers': None, 'error': '%s: %s' % (e.__class__.__name__, e)}
+
+def getModificationTimes(filenames):
+    'Get the modification times of the files, None for a file which does not exist.'
+    modificationTimes = []
+    for filename in filenames:
+        if filename != None and os.path.isfile(filename):
+            modificationTimes.append(os.path.getmtime(filename))
+        else:
+            modificationTimes.append(None)
+    return modificationTimes
+
+class ProfileCache:
+    'Keeps each profile read by the service, reading a profile again only when one of its files changes.'
+    def __init__(self, configFilename):
+        self.configFilename = configFilename
+        self.profiles = {}
+        self.lock = threading.Lock()
+
+    def getProfile(self, profileFilename=None):
+        'Get the profile read from the file, or the default profile.'
+        with self.lock:
+            cachedProfile = self.profiles.get(profileFilename)
+            if cachedProfile != None and getModificationTimes(cachedProfile.filenames) == cachedProfile.modificationTimes:
+                return cachedProfile.profile
+            profile = readProfile(self.configFilename, profileFilename)
+            filenames = [self.configFilename, profile.get('general', 'default.profile'), profileFilename]
+            self.profiles[profileFilename] = CachedProfile(profile, filenames)
+            logger.info('Read profile: %s', profile.name)
+            return profile
+
+class CachedProfile:
+    'A profile read by the service and the modification times of the files it was read from.'
+    def __init__(self, profile, filenames):
+        self.profile = profile
+        self.filenames = filenames
+        self.modificationTimes = getModificationTimes(filenames)
+
+class SkeinService:
+    'Queues the jobs on a pool of worker processes.'
+    def __init__(self, configFilename, workers=None, jobsPerWorker=None):
+        self.profileCache = ProfileCache(configFilename)
+        defaultProfile = self.profileCache.getProfile()
+        warmUp(defaultProfile.get('general', 'plugin.sequence').split(',') + ['estimate'])
+        if workers == None or workers < 1:
+            workers = cpu_count()
+        if jobsPerWorker != None and jobsPerWorker < 1:
+            jobsPerWorker = None
+        self.pool = Pool(workers, maxtasksperchild=jobsPerWorker)
+        logger.info('Started %s workers.', workers)
+
+    def submit(self, job, callback=None):
+        'Queues the job, returns the asynchronous result. Raises a ValueError when the job does not name a model.'
+        if not isinstance(job, dict) or job.get('model') == None:
+            raise ValueError('A job needs a model: %s' % job)
+        profile = self.profileCache.getProfile(job.get('profile'))
+        logger.info('Queued %s with profile %s', job['model'], profile.name)
+        return self.pool.apply_async(runJob, (job, profile), callback=callback)
+
+    def close(self):
+        'Waits for the queued jobs and stops the workers.'
+        self.pool.close()
+        self.pool.join()
+
+class SpoolDirectory:
+    'Picks up the job files written to a directory and writes the result of each job next to it.'
+    def __init__(self, service, directory, pollInterval=1.0):
+        self.service = service
+        self.directory = directory
+        self.pollInterval = pollInterval
+
+    def poll(self):
+        'Queue the job files waiting in the directory.'
+        for jobFilename in sorted(glob.glob(os.path.join(self.directory, '*.job'))):
+            runningFilename = os.path.splitext(jobFilename)[0] + '.running'
+            try:
+                os.rename(jobFilename, runningFilename)
+            except OSError:
+                continue
+            try:
+                job = json.load(open(runningFilename))
+                self.service.submit(job, SpoolResultWriter(runningFilename))
+            except Exception, e:
+                SpoolResultWriter(runningFilename)({'error': '%s: %s' % (e.__class__.__name__, e)})
+
+    def requeueStaleJobs(self):
+        'Queue again the jobs which were left running when the service stopped.'
+        for runningFilename in sorted(glob.glob(os.path.join(self.directory, '*.running'))):
+            jobFilename = os.path.splitext(runningFilename)[0] + '.job'
+            try:
+                os.rename(runningFilename, jobFilename)
+                logger.warning('Queued again the job left running: %s', jobFilename)
+            except OSError, e:
+                SpoolResultWriter(runningFilename)({'error': 'The job was left running and could not be queued again: %s' % e})
+
+    def run(self):
+        'Poll the directory until interrupted.'
+        logger.info('Watching spool directory %s', self.directory)
+        self.requeueStaleJobs()
+        while True:
+            self.poll()
+            time.sleep(self.pollInterval)
+
+class SpoolResultWriter:
+    'Writes the result of a spooled job and removes its running file.'
+    def __init__(self, runningFilename):
+        self.runningFilename = runningFilename
+
+    def __call__(self, result):
+        baseFilename = os.path.splitext(self.runningFilename)[0]
+        try:
+            if result.get('error') == None:
+                resultFilename = baseFilename + '.done'
+            else:
+                resultFilename = baseFilename + '.failed'
+            resultFile = open(resultFilename, 'w')
+            json.dump(result, resultFile)
+            resultFile.close()
+            os.remove(self.runningFilename)
+        except Exception:
+            logger.error('Writing the result of %s failed: %s', self.runningFilename, traceback.format_exc())
+
+class JobRequestHandler(SocketServer.StreamRequestHandler):
+    'Reads one job per line and answers each with the result of the job as soon as it finishes.'
+    def handle(self):
+        self.writeLock = threading.Lock()
+        pendingResults = []
+        for line in iter(self.rfile.readline, ''):
+            if line.strip() == '':
+                continue
+            try:
+                pendingResults.append(self.server.service.submit(json.loads(line), self.writeResult))
+            except Exception, e:
+                self.writeResult({'error': '%s: %s' % (e.__class__.__name__, e)})
+        for pendingResult in pendingResults:
+            pendingResult.wait()
+
+    def writeResult(self, result):
+        'Send the result as one line. It is called from the pool when a job finishes, so a closed connection is only logged.'
+        with self.writeLock:
+            try:
+                self.wfile.write(json.dumps(result) + '\n')
+                self.wfile.flush()
+            except socket.error, e:
+                logger.warning('Could not send the result of %s: %s', result.get('model'), e)
+
+class JobServer(SocketServer.ThreadingMixIn, SocketServer.TCPServer):
+    'Accepts jobs on a local port.'
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, service, port):
+        SocketServer.TCPServer.__init__(self, ('localhost', port), JobRequestHandler)
+        self.service = service
+
+def main(argv=None):
+    "Starting point for the skeinforge engine service."
+    parser = argparse.ArgumentParser(description='Runs skeinforge engine as a service, slicing the jobs of a spool directory or of a local socket.')
+    parser.add_argument('-c', metavar='config', help='Configuration for skeinforge engine.', default='skeinforge_engine.cfg')
+    parser.add_argument('-s', metavar='spool', help='Spool directory to take job files from.')
+    parser.add_argument('-l', metavar='port', type=int, help='Local port to take jobs from.')
+    parser.add_argument('-w', metavar='workers', type=int, help='Number of worker processes, defaults to the number of processors.')
+    parser.add_argument('-j', metavar='jobs', type=int, help='Number of jobs a worker runs before it is replaced, defaults to no limit.')
+
+    if argv is None:
+        argv = sys.argv[1:]
+    args = parser.parse_args(argv)
+
+    if args.s == None and args.l == None:
+        parser.error('A spool directory (-s) or a port (-l) is needed.')
+
+    logging.basicConfig(level=readProfile(args.c).get('general', 'log.level'), format='%(asctime)s %(levelname)s (%(process)d %(name)s) %(message)s')
+
+    service = SkeinService(args.c, args.w, args.j)
+    try:
+        if args.l != None:
+            jobServer = JobServer(service, args.l)
+            logger.info('Listening for jobs on port %s', args.l)
+            if args.s == None:
+                jobServer.serve_forever()
+            else:
+                jobServerThread = threading.Thread(target=jobServer.serve_forever)
+                jobServerThread.daemon = True
+                jobServerThread.start()
+        if args.s != None:
+            SpoolDirectory(service, args.s).run()
+    except KeyboardInterrupt:
+        logger.info('Stopping, waiting for the queued jobs.')
+    service.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+'''
+Benchmarks skeinforge engine end to end on generated models.
+
+The models are parametric meshes written as STL, OBJ or GTS files: a cube, a cylinder, a woodpile lattice, an overhang
+ramp and a sphere with many facets, so the benchmark runs offline without any model files. Each model is skeined in a
+fresh interpreter which times every plugin of the plugin sequence and reports the peak memory, the number of layers and
+the size and hash of the gcode. The medians of the runs are written to a JSON baseline.
+
+A later run compared with a baseline flags the stages which are slower, or the models which use more memory, than the
+threshold allows and the models whose gcode changed. The comparison exits with a non zero status when it flags anything.
+
+Usage:
+    python -m utilities.benchmark [-c config] [-p profile] [-n runs] [-o baseline.json] [--compare baseline.json]
+        [--threshold 0.1] [--models cube,sphere] [--format stl|obj|gts] [--directory directory]
+'''
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import platform
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+def getBoxMesh(corners):
+    '''Get the mesh of a hexahedron from its eight corners, the bottom four then the top four, both counterclockwise seen from above.'''
+    quads = [(3, 2, 1, 0), (4, 5, 6, 7), (0, 1, 5, 4), (1, 2, 6, 5), (2, 3, 7, 6), (3, 0, 4, 7)]
+    triangles = []
+    for quad in quads:
+        triangles += [(quad[0], quad[1], quad[2]), (quad[0], quad[2], quad[3])]
+    return (list(corners), triangles)
+
+def getCubeMesh(size=20.0):
+    'Get the mesh of a cube standing on the xy plane.'
+    return getBoxMesh(getBoxCorners((0.0, 0.0, 0.0), (size, size, size)))
+
+def getBoxCorners(minimum, maximum):
+    'Get the eight corners of the axis aligned box.'
+    (x0, y0, z0) = minimum
+    (x1, y1, z1) = maximum
+    return [(x0, y0, z0), (x1, y0, z0), (x1, y1, z0), (x0, y1, z0), (x0, y0, z1), (x1, y0, z1), (x1, y1, z1), (x0, y1, z1)]
+
+def getCylinderMesh(radius=10.0, height=20.0, sides=96):
+    'Get the mesh of a cylinder standing on the xy plane, with a centre vertex on each cap.'
+    vertexes = [(0.0, 0.0, 0.0), (0.0, 0.0, height)]
+    for side in xrange(sides):
+        angle = 2.0 * math.pi * side / sides
+        (x, y) = (radius * math.cos(angle), radius * math.sin(angle))
+        vertexes += [(x, y, 0.0), (x, y, height)]
+    triangles = []
+    for side in xrange(sides):
+        bottom = 2 + 2 * side
+        nextBottom = 2 + 2 * ((side + 1) % sides)
+        triangles += [(0, nextBottom, bottom), (1, bottom + 1, nextBottom + 1)]
+        triangles += [(bottom, nextBottom, nextBottom + 1), (bottom, nextBottom + 1, bottom + 1)]
+    return (vertexes, triangles)
+
+def getLatticeMesh(cells=4, cellSize=8.0, beamWidth=2.0, levels=8):
+    '''Get the mesh of a woodpile lattice: levels of separate beams, along x on the even levels and along y on the odd levels,
+        each level resting on the level below.'''
+    vertexes = []
+    triangles = []
+    length = cells * cellSize
+    for level in xrange(levels):
+        (bottom, top) = (level * beamWidth, (level + 1) * beamWidth)
+        for cell in xrange(cells + 1):
+            offset = min(cell * cellSize, length - beamWidth)
+            if level % 2 == 0:
+                corners = getBoxCorners((0.0, offset, bottom), (length, offset + beamWidth, top))
+            else:
+                corners = getBoxCorners((offset, 0.0, bottom), (offset + beamWidth, length, top))
+            addMesh(getBoxMesh(corners), vertexes, triangles)
+    return (vertexes, triangles)
+
+def getRampMesh(width=20.0, height=20.0, overhangAngle=45.0):
+    'Get the mesh of a block leaning over its base by the overhang angle, measured from the vertical.'
+    shift = height * math.tan(math.radians(overhangAngle))
+    corners = getBoxCorners((0.0, 0.0, 0.0), (width, width, 0.0))[: 4]
+    corners += [(x + shift, y, height) for (x, y, z) in corners]
+    return getBoxMesh(corners)
+
+def getSphereMesh(radius=10.0, rings=96, segments=192):
+    'Get the mesh of a sphere resting on the xy plane, made of rings of quads with a pole vertex at the bottom and the top.'
+    vertexes = [(0.0, 0.0, 0.0), (0.0, 0.0, 2.0 * radius)]
+    for ring in xrange(1, rings):
+        polarAngle = math.pi * ring / rings
+        (ringRadius, z) = (radius * math.sin(polarAngle), radius - radius * math.cos(polarAngle))
+        for segment in xrange(segments):
+            angle = 2.0 * math.pi * segment / segments
+            vertexes.append((ringRadius * math.cos(angle), ringRadius * math.sin(angle), z))
+    triangles = []
+    for segment in xrange(segments):
+        nextSegment = (segment + 1) % segments
+        triangles.append((0, 2 + nextSegment, 2 + segment))
+        lastRing = 2 + (rings - 2) * segments
+        triangles.append((1, lastRing + segment, lastRing + nextSegment))
+        for ring in xrange(rings - 2):
+            (lower, upper) = (2 + ring * segments, 2 + (ring + 1) * segments)
+            triangles += [(lower + segment, lower + nextSegment, upper + nextSegment), (lower + segment, upper + nextSegment, upper + segment)]
+    return (vertexes, triangles)
+
+def addMesh(mesh, vertexes, triangles):
+    'Add the vertexes and triangles of the mesh to the vertexes and triangles.'
+    vertexStart = len(vertexes)
+    vertexes += mesh[0]
+    triangles += [(first + vertexStart, second + vertexStart, third + vertexStart) for (first, second, third) in mesh[1]]
+
+def writeSTL(filename, mesh):
+    'Write the mesh as a binary stl file.'
+    (vertexes, triangles) = mesh
+    stlFile = open(filename, 'wb')
+    stlFile.write('skeinforge engine benchmark'.ljust(80))
+    stlFile.write(struct.pack('<I', len(triangles)))
+    for triangle in triangles:
+        stlFile.write(struct.pack('<3f', 0.0, 0.0, 0.0))
+        for vertexIndex in triangle:
+            stlFile.write(struct.pack('<3f', *vertexes[vertexIndex]))
+        stlFile.write(struct.pack('<H', 0))
+    stlFile.close()
+
+def writeOBJ(filename, mesh):
+    'Write the mesh as an obj file.'
+    (vertexes, triangles) = mesh
+    objFile = open(filename, 'w')
+    for vertex in vertexes:
+        objFile.write('v %r %r %r\n' % vertex)
+    for triangle in triangles:
+        objFile.write('f %s %s %s\n' % (triangle[0] + 1, triangle[1] + 1, triangle[2] + 1))
+    objFile.close()
+
+def writeGTS(filename, mesh):
+    'Write the mesh as a GNU triangulated surface file, each face listing the edges ab, ca and bc of the triangle abc.'
+    (vertexes, triangles) = mesh
+    edgeIndexTable = {}
+    edges = []
+    faces = []
+    for triangle in triangles:
+        faceEdgeIndexes = []
+        for (begin, end) in [(triangle[0], triangle[1]), (triangle[2], triangle[0]), (triangle[1], triangle[2])]:
+            edgeKey = (min(begin, end), max(begin, end))
+            if edgeKey not in edgeIndexTable:
+                edgeIndexTable[edgeKey] = len(edges)
+                edges.append(edgeKey)
+            faceEdgeIndexes.append(edgeIndexTable[edgeKey])
+        faces.append(faceEdgeIndexes)
+    gtsFile = open(filename, 'w')
+    gtsFile.write('%s %s %s\n' % (len(vertexes), len(edges), len(faces)))
+    for vertex in vertexes:
+        gtsFile.write('%r %r %r\n' % vertex)
+    for edge in edges:
+        gtsFile.write('%s %s\n' % (edge[0] + 1, edge[1] + 1))
+    for face in faces:
+        gtsFile.write('%s %s %s\n' % (face[0] + 1, face[1] + 1, face[2] + 1))
+    gtsFile.close()
+
+meshGenerators = {'cube': getCubeMesh, 'cylinder': getCylinderMesh, 'lattice': getLatticeMesh, 'ramp': getRampMesh, 'sphere': getSphereMesh}
+meshFormats = {'stl': writeSTL, 'obj': writeOBJ, 'gts': writeGTS}
+defaultModels = [('cube', 'stl'), ('cylinder', 'obj'), ('lattice', 'gts'), ('ramp', 'stl'), ('sphere', 'stl')]
+
+def writeModels(directory, modelNames=None, meshFormat=None):
+    'Write the models to the directory, returns their filenames.'
+    filenames = []
+    for (modelName, defaultFormat) in defaultModels:
+        if modelNames == None or modelName in modelNames:
+            modelFormat = meshFormat
+            if modelFormat == None:
+                modelFormat = defaultFormat
+            filename = os.path.join(directory, '%s.%s' % (modelName, modelFormat))
+            meshFormats[modelFormat](filename, meshGenerators[modelName]())
+            filenames.append(filename)
+    return filenames
+
+def getPeakMemory():
+    'Get the peak resident memory of the process and its children in megabytes, or None when it can not be read.'
+    if resource == None:
+        return None
+    maximumResidentSize = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    if sys.platform == 'darwin':
+        return maximumResidentSize / 1048576.0
+    return maximumResidentSize / 1024.0
+
+def runChild(configFilename, profileFilename, modelFilename, outputFilename):
+    'Skein the model in this interpreter, timing each plugin, print the results as a JSON line.'
+    startTime = time.time()
+    import logging
+    import skeinforge_engine
+    profile = skeinforge_engine.readProfile(configFilename, profileFilename)
+    logging.basicConfig(level=logging.WARNING)
+    slicedModel = skeinforge_engine.SlicedModel(profile)
+    slicedModel.runtimeParameters.inputFilename = modelFilename
+    slicedModel.runtimeParameters.outputFilename = outputFilename
+    stages = []
+    for plugin in profile.get('general', 'plugin.sequence').split(','):
+        stageStartTime = time.time()
+        skeinforge_engine.getCraftedTextFromPlugins([plugin], slicedModel)
+        stages.append({'plugin': plugin, 'seconds': time.time() - stageStartTime, 'peakMemory': getPeakMemory()})
+    outputHash = None
+    outputSize = None
+    if os.path.isfile(outputFilename):
+        outputData = open(outputFilename, 'rb').read()
+        outputHash = hashlib.md5(outputData).hexdigest()
+        outputSize = len(outputData)
+    print json.dumps({
+        'stages': stages,
+        'total': time.time() - startTime,
+        'peakMemory': getPeakMemory(),
+        'layers': len(slicedModel.layers),
+        'outputSize': outputSize,
+        'outputHash': outputHash})
+
+def runOnce(configFilename, profileFilename, modelFilename):
+    'Skein the model in a fresh interpreter, return its results.'
+    outputFilename = os.path.splitext(modelFilename)[0] + '.gcode'
+    command = [sys.executable, '-m', 'utilities.benchmark', '--child', '-c', configFilename]
+    if profileFilename != None:
+        command += ['-p', profileFilename]
+    output = subprocess.Popen(command + [modelFilename, outputFilename], stdout=subprocess.PIPE).communicate()[0]
+    resultLines = [line for line in output.splitlines() if line.startswith('{')]
+    if len(resultLines) < 1:
+        raise RuntimeError('No results were reported for %s' % modelFilename)
+    return json.loads(resultLines[-1])
+
+def getMedian(values):
+    'Get the median of the values, None when there are none.'
+    values = sorted([value for value in values if value != None])
+    if len(values) < 1:
+        return None
+    middle = len(values) / 2
+    if len(values) % 2 == 1:
+        return values[middle]
+    return 0.5 * (values[middle - 1] + values[middle])
+
+def getModelResult(runs):
+    'Get the median stage times and peak memory of the runs of a model.'
+    stages = []
+    for (stageIndex, stage) in enumerate(runs[0]['stages']):
+        stages.append({'plugin': stage['plugin'], 'seconds': getMedian([run['stages'][stageIndex]['seconds'] for run in runs])})
+    return {
+        'stages': stages,
+        'total': getMedian([run['total'] for run in runs]),
+        'peakMemory': getMedian([run['peakMemory'] for run in runs]),
+        'layers': runs[0]['layers'],
+        'outputSize': runs[0]['outputSize'],
+        'outputHash': runs[0]['outputHash'],
+        'outputHashesAgree': len(set([run['outputHash'] for run in runs])) == 1}
+
+def getRegressions(baseline, results, threshold, minimumSeconds=0.05):
+    '''Get the descriptions of the regressions of the results against the baseline: a stage or total time or the peak memory over
+        the baseline by more than the threshold ratio, with times also over the minimum seconds, or a changed gcode hash.'''
+    regressions = []
+    for (modelName, result) in sorted(results['models'].items()):
+        baselineResult = baseline['models'].get(modelName)
+        if baselineResult == None:
+            continue
+        baselineSeconds = dict((stage['plugin'], stage['seconds']) for stage in baselineResult['stages'])
+        timings = [(stage['plugin'], stage['seconds'], baselineSeconds.get(stage['plugin'])) for stage in result['stages']]
+        timings.append(('total', result['total'], baselineResult['total']))
+        for (stageName, seconds, oldSeconds) in timings:
+            if oldSeconds != None and seconds > oldSeconds * (1.0 + threshold) and seconds - oldSeconds > minimumSeconds:
+                regressions.append('%s %s took %.3f seconds, the baseline took %.3f seconds.' % (modelName, stageName, seconds, oldSeconds))
+        (memory, oldMemory) = (result['peakMemory'], baselineResult['peakMemory'])
+        if memory != None and oldMemory != None and memory > oldMemory * (1.0 + threshold):
+            regressions.append('%s peak memory was %.1f MB, the baseline was %.1f MB.' % (modelName, memory, oldMemory))
+        if result['outputHash'] != baselineResult['outputHash']:
+            regressions.append('%s gcode changed, %s bytes instead of %s.' % (modelName, result['outputSize'], baselineResult['outputSize']))
+    return regressions
+
+def printResults(results, baseline=None):
+    'Print a table of the stage times of each model, with the baseline times when there is a baseline.'
+    for (modelName, result) in sorted(results['models'].items()):
+        baselineResult = None
+        if baseline != None:
+            baselineResult = baseline['models'].get(modelName)
+        print '%s: %s layers, %s bytes, peak memory %s MB' % (modelName, result['layers'], result['outputSize'], result['peakMemory'])
+        baselineSeconds = {}
+        if baselineResult != None:
+            baselineSeconds = dict((stage['plugin'], stage['seconds']) for stage in baselineResult['stages'])
+            baselineSeconds['total'] = baselineResult['total']
+        for (stageName, seconds) in [(stage['plugin'], stage['seconds']) for stage in result['stages']] + [('total', result['total'])]:
+            line = '    %-10s %10.3f' % (stageName, seconds)
+            if stageName in baselineSeconds:
+                line += ' %10.3f' % baselineSeconds[stageName]
+            print line
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks skeinforge engine end to end on generated models.')
+    parser.add_argument('-c', metavar='config', help='Configuration for skeinforge engine.', default='skeinforge_engine.cfg')
+    parser.add_argument('-p', metavar='profile', help='Profile for the skeining.')
+    parser.add_argument('-n', metavar='runs', type=int, default=3, help='Number of runs for each model, the medians are reported.')
+    parser.add_argument('-o', metavar='baseline', help='Write the results to the JSON baseline file.')
+    parser.add_argument('--compare', metavar='baseline', help='Compare the results with the JSON baseline file and flag the regressions.')
+    parser.add_argument('--threshold', type=float, default=0.1, help='Ratio over the baseline which is flagged as a regression.')
+    parser.add_argument('--models', help='Comma separated models to run, from %s.' % ', '.join(name for (name, meshFormat) in defaultModels))
+    parser.add_argument('--format', choices=sorted(meshFormats.keys()), help='Write every model in this format instead of its default format.')
+    parser.add_argument('--directory', help='Directory for the models and the gcode, a temporary directory is used and removed when not given.')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('files', nargs='*', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        runChild(args.c, args.p, args.files[0], args.files[1])
+        return
+
+    modelNames = None
+    if args.models != None:
+        modelNames = args.models.split(',')
+    directory = args.directory
+    if directory == None:
+        directory = tempfile.mkdtemp(prefix='skeinforge_benchmark_')
+    elif not os.path.isdir(directory):
+        os.makedirs(directory)
+    try:
+        results = {'profile': args.p, 'runs': max(1, args.n), 'python': platform.python_version(), 'platform': platform.platform(), 'time': time.time(), 'models': {}}
+        for modelFilename in writeModels(directory, modelNames, args.format):
+            runs = [runOnce(args.c, args.p, modelFilename) for run in xrange(max(1, args.n))]
+            results['models'][os.path.basename(modelFilename)] = getModelResult(runs)
+    finally:
+        if args.directory == None:
+            shutil.rmtree(directory, True)
+
+    baseline = None
+    if args.compare != None:
+        baseline = json.load(open(args.compare))
+    printResults(results, baseline)
+    if args.o != None:
+        json.dump(results, open(args.o, 'w'), indent=1, sort_keys=True)
+    if baseline != None:
+        regressions = getRegressions(baseline, results, args.threshold)
+        for regression in regressions:
+            print 'REGRESSION: %s' % regression
+        if len(regressions) > 0:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
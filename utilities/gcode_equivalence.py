@@ -0,0 +1,370 @@
+'''
+Checks that changes to the engine keep its gcode equivalent to stored reference gcode.
+
+The references are made by skeining a corpus of models with a set of profiles and are listed in a manifest in the
+reference directory. A check skeins the corpus again and compares each new gcode with its reference. Both files are
+parsed into moves, following the absolute and relative positioning and extrusion modes and the extruder resets, and the
+moves are grouped into layers by their height. For each layer the extruded length, the travel length, the filament fed,
+the retraction and the area covered by the extrusions are compared, so a change which reorders the paths, or moves the
+points by less than the tolerance, is told apart from a change to the printed part.
+
+A layer is the same when its moves are the same within the coordinate tolerance, equivalent when its measures are the
+same within the relative tolerance, and different otherwise. The check fails when a layer is different, or when a layer
+is not the same with --strict.
+
+The balance action measures the extruded length of a gcode file along the infill angle and along the crossing angle, and
+fails when one is longer than the other by more than the relative tolerance, so infill which stops crossing is caught.
+
+Usage:
+    python -m utilities.gcode_equivalence record -d references [-c config] [-p profile] [-p profile] model [model ...]
+    python -m utilities.gcode_equivalence check -d references [--tolerance 0.001] [--relative-tolerance 0.001] [--strict]
+    python -m utilities.gcode_equivalence compare reference.gcode new.gcode
+    python -m utilities.gcode_equivalence balance [--angle 45] [--relative-tolerance 0.1] new.gcode
+'''
+
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+
+measureNames = ['extrudedLength', 'travelLength', 'extrusion', 'retraction', 'area']
+
+def getMoves(lines):
+    '''Get the moves of the gcode lines as (beginX, beginY, endX, endY, z, extrusion) tuples, the extrusion being the filament
+        fed during the move, negative for a retraction.'''
+    moves = []
+    position = {'X': 0.0, 'Y': 0.0, 'Z': 0.0, 'E': 0.0}
+    isAbsolute = True
+    isExtrusionAbsolute = True
+    for line in lines:
+        words = line.split(';')[0].split('(')[0].split()
+        if len(words) < 1:
+            continue
+        command = words[0].upper()
+        parameters = {}
+        for word in words[1 :]:
+            try:
+                parameters[word[0].upper()] = float(word[1 :])
+            except ValueError:
+                pass
+        if command == 'G90':
+            isAbsolute = True
+        elif command == 'G91':
+            isAbsolute = False
+        elif command == 'M82':
+            isExtrusionAbsolute = True
+        elif command == 'M83':
+            isExtrusionAbsolute = False
+        elif command == 'G92':
+            for axis in parameters:
+                if axis in position:
+                    position[axis] = parameters[axis]
+        elif command == 'G28':
+            for axis in 'XYZ':
+                if axis in parameters or len(parameters) < 1:
+                    position[axis] = 0.0
+        elif command in ('G0', 'G1'):
+            (beginX, beginY) = (position['X'], position['Y'])
+            for axis in 'XYZ':
+                if axis in parameters:
+                    if isAbsolute:
+                        position[axis] = parameters[axis]
+                    else:
+                        position[axis] += parameters[axis]
+            extrusion = 0.0
+            if 'E' in parameters:
+                if isExtrusionAbsolute and isAbsolute:
+                    extrusion = parameters['E'] - position['E']
+                    position['E'] = parameters['E']
+                else:
+                    extrusion = parameters['E']
+                    position['E'] += extrusion
+            moves.append((beginX, beginY, position['X'], position['Y'], position['Z'], extrusion))
+    return moves
+
+def getLayers(moves, decimalPlaces=4):
+    'Get the moves grouped into layers by their height, in the order the heights are first reached.'
+    layers = []
+    layerTable = {}
+    for move in moves:
+        z = round(move[4], decimalPlaces)
+        if z not in layerTable:
+            layerTable[z] = Layer(z)
+            layers.append(layerTable[z])
+        layerTable[z].moves.append(move)
+    return layers
+
+def getCoveredArea(moves, extrusionWidth, cellSize):
+    'Get the area covered by the extruding moves, each drawn with the extrusion width, counting the covered cells of a grid.'
+    radius = 0.5 * extrusionWidth
+    cellRadius = int(math.ceil(radius / cellSize))
+    stamp = []
+    for cellX in xrange(-cellRadius, cellRadius + 1):
+        for cellY in xrange(-cellRadius, cellRadius + 1):
+            if math.hypot(cellX, cellY) * cellSize <= radius:
+                stamp.append((cellX, cellY))
+    coveredCells = set()
+    for (beginX, beginY, endX, endY, z, extrusion) in moves:
+        if extrusion <= 0.0:
+            continue
+        length = math.hypot(endX - beginX, endY - beginY)
+        numberOfSteps = max(1, int(math.ceil(2.0 * length / cellSize)))
+        for step in xrange(numberOfSteps + 1):
+            along = float(step) / numberOfSteps
+            centerX = int(round((beginX + along * (endX - beginX)) / cellSize))
+            centerY = int(round((beginY + along * (endY - beginY)) / cellSize))
+            for (cellX, cellY) in stamp:
+                coveredCells.add((centerX + cellX, centerY + cellY))
+    return len(coveredCells) * cellSize * cellSize
+
+class Layer:
+    'The moves of a layer of gcode, with their measures.'
+    def __init__(self, z):
+        self.z = z
+        self.moves = []
+        self.measures = None
+
+    def getMeasures(self, extrusionWidth, cellSize):
+        'Get the extruded and travel lengths, the filament fed and retracted, and the area covered by the layer.'
+        if self.measures != None:
+            return self.measures
+        measures = dict((measureName, 0.0) for measureName in measureNames)
+        for (beginX, beginY, endX, endY, z, extrusion) in self.moves:
+            length = math.hypot(endX - beginX, endY - beginY)
+            if extrusion > 0.0:
+                measures['extrusion'] += extrusion
+                if length > 0.0:
+                    measures['extrudedLength'] += length
+                    continue
+            elif extrusion < 0.0:
+                measures['retraction'] -= extrusion
+            measures['travelLength'] += length
+        measures['area'] = getCoveredArea(self.moves, extrusionWidth, cellSize)
+        self.measures = measures
+        return measures
+
+    def isSame(self, otherLayer, tolerance):
+        'Determine if the layer has the same moves as the other layer within the tolerance.'
+        if len(self.moves) != len(otherLayer.moves):
+            return False
+        for (move, otherMove) in zip(self.moves, otherLayer.moves):
+            for (value, otherValue) in zip(move, otherMove):
+                if abs(value - otherValue) > tolerance:
+                    return False
+        return True
+
+def getLayersFromFile(filename):
+    'Get the layers of the gcode file.'
+    return getLayers(getMovesFromFile(filename))
+
+def getMovesFromFile(filename):
+    'Get the moves of the gcode file.'
+    gcodeFile = open(filename)
+    moves = getMoves(gcodeFile)
+    gcodeFile.close()
+    return moves
+
+def getComparison(referenceFilename, newFilename, tolerance, relativeTolerance, extrusionWidth, cellSize):
+    '''Compare the new gcode with the reference gcode layer by layer. Returns a dictionary with the status of each layer,
+        the measures of the layers which are not the same and the totals of both files.'''
+    referenceLayers = getLayersFromFile(referenceFilename)
+    newLayers = getLayersFromFile(newFilename)
+    comparison = {'reference': referenceFilename, 'new': newFilename, 'layers': [], 'referenceLayerCount': len(referenceLayers), 'newLayerCount': len(newLayers)}
+    referenceTotals = dict((measureName, 0.0) for measureName in measureNames)
+    newTotals = dict((measureName, 0.0) for measureName in measureNames)
+    for layerIndex in xrange(max(len(referenceLayers), len(newLayers))):
+        layerComparison = {'index': layerIndex, 'status': 'different'}
+        comparison['layers'].append(layerComparison)
+        if layerIndex >= len(referenceLayers) or layerIndex >= len(newLayers):
+            layerComparison['status'] = 'missing'
+            continue
+        (referenceLayer, newLayer) = (referenceLayers[layerIndex], newLayers[layerIndex])
+        layerComparison['z'] = referenceLayer.z
+        layerComparison['newZ'] = newLayer.z
+        referenceMeasures = referenceLayer.getMeasures(extrusionWidth, cellSize)
+        newMeasures = newLayer.getMeasures(extrusionWidth, cellSize)
+        for measureName in measureNames:
+            referenceTotals[measureName] += referenceMeasures[measureName]
+            newTotals[measureName] += newMeasures[measureName]
+        if abs(referenceLayer.z - newLayer.z) <= tolerance and referenceLayer.isSame(newLayer, tolerance):
+            layerComparison['status'] = 'same'
+            continue
+        layerComparison['reference'] = referenceMeasures
+        layerComparison['measures'] = newMeasures
+        if abs(referenceLayer.z - newLayer.z) > tolerance:
+            continue
+        isEquivalent = True
+        for measureName in measureNames:
+            if getRelativeDelta(referenceMeasures[measureName], newMeasures[measureName], tolerance) > relativeTolerance:
+                isEquivalent = False
+        if isEquivalent:
+            layerComparison['status'] = 'equivalent'
+    comparison['referenceTotals'] = referenceTotals
+    comparison['newTotals'] = newTotals
+    return comparison
+
+def getRelativeDelta(referenceValue, newValue, tolerance):
+    'Get the size of the change of the value relative to the reference value, zero when the change is within the tolerance.'
+    delta = abs(newValue - referenceValue)
+    if delta <= tolerance:
+        return 0.0
+    return delta / max(abs(referenceValue), tolerance)
+
+def isPassing(comparison, isStrict):
+    'Determine if the comparison passes, every layer being the same, or also equivalent when not strict.'
+    passingStatuses = ['same']
+    if not isStrict:
+        passingStatuses.append('equivalent')
+    for layerComparison in comparison['layers']:
+        if layerComparison['status'] not in passingStatuses:
+            return False
+    return True
+
+def printComparison(comparison):
+    'Print the layers which are not the same with the changes of their measures, then the totals.'
+    print '%s -> %s: %s reference layers, %s new layers' % (comparison['reference'], comparison['new'], comparison['referenceLayerCount'], comparison['newLayerCount'])
+    statusCounts = {}
+    for layerComparison in comparison['layers']:
+        status = layerComparison['status']
+        statusCounts[status] = statusCounts.get(status, 0) + 1
+        if status == 'same':
+            continue
+        if status == 'missing':
+            print '  layer %4s missing' % layerComparison['index']
+            continue
+        deltas = []
+        for measureName in measureNames:
+            (referenceValue, newValue) = (layerComparison['reference'][measureName], layerComparison['measures'][measureName])
+            deltas.append('%s %+.4f%s' % (measureName, newValue - referenceValue, getPercentage(referenceValue, newValue)))
+        print '  layer %4s z %s %-10s %s' % (layerComparison['index'], layerComparison['z'], status, ', '.join(deltas))
+    totals = []
+    for measureName in measureNames:
+        (referenceValue, newValue) = (comparison['referenceTotals'][measureName], comparison['newTotals'][measureName])
+        totals.append('%s %.4f -> %.4f%s' % (measureName, referenceValue, newValue, getPercentage(referenceValue, newValue)))
+    print '  totals: %s' % ', '.join(totals)
+    print '  layers: %s' % ', '.join('%s %s' % (count, status) for (status, count) in sorted(statusCounts.items()))
+
+def getDirectionLengths(moves, angle, angleTolerance):
+    'Get the extruded lengths of the moves along the angle and along the crossing angle, in degrees, either way along each.'
+    directionLengths = [0.0, 0.0]
+    for (beginX, beginY, endX, endY, z, extrusion) in moves:
+        if extrusion <= 0.0 or (beginX == endX and beginY == endY):
+            continue
+        moveAngle = math.degrees(math.atan2(endY - beginY, endX - beginX))
+        for directionIndex in xrange(2):
+            delta = (moveAngle - angle - 90.0 * directionIndex) % 180.0
+            if min(delta, 180.0 - delta) <= angleTolerance:
+                directionLengths[directionIndex] += math.hypot(endX - beginX, endY - beginY)
+    return directionLengths
+
+def getEngineDirectory():
+    'Get the directory of skeinforge engine, which holds the utilities directory.'
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def getPercentage(referenceValue, newValue):
+    'Get the change of the value as a percentage, or an empty string when the reference is zero.'
+    if referenceValue == 0.0:
+        return ''
+    return ' (%+.2f%%)' % (100.0 * (newValue - referenceValue) / referenceValue)
+
+def getReferenceFilename(modelFilename, profileFilename):
+    'Get the filename of the reference gcode of the model skeined with the profile, keeping the model extension so models in several formats stay apart.'
+    profileName = 'default'
+    if profileFilename != None:
+        profileName = os.path.splitext(os.path.basename(profileFilename))[0]
+    return '%s.%s.gcode' % (os.path.basename(modelFilename), profileName)
+
+def skein(configFilename, profileFilename, modelFilename, outputFilename):
+    '''Skein the model with the profile in a fresh interpreter. Raises a RuntimeError when no gcode is written.
+        The engine runs in its own directory, so the default profile named by the configuration is found from anywhere.'''
+    engineDirectory = getEngineDirectory()
+    command = [sys.executable, os.path.join(engineDirectory, 'skeinforge_engine.py'), '-c', os.path.abspath(configFilename), '-o', os.path.abspath(outputFilename)]
+    if profileFilename != None:
+        command += ['-p', os.path.abspath(profileFilename)]
+    subprocess.Popen(command + [os.path.abspath(modelFilename)], cwd=engineDirectory, stdout=subprocess.PIPE, stderr=subprocess.STDOUT).communicate()
+    if not os.path.isfile(outputFilename):
+        raise RuntimeError('No gcode was written for %s' % modelFilename)
+
+def record(directory, configFilename, profileFilenames, modelFilenames):
+    'Skein the models with each profile into the reference directory and write the manifest.'
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    cases = []
+    for modelFilename in modelFilenames:
+        for profileFilename in profileFilenames:
+            referenceFilename = getReferenceFilename(modelFilename, profileFilename)
+            skein(configFilename, profileFilename, os.path.abspath(modelFilename), os.path.join(directory, referenceFilename))
+            if profileFilename != None:
+                profileFilename = os.path.abspath(profileFilename)
+            cases.append({'model': os.path.abspath(modelFilename), 'profile': profileFilename, 'reference': referenceFilename})
+            print 'Recorded %s' % referenceFilename
+    json.dump({'config': os.path.abspath(configFilename), 'cases': cases}, open(os.path.join(directory, 'manifest.json'), 'w'), indent=1)
+
+def check(directory, tolerance, relativeTolerance, extrusionWidth, cellSize, isStrict):
+    'Skein the cases of the manifest again and compare them with their references, returns the number of failing cases.'
+    manifest = json.load(open(os.path.join(directory, 'manifest.json')))
+    failures = 0
+    newDirectory = tempfile.mkdtemp(prefix='skeinforge_equivalence_')
+    for case in manifest['cases']:
+        newFilename = os.path.join(newDirectory, case['reference'])
+        skein(manifest['config'], case['profile'], case['model'], newFilename)
+        comparison = getComparison(os.path.join(directory, case['reference']), newFilename, tolerance, relativeTolerance, extrusionWidth, cellSize)
+        printComparison(comparison)
+        if isPassing(comparison, isStrict):
+            os.remove(newFilename)
+        else:
+            print '  FAILED, the new gcode is kept in %s' % newFilename
+            failures += 1
+    if failures == 0:
+        os.rmdir(newDirectory)
+    print '%s of %s cases passed.' % (len(manifest['cases']) - failures, len(manifest['cases']))
+    return failures
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Checks that the gcode of skeinforge engine stays equivalent to stored references.')
+    subparsers = parser.add_subparsers(dest='action')
+    recordParser = subparsers.add_parser('record', help='Skein the models into the reference directory.')
+    recordParser.add_argument('-d', metavar='directory', default='references', help='Directory of the references and their manifest.')
+    recordParser.add_argument('-c', metavar='config', default=os.path.join(getEngineDirectory(), 'skeinforge_engine.cfg'), help='Configuration for skeinforge engine.')
+    recordParser.add_argument('-p', metavar='profile', action='append', help='Profile to record the models with, can be repeated. The default profile is used when none is given.')
+    recordParser.add_argument('model', nargs='+', help='The models to record.')
+    checkParser = subparsers.add_parser('check', help='Skein the recorded cases again and compare them with their references.')
+    checkParser.add_argument('-d', metavar='directory', default='references', help='Directory of the references and their manifest.')
+    compareParser = subparsers.add_parser('compare', help='Compare two gcode files.')
+    compareParser.add_argument('reference', help='The reference gcode.')
+    compareParser.add_argument('new', help='The new gcode.')
+    balanceParser = subparsers.add_parser('balance', help='Check that the infill of a gcode file crosses evenly.')
+    balanceParser.add_argument('gcode', help='The gcode to check.')
+    balanceParser.add_argument('--angle', type=float, default=45.0, help='Infill angle in degrees, the crossing infill being at a right angle to it.')
+    balanceParser.add_argument('--angle-tolerance', type=float, default=5.0, help='Tolerance in degrees for a move to be along an angle.')
+    balanceParser.add_argument('--relative-tolerance', type=float, default=0.1, help='Relative tolerance of the lengths along the two angles.')
+    for comparingParser in (checkParser, compareParser):
+        comparingParser.add_argument('--tolerance', type=float, default=0.001, help='Coordinate tolerance in millimetres for the moves to be the same.')
+        comparingParser.add_argument('--relative-tolerance', type=float, default=0.001, help='Relative tolerance of the layer measures for a layer to be equivalent.')
+        comparingParser.add_argument('--width', type=float, default=0.5, help='Extrusion width used to measure the covered area.')
+        comparingParser.add_argument('--cell', type=float, default=0.1, help='Grid cell size used to measure the covered area.')
+        comparingParser.add_argument('--strict', action='store_true', help='Fail unless every layer is the same.')
+    args = parser.parse_args(argv)
+
+    if args.action == 'record':
+        record(args.d, args.c, args.p or [None], args.model)
+    elif args.action == 'check':
+        if check(args.d, args.tolerance, args.relative_tolerance, args.width, args.cell, args.strict) > 0:
+            sys.exit(1)
+    elif args.action == 'balance':
+        directionLengths = getDirectionLengths(getMovesFromFile(args.gcode), args.angle, args.angle_tolerance)
+        print '%s: %.1f mm at %s degrees, %.1f mm at %s degrees' % (args.gcode, directionLengths[0], args.angle, directionLengths[1], args.angle + 90.0)
+        if max(directionLengths) - min(directionLengths) > args.relative_tolerance * max(directionLengths):
+            print '  FAILED, the infill is not balanced.'
+            sys.exit(1)
+    else:
+        comparison = getComparison(args.reference, args.new, args.tolerance, args.relative_tolerance, args.width, args.cell)
+        printComparison(comparison)
+        if not isPassing(comparison, args.strict):
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
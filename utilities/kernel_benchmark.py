@@ -0,0 +1,177 @@
+'''
+Micro benchmarks of the geometry kernels of the fabmetheus utilities.
+
+Each kernel is timed on deterministic random polygons: star shaped loops whose radius varies randomly around the centre,
+made by a seeded random generator so every run times the same input. The size n is the number of points of the loop,
+of the scan lines of the fill endpoints, of the pixel table segments or, for the mesh, roughly the number of faces.
+An operation is one call of the kernel on the whole input, so the kernels which take one segment, as addSegmentToPixelTable
+and isLineIntersectingLoops, are called once for each of the n segments or for each of a fixed set of lines.
+
+For each kernel and size the benchmark reports the operations per second and the time per operation, and the scaling
+exponent from the previous size, which is near 1 for a linear kernel and near 2 for a quadratic one.
+
+Usage:
+    python -m utilities.kernel_benchmark [-k kernel,kernel] [-n 64,128,256] [-t seconds] [-s seed] [-o results.json]
+'''
+
+from fabmetheus_utilities import euclidean, intercircle
+from fabmetheus_utilities.geometry.geometry_tools import face
+from fabmetheus_utilities.geometry.solids import triangle_mesh
+from fabmetheus_utilities.vector3 import Vector3
+from utilities import benchmark
+import argparse
+import json
+import math
+import random
+import timeit
+
+def getRandomLoop(randomGenerator, numberOfPoints, radius=10.0, roughness=0.4):
+    'Get a widdershins star shaped loop whose radius varies randomly by the roughness ratio.'
+    loop = []
+    for pointIndex in xrange(numberOfPoints):
+        angle = 2.0 * math.pi * pointIndex / numberOfPoints
+        pointRadius = radius * (1.0 + roughness * (randomGenerator.random() - 0.5))
+        loop.append(pointRadius * complex(math.cos(angle), math.sin(angle)))
+    return loop
+
+def getRandomSegments(randomGenerator, numberOfSegments, radius=10.0, maximumLength=2.0):
+    'Get random segments, as point pairs, within the radius.'
+    segments = []
+    for segmentIndex in xrange(numberOfSegments):
+        begin = complex(randomGenerator.uniform(-radius, radius), randomGenerator.uniform(-radius, radius))
+        end = begin + complex(randomGenerator.uniform(-maximumLength, maximumLength), randomGenerator.uniform(-maximumLength, maximumLength))
+        segments.append((begin, end))
+    return segments
+
+def setUpAddSegmentToPixelTable(randomGenerator, size):
+    'Add n random segments to an empty pixel table.'
+    segments = getRandomSegments(randomGenerator, size)
+    def addSegmentsToPixelTable():
+        pixelDictionary = {}
+        for (begin, end) in segments:
+            euclidean.addSegmentToPixelTable(begin, end, pixelDictionary, 0.0, 0.0, 0.2)
+    return addSegmentsToPixelTable
+
+def setUpGetCentersFromPoints(randomGenerator, size):
+    'Get the centers of the points of an n point loop.'
+    loop = getRandomLoop(randomGenerator, size)
+    return lambda: intercircle.getCentersFromPoints(loop, 0.5)
+
+def setUpGetInsetLoopsFromLoop(randomGenerator, size):
+    'Inset an n point loop.'
+    loop = getRandomLoop(randomGenerator, size)
+    return lambda: intercircle.getInsetLoopsFromLoop(loop, 0.5)
+
+def setUpGetLoopsFromCorrectMesh(randomGenerator, size):
+    'Slice a sphere of about n faces through its middle, a little off the rings of vertexes.'
+    rings = max(4, int(round(math.sqrt(0.25 * size))))
+    (vertexTuples, triangles) = benchmark.getSphereMesh(10.0, rings, 2 * rings)
+    vertexes = [Vector3(x, y, z) for (x, y, z) in vertexTuples]
+    faces = []
+    for triangle in triangles:
+        triangleFace = face.Face()
+        triangleFace.index = len(faces)
+        triangleFace.vertexIndexes = list(triangle)
+        faces.append(triangleFace)
+    edges = []
+    edgeTable = {}
+    for triangleFace in faces:
+        triangleFace.setEdgeIndexesToVertexIndexes(edges, edgeTable)
+    z = 10.0 + 0.1 * randomGenerator.random() / rings
+    return lambda: triangle_mesh.getLoopsFromCorrectMesh(edges, faces, vertexes, z)
+
+def setUpGetPathsFromEndpoints(randomGenerator, size):
+    'Link the endpoints of the fill segments of n scan lines across a loop of n points.'
+    loop = getRandomLoop(randomGenerator, size)
+    width = 20.0 / size
+    segments = []
+    for lineIndex in xrange(size):
+        y = -10.0 + (lineIndex + 0.5) * width
+        xIntersections = []
+        euclidean.addXIntersections(loop, xIntersections, y)
+        xIntersections.sort()
+        segments += euclidean.getSegmentsFromXIntersections(xIntersections, y)
+    endpoints = euclidean.getEndpointsFromSegments(segments)
+    return lambda: euclidean.getPathsFromEndpoints(endpoints, 5.0 * width, {}, width)
+
+def setUpGetSimplifiedLoop(randomGenerator, size):
+    'Simplify an n point loop.'
+    loop = getRandomLoop(randomGenerator, size)
+    return lambda: euclidean.getSimplifiedLoop(loop, 0.1)
+
+def setUpIsLineIntersectingLoops(randomGenerator, size):
+    'Intersect a hundred random lines with an n point loop.'
+    loops = [getRandomLoop(randomGenerator, size)]
+    lines = getRandomSegments(randomGenerator, 100, 12.0, 6.0)
+    def isLinesIntersectingLoops():
+        for (begin, end) in lines:
+            euclidean.isLineIntersectingLoops(loops, begin, end)
+    return isLinesIntersectingLoops
+
+kernelSetUps = [
+    ('getPathsFromEndpoints', setUpGetPathsFromEndpoints),
+    ('addSegmentToPixelTable', setUpAddSegmentToPixelTable),
+    ('getSimplifiedLoop', setUpGetSimplifiedLoop),
+    ('isLineIntersectingLoops', setUpIsLineIntersectingLoops),
+    ('getInsetLoopsFromLoop', setUpGetInsetLoopsFromLoop),
+    ('getCentersFromPoints', setUpGetCentersFromPoints),
+    ('getLoopsFromCorrectMesh', setUpGetLoopsFromCorrectMesh)]
+
+def getOperationsPerSecond(operation, minimumSeconds):
+    'Call the operation until the minimum seconds have passed, at least once, and return the operations per second.'
+    numberOfOperations = 0
+    startTime = timeit.default_timer()
+    elapsedSeconds = 0.0
+    while numberOfOperations < 1 or elapsedSeconds < minimumSeconds:
+        operation()
+        numberOfOperations += 1
+        elapsedSeconds = timeit.default_timer() - startTime
+    return numberOfOperations / elapsedSeconds
+
+def getScalingCurve(setUp, sizes, minimumSeconds, seed):
+    'Get the operations per second of the kernel for each size, with the scaling exponent from the previous size.'
+    curve = []
+    for size in sizes:
+        operation = setUp(random.Random(seed * 1000003 + size), size)
+        operationsPerSecond = getOperationsPerSecond(operation, minimumSeconds)
+        exponent = None
+        if len(curve) > 0:
+            previous = curve[-1]
+            exponent = math.log(previous['operationsPerSecond'] / operationsPerSecond) / math.log(float(size) / previous['size'])
+        curve.append({'size': size, 'operationsPerSecond': operationsPerSecond, 'exponent': exponent})
+    return curve
+
+def main(argv=None):
+    kernelNames = [kernelName for (kernelName, setUp) in kernelSetUps]
+    parser = argparse.ArgumentParser(description='Micro benchmarks of the euclidean, intercircle and triangle mesh kernels.')
+    parser.add_argument('-k', metavar='kernels', help='Comma separated kernels to time, from %s.' % ', '.join(kernelNames))
+    parser.add_argument('-n', metavar='sizes', default='64,128,256,512,1024', help='Comma separated sizes of the input.')
+    parser.add_argument('-t', metavar='seconds', type=float, default=0.2, help='Minimum time for each kernel and size.')
+    parser.add_argument('-s', metavar='seed', type=int, default=1, help='Seed of the random polygons.')
+    parser.add_argument('-o', metavar='results', help='Write the results to the JSON file.')
+    args = parser.parse_args(argv)
+
+    if args.k != None:
+        for kernelName in args.k.split(','):
+            if kernelName not in kernelNames:
+                parser.error('Unknown kernel: %s' % kernelName)
+        kernelNames = args.k.split(',')
+    sizes = [int(size) for size in args.n.split(',')]
+
+    results = {'seed': args.s, 'kernels': {}}
+    print '%-24s %8s %14s %14s %8s' % ('kernel', 'n', 'ops/second', 'ms/op', 'scaling')
+    for (kernelName, setUp) in kernelSetUps:
+        if kernelName not in kernelNames:
+            continue
+        curve = getScalingCurve(setUp, sizes, args.t, args.s)
+        results['kernels'][kernelName] = curve
+        for point in curve:
+            exponent = ''
+            if point['exponent'] != None:
+                exponent = '%8.2f' % point['exponent']
+            print '%-24s %8s %14.1f %14.3f %8s' % (kernelName, point['size'], point['operationsPerSecond'], 1000.0 / point['operationsPerSecond'], exponent)
+    if args.o != None:
+        json.dump(results, open(args.o, 'w'), indent=1, sort_keys=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+'''
+Measures the start up of skeinforge engine: the time from launching a fresh interpreter to the first carved layer.
+
+Each run starts a new interpreter, so the imports are paid every time as they are on the command line. The child
+reports when it started, when the engine was imported, when the profile was read, when carve finished (the first
+layer) and when the whole plugin sequence finished, the gcode being written to the null device.
+
+Usage:
+    python -m utilities.startup_benchmark [-c config] [-p profile] [-n runs] model [model ...]
+'''
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+def runChild(configFilename, profileFilename, modelFilename):
+    'Time the start up of the engine in this interpreter, print the timings as a JSON line.'
+    startTime = time.time()
+    import logging
+    import skeinforge_engine
+    importedTime = time.time()
+    profile = skeinforge_engine.readProfile(configFilename, profileFilename)
+    logging.basicConfig(level=logging.WARNING)
+    profileTime = time.time()
+    slicedModel = skeinforge_engine.SlicedModel(profile)
+    slicedModel.runtimeParameters.inputFilename = modelFilename
+    slicedModel.runtimeParameters.outputFilename = os.devnull
+    pluginSequence = profile.get('general', 'plugin.sequence').split(',')
+    skeinforge_engine.getCraftedTextFromPlugins(pluginSequence[: 1], slicedModel)
+    firstLayerTime = time.time()
+    evaluateLoaded = 'fabmetheus_utilities.geometry.geometry_utilities.evaluate' in sys.modules
+    skeinforge_engine.getCraftedTextFromPlugins(pluginSequence[1 :], slicedModel)
+    endTime = time.time()
+    print json.dumps({
+        'start': startTime,
+        'imports': importedTime - startTime,
+        'profile': profileTime - importedTime,
+        'firstLayer': firstLayerTime - startTime,
+        'total': endTime - startTime,
+        'layers': len(slicedModel.layers),
+        'modules': len(sys.modules),
+        'evaluateLoaded': evaluateLoaded})
+
+def runOnce(configFilename, profileFilename, modelFilename):
+    'Launch a fresh interpreter for the model, return its timings.'
+    command = [sys.executable, '-m', 'utilities.startup_benchmark', '--child', '-c', configFilename]
+    if profileFilename != None:
+        command += ['-p', profileFilename]
+    launchTime = time.time()
+    output = subprocess.Popen(command + [modelFilename], stdout=subprocess.PIPE).communicate()[0]
+    timingLines = [line for line in output.splitlines() if line.startswith('{')]
+    if len(timingLines) < 1:
+        raise RuntimeError('No timings were reported for %s' % modelFilename)
+    timings = json.loads(timingLines[-1])
+    timings['launch'] = timings['start'] - launchTime
+    return timings
+
+def getMedian(values):
+    'Get the median of the values.'
+    values = sorted(values)
+    middle = len(values) / 2
+    if len(values) % 2 == 1:
+        return values[middle]
+    return 0.5 * (values[middle - 1] + values[middle])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measures the time from launching skeinforge engine to the first carved layer.')
+    parser.add_argument('-c', metavar='config', help='Configuration for skeinforge engine.', default='skeinforge_engine.cfg')
+    parser.add_argument('-p', metavar='profile', help='Profile for the skeining.')
+    parser.add_argument('-n', metavar='runs', type=int, default=5, help='Number of runs for each model, the median is reported.')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('model', nargs='+', help='The model files to time.')
+    args = parser.parse_args(argv)
+
+    if args.child:
+        runChild(args.c, args.p, args.model[0])
+        return
+
+    columns = ['launch', 'imports', 'profile', 'firstLayer', 'total']
+    print '%-30s %s %8s %8s' % ('model', ' '.join('%10s' % column for column in columns), 'layers', 'evaluate')
+    for modelFilename in args.model:
+        runs = [runOnce(args.c, args.p, modelFilename) for run in xrange(max(1, args.n))]
+        medians = ' '.join('%10.3f' % getMedian([timings[column] for timings in runs]) for column in columns)
+        print '%-30s %s %8s %8s' % (os.path.basename(modelFilename), medians, runs[0]['layers'], runs[0]['evaluateLoaded'])
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
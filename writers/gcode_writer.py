@@ -1,12 +1,15 @@
-from config import config
 from fabmetheus_utilities.vector3 import Vector3
-from entities import GcodeCommand, TravelPath
+from entities import GcodeCommand, TravelPath, ExtruderState
 from plugins.comb import CombSkein
+from itertools import islice, izip
+from multiprocessing import Pool, cpu_count
 import StringIO
 import gcodes
 import sys
 import time
-import entities.paths as paths
+
+# the writer used by the worker processes of a parallel export, set by the pool initializer
+_workerGcodeWriter = None
 
 class GcodeWriter:
     '''Writes the slicedModel for a sliced model.'''
@@ -15,35 +18,89 @@ class GcodeWriter:
         self.slicedModel = slicedModel
         
         
-    def getSlicedModel(self, verbose=False):
-        '''Final Gcode representation.'''
+    def getSlicedModel(self, verbose=False, workers=None):
+        '''Final Gcode representation.
+            If workers is given the layers are generated in parallel by that many processes, 0 meaning one per cpu.'''
         output = StringIO.StringIO()
                     
         for startCommand in self.slicedModel.startGcodeCommands:
             output.write(printCommand(startCommand, verbose))
             
+        extruderState = ExtruderState()
+        
+        if workers != None and len(self.slicedModel.layers) > 1:
+            self.getLayersInParallel(output, verbose, extruderState, workers)
+        else:
+            for (layer, lookaheadStartVector) in izip(self.slicedModel.layers, self.getLookaheadStartVectors()):
+                self.getLayer(layer, output, lookaheadStartVector, verbose, extruderState)
+            
+        for endCommand in self.slicedModel.endGcodeCommands:
+            output.write(printCommand(endCommand, verbose))
+                        
+        return output.getvalue()
+    
+    def getLookaheadStartVectors(self):
+        '''Returns, for each layer, the start of the next layer which has a start point.'''
+        lookaheadStartVectors = []
         lookaheadStartVector = None
-        lookaheadKeyIndex = 0
         layerCount = len(self.slicedModel.layers)
         for layer in self.slicedModel.layers:
-            lookaheadStartPoint = None
             lookaheadIndex = layer.index + 1
             if lookaheadIndex < layerCount:
                 lookaheadLayer = self.slicedModel.layers[lookaheadIndex]
                 lookaheadStartPoint = lookaheadLayer.getStartPoint()
                 if lookaheadStartPoint != None:
                         lookaheadStartVector = Vector3(lookaheadStartPoint.real, lookaheadStartPoint.imag, lookaheadLayer.z)
-
-            self.getLayer(layer, output, lookaheadStartVector, verbose)
-            
-        for endCommand in self.slicedModel.endGcodeCommands:
-            output.write(printCommand(endCommand, verbose))
-                        
-        return output.getvalue()
+            lookaheadStartVectors.append(lookaheadStartVector)
+        return lookaheadStartVectors
     
+    def getLayersInParallel(self, output, verbose, extruderState, workers):
+        '''Generates the layers in a pool of processes and writes them in order as they complete.
+            Each layer is generated from an empty extruder state. In absolute extrusion mode the paths up to the first
+            extruder reset of a layer depend on the distance carried from the previous layer, so they are regenerated here
+            with the carried state, and the distance at the end of each layer is carried on to the next.'''
+        if workers < 1:
+            workers = cpu_count()
+        layers = self.slicedModel.layers
+        lookaheadStartVectors = self.getLookaheadStartVectors()
+        tasks = [(layerIndex, lookaheadStartVector, verbose) for (layerIndex, lookaheadStartVector) in enumerate(lookaheadStartVectors)]
+        chunkSize = max(1, len(tasks) / (workers * 8))
+        
+        pool = Pool(workers, setWorkerGcodeWriter, (self,))
+        try:
+            layerTails = pool.imap(getWorkerLayerTail, tasks, chunkSize)
+            for (layer, lookaheadStartVector, layerTail) in izip(layers, lookaheadStartVectors, layerTails):
+                (headPathCount, tailText, totalExtrusionDistance) = layerTail
+                
+                for preLayerGcodeCommand in layer.preLayerGcodeCommands:
+                    output.write(printCommand(preLayerGcodeCommand, verbose))
+                
+                extruderState.resetPreviousPoint()
+                if headPathCount > 0:
+                    combSkein = None
+                    if headPathCount > 1 and layer.runtimeParameters.combActive:
+                        combSkein = CombSkein(layer)
+                    for (path, lookaheadVector) in islice(self.getLayerPaths(layer, lookaheadStartVector, combSkein), headPathCount):
+                        self.getPath(path, output, lookaheadVector, layer.feedAndFlowRateMultiplier, verbose, extruderState, layer.thickness)
+                
+                if tailText != None:
+                    extruderState.totalExtrusionDistance = totalExtrusionDistance
+                    output.write(tailText)
+                    
+                for postLayerGcodeCommand in layer.postLayerGcodeCommands:
+                    output.write(printCommand(postLayerGcodeCommand, verbose))
+            pool.close()
+        except:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
     
-    def getLayer(self, layer, output, parentLookaheadStartVector=None, verbose=False):
+    def getLayer(self, layer, output, parentLookaheadStartVector=None, verbose=False, extruderState=None):
         '''Final Gcode representation.'''
+        if extruderState == None:
+            extruderState = ExtruderState()
+        
         for preLayerGcodeCommand in layer.preLayerGcodeCommands:
             output.write(printCommand(preLayerGcodeCommand, verbose))
         
@@ -52,8 +109,45 @@ class GcodeWriter:
         else:
             combSkein = None                        
         
+        extruderState.resetPreviousPoint()
+        
+        for (path, lookaheadVector) in self.getLayerPaths(layer, parentLookaheadStartVector, combSkein):
+            self.getPath(path, output, lookaheadVector, layer.feedAndFlowRateMultiplier, verbose, extruderState, layer.thickness)
+        
+        for postLayerGcodeCommand in layer.postLayerGcodeCommands:
+            output.write(printCommand(postLayerGcodeCommand, verbose))
+            
+    def getLayerTail(self, layer, parentLookaheadStartVector=None, verbose=False):
+        '''Generates the paths of a layer from an empty extruder state, without the pre and post layer commands.
+            Returns the number of leading paths whose gcode depends on the extruder state carried from the previous layer,
+            the gcode of the remaining paths and the extrusion distance at the end of the layer. In absolute extrusion mode 
+            the leading paths are those up to the first extruder reset, otherwise there are none.'''
+        runtimeParameters = layer.runtimeParameters
+        isStateDependent = runtimeParameters.dimensionActive and not runtimeParameters.extrusionUnitsRelative
+        extruderState = ExtruderState()
+        output = StringIO.StringIO()
+        
+        if runtimeParameters.combActive: 
+            combSkein = CombSkein(layer)
+        else:
+            combSkein = None                        
+        
+        headPathCount = 0
+        for (path, lookaheadVector) in self.getLayerPaths(layer, parentLookaheadStartVector, combSkein):
+            if isStateDependent:
+                path.generateGcode(lookaheadVector, layer.feedAndFlowRateMultiplier, self.slicedModel.runtimeParameters, extruderState, layer.thickness)
+                headPathCount += 1
+                isStateDependent = not extruderState.isExtrusionDistanceReset
+            else:
+                self.getPath(path, output, lookaheadVector, layer.feedAndFlowRateMultiplier, verbose, extruderState, layer.thickness)
+        
+        if isStateDependent:
+            return (headPathCount, None, None)
+        return (headPathCount, output.getvalue(), extruderState.totalExtrusionDistance)
+    
+    def getLayerPaths(self, layer, parentLookaheadStartVector=None, combSkein=None):
+        '''Yields the ordered paths of the layer, each preceded by the travel to it, together with the lookahead vector of each.'''
         pathList = layer.getOrderedPathList()
-        paths.resetExtrusionStats()
         
         pathListCount = len(pathList)
         for (index, path) in enumerate(pathList):
@@ -73,24 +167,31 @@ class GcodeWriter:
             
             travelPath = TravelPath(layer.z, layer.runtimeParameters, previousVector, nextVector, combSkein)
             
-            self.getPath(travelPath, output, lookaheadVector, layer.feedAndFlowRateMultiplier, verbose)
+            yield (travelPath, lookaheadVector)
             
-            self.getPath(path, output, lookaheadVector, layer.feedAndFlowRateMultiplier, verbose)
-        
-        for postLayerGcodeCommand in layer.postLayerGcodeCommands:
-            output.write(printCommand(postLayerGcodeCommand, verbose))
+            yield (path, lookaheadVector)
             
-    def getPath(self, path, output, lookaheadStartVector=None, feedAndFlowRateMultiplier=[1.0, 1.0], verbose=False):
+    def getPath(self, path, output, lookaheadStartVector=None, feedAndFlowRateMultiplier=[1.0, 1.0], verbose=False, extruderState=None, layerThickness=None):
         '''Final Gcode representation.'''
-        path.generateGcode(lookaheadStartVector, feedAndFlowRateMultiplier, self.slicedModel.runtimeParameters)
+        path.generateGcode(lookaheadStartVector, feedAndFlowRateMultiplier, self.slicedModel.runtimeParameters, extruderState, layerThickness)
             
         for command in path.gcodeCommands:
             output.write('%s' % printCommand(command, verbose))
 
+def setWorkerGcodeWriter(gcodeWriter):
+    '''Pool initializer, keeps the writer in the worker so the sliced model is only passed once per process.'''
+    global _workerGcodeWriter
+    _workerGcodeWriter = gcodeWriter
+
+def getWorkerLayerTail(task):
+    '''Pool task, generates the layer with the given index.'''
+    (layerIndex, lookaheadStartVector, verbose) = task
+    return _workerGcodeWriter.getLayerTail(_workerGcodeWriter.slicedModel.layers[layerIndex], lookaheadStartVector, verbose)
+
 def printCommand(command, verbose=False):
     if command == None:
         return 
     if isinstance(command, GcodeCommand):
         return'%s\n' % command.str(verbose)
     else:
-        return '%s\n' % command
+        return '%s\n' % command
\ No newline at end of file